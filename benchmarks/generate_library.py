@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Synthetic Procreate brush library generator for BrushsetMaker benchmarks.
+
+Fabricates a bulk root full of brushset folders that look like the real thing:
+UUID-named brush folders holding a binary ``Brush.archive`` plist, ``Shape.png`` and
+``Grain.png`` textures and a QuickLook thumbnail, plus a ``brushset.plist`` per set.
+
+Usage:
+    python benchmarks/generate_library.py OUTPUT [--sets N] [--brushes N] [--texture-size PX]
+
+Examples:
+    python benchmarks/generate_library.py /tmp/library
+    python benchmarks/generate_library.py /tmp/library --sets 50 --brushes 20 --texture-size 1024
+"""
+
+import argparse
+from pathlib import Path
+import plistlib
+import random
+import struct
+import sys
+import uuid
+import zlib
+
+
+def make_png(width: int, height: int, rng: random.Random, smoothness: int = 4) -> bytes:
+    """Return an 8-bit grayscale PNG of blocky noise.
+
+    ``smoothness`` repeats each random pixel horizontally, so textures compress somewhere
+    between pure noise and a flat fill, much like real brush shapes and grains.
+    """
+    def chunk(kind: bytes, data: bytes) -> bytes:
+        body = kind + data
+        return struct.pack(">I", len(data)) + body + struct.pack(">I", zlib.crc32(body))
+
+    rows = []
+    for _ in range(height):
+        pixels = bytearray()
+        while len(pixels) < width:
+            pixels.extend(bytes([rng.randrange(256)]) * smoothness)
+        rows.append(b"\x00" + bytes(pixels[:width]))
+
+    header = struct.pack(">IIBBBBB", width, height, 8, 0, 0, 0, 0)
+    return (
+        b"\x89PNG\r\n\x1a\n"
+        + chunk(b"IHDR", header)
+        + chunk(b"IDAT", zlib.compress(b"".join(rows), 6))
+        + chunk(b"IEND", b"")
+    )
+
+
+def make_brush_archive(name: str, rng: random.Random) -> bytes:
+    """Return a binary plist shaped like an NSKeyedArchiver ``Brush.archive``."""
+    settings = {f"setting{i}": rng.random() for i in range(120)}
+    archive = {
+        "$version": 100000,
+        "$archiver": "NSKeyedArchiver",
+        "$top": {"root": plistlib.UID(1)},
+        "$objects": [
+            "$null",
+            {"name": plistlib.UID(2), "$class": plistlib.UID(3), **settings},
+            name,
+            {"$classname": "SilicaBrush", "$classes": ["SilicaBrush", "NSObject"]},
+        ],
+    }
+    return plistlib.dumps(archive, fmt=plistlib.FMT_BINARY)
+
+
+def generate_brush(folder: Path, name: str, texture_size: int, rng: random.Random) -> str:
+    """Create one UUID-named brush folder inside ``folder`` and return its UUID."""
+    brush_id = str(uuid.UUID(int=rng.getrandbits(128))).upper()
+    brush_dir = folder / brush_id
+    (brush_dir / "QuickLook").mkdir(parents=True)
+
+    (brush_dir / "Brush.archive").write_bytes(make_brush_archive(name, rng))
+    (brush_dir / "Shape.png").write_bytes(make_png(texture_size, texture_size, rng))
+    (brush_dir / "Grain.png").write_bytes(make_png(texture_size, texture_size, rng, 8))
+    (brush_dir / "QuickLook" / "Thumbnail.png").write_bytes(make_png(128, 64, rng))
+    return brush_id
+
+
+def generate_library(
+    output: Path, sets: int = 20, brushes: int = 10, texture_size: int = 512, seed: int = 0
+) -> dict:
+    """Generate a bulk root of brushset folders and return a summary of what was written."""
+    rng = random.Random(seed)
+    output.mkdir(parents=True, exist_ok=True)
+
+    for set_idx in range(sets):
+        set_dir = output / f"Brush Set {set_idx + 1:03d}"
+        set_dir.mkdir()
+        brush_ids = [
+            generate_brush(set_dir, f"Brush {set_idx + 1}.{i + 1}", texture_size, rng)
+            for i in range(brushes)
+        ]
+        with (set_dir / "brushset.plist").open("wb") as f:
+            plistlib.dump({"name": set_dir.name, "brushes": brush_ids}, f)
+
+    files = [p for p in output.rglob("*") if p.is_file()]
+    return {
+        "sets": sets,
+        "brushes": sets * brushes,
+        "files": len(files),
+        "bytes": sum(p.stat().st_size for p in files),
+    }
+
+
+def main():
+    """Main entry point for the generator."""
+    parser = argparse.ArgumentParser(
+        description="Generate a synthetic Procreate brush library for benchmarks",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=__doc__,
+    )
+    parser.add_argument("output", type=Path, help="Bulk root to create (must not exist)")
+    parser.add_argument("--sets", type=int, default=20, help="Number of brushsets")
+    parser.add_argument("--brushes", type=int, default=10, help="Brushes per brushset")
+    parser.add_argument(
+        "--texture-size", type=int, default=512, help="Shape/Grain texture edge in pixels"
+    )
+    parser.add_argument("--seed", type=int, default=0, help="Random seed")
+    args = parser.parse_args()
+
+    if args.output.exists():
+        print(f"Error: {args.output} already exists", file=sys.stderr)
+        sys.exit(1)
+
+    summary = generate_library(args.output, args.sets, args.brushes, args.texture_size, args.seed)
+    print(
+        f"Generated {summary['sets']} brushsets, {summary['brushes']} brushes, "
+        f"{summary['files']} files, {summary['bytes'] / 1e6:.1f} MB in {args.output}"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+"""
+Packaging benchmarks for BrushsetMaker.
+
+Runs repeatable scan, compress and write benchmarks for single and bulk packaging against a
+synthetic library (see generate_library.py), stores results as named baselines and compares
+runs against them to flag regressions.
+
+Every case runs in a fresh interpreter with its own HOME, so peak RSS is per case and no
+manifests or journals leak into your real ~/.brushsetmaker.
+
+Usage:
+    python benchmarks/run_benchmarks.py run [--library DIR] [--save NAME]
+    python benchmarks/run_benchmarks.py compare BASELINE [CURRENT] [--threshold PCT]
+
+Examples:
+    python benchmarks/run_benchmarks.py run --save main
+    python benchmarks/run_benchmarks.py run --save my-branch
+    python benchmarks/run_benchmarks.py compare main my-branch
+"""
+
+import argparse
+import json
+import os
+from pathlib import Path
+import platform
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+BASELINE_DIR = PROJECT_ROOT / "benchmarks" / "baselines"
+sys.path.insert(0, str(PROJECT_ROOT / "src"))
+sys.path.insert(0, str(PROJECT_ROOT / "benchmarks"))
+
+CASES = [
+    "scan",
+    "single_serial",
+    "single_threaded",
+    "bulk_serial",
+    "bulk_parallel",
+    "bulk_noop",
+]
+
+
+def peak_rss_mb() -> float:
+    """Return the peak resident set size of this process and its children in MB."""
+    peak = max(
+        resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss,
+    )
+    # Linux reports kilobytes, macOS bytes
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def run_case(case: str, library: Path, workdir: Path) -> dict:
+    """Run one benchmark case in this process and return its measurements."""
+    # Only the cases need the package; compare runs without it
+    from brushsetmaker.core.engine import BrushsetEngine, PackagingOptions  # noqa: PLC0415
+    from brushsetmaker.core.scanner import iter_source_files  # noqa: PLC0415
+
+    cpus = os.cpu_count() or 1
+    subdirs = sorted(p for p in library.iterdir() if p.is_dir())
+    largest = max(subdirs, key=lambda d: sum(1 for _ in iter_source_files(d)))
+
+    if case == "scan":
+        start = time.perf_counter()
+        files = total = 0
+        for subdir in subdirs:
+            for source in iter_source_files(subdir):
+                files += 1
+                total += source.size
+        return {"seconds": time.perf_counter() - start, "files": files, "bytes": total}
+
+    if case in ("single_serial", "single_threaded"):
+        threads = 1 if case == "single_serial" else cpus
+        engine = BrushsetEngine(PackagingOptions(compression_threads=threads, reuse_entries=False))
+        start = time.perf_counter()
+        result = engine.build(largest, workdir / "single.brushset")
+        return {
+            "seconds": time.perf_counter() - start,
+            "files": result.file_count,
+            "bytes": result.input_bytes,
+        }
+
+    options = PackagingOptions(
+        workers=1 if case == "bulk_serial" else cpus,
+        compression_threads=1,
+        incremental=case == "bulk_noop",
+        reuse_entries=False,
+    )
+    engine = BrushsetEngine(options)
+    output_dir = workdir / "bulk"
+    output_dir.mkdir(exist_ok=True)
+    if case == "bulk_noop":
+        # Prime the manifest so the timed run finds nothing to do
+        engine.build_bulk(library, output_dir)
+
+    start = time.perf_counter()
+    bulk = engine.build_bulk(library, output_dir)
+    seconds = time.perf_counter() - start
+    totals = [sum(s.size for s in iter_source_files(r.folder)) for r in bulk.results]
+    return {
+        "seconds": seconds,
+        "files": sum(r.file_count for r in bulk.results),
+        "bytes": sum(totals),
+    }
+
+
+def measure(case: str, library: Path, repeat: int) -> dict:
+    """Run a case ``repeat`` times in fresh interpreters and keep the fastest run."""
+    best = None
+    for _ in range(repeat):
+        with tempfile.TemporaryDirectory(prefix="brushsetmaker-bench-") as tmp:
+            env = {**os.environ, "HOME": tmp}
+            proc = subprocess.run(
+                [sys.executable, __file__, "_case", case, str(library), tmp],
+                env=env,
+                capture_output=True,
+                text=True,
+                check=False,
+            )
+        if proc.returncode != 0:
+            raise RuntimeError(f"Benchmark {case} failed:\n{proc.stderr}")
+        sample = json.loads(proc.stdout)
+        if best is None or sample["seconds"] < best["seconds"]:
+            best = sample
+
+    seconds = max(best["seconds"], 1e-9)
+    return {
+        **best,
+        "files_per_s": best["files"] / seconds,
+        "mb_per_s": best["bytes"] / 1e6 / seconds,
+    }
+
+
+def run_all(library: Path, repeat: int, cases: list[str]) -> dict:
+    """Run the selected cases and return a results document."""
+    results = {}
+    for case in cases:
+        results[case] = measure(case, library, repeat)
+        r = results[case]
+        print(
+            f"{case:<16} {r['seconds']:8.3f}s {r['files_per_s']:10.0f} files/s "
+            f"{r['mb_per_s']:8.1f} MB/s {r['peak_rss_mb']:8.1f} MB peak"
+        )
+    return {
+        "machine": {
+            "platform": platform.platform(),
+            "python": platform.python_version(),
+            "cpus": os.cpu_count(),
+        },
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "results": results,
+    }
+
+
+def load_results(name: str) -> dict:
+    """Load a baseline by name or path."""
+    path = Path(name)
+    if not path.exists():
+        path = BASELINE_DIR / f"{name}.json"
+    with path.open() as f:
+        return json.load(f)
+
+
+def compare(baseline: dict, current: dict, threshold: float) -> bool:
+    """Print a comparison table and return True if any case regressed."""
+    regressed = False
+    print(f"{'case':<16} {'baseline MB/s':>14} {'current MB/s':>13} {'change':>8} "
+          f"{'peak MB':>9}")
+    for case, base in baseline["results"].items():
+        cur = current["results"].get(case)
+        if cur is None:
+            continue
+        change = (cur["mb_per_s"] - base["mb_per_s"]) / max(base["mb_per_s"], 1e-9) * 100
+        rss_change = (cur["peak_rss_mb"] - base["peak_rss_mb"]) / max(base["peak_rss_mb"], 1e-9)
+        flags = []
+        if change < -threshold:
+            flags.append("SLOWER")
+        if rss_change * 100 > threshold:
+            flags.append("MORE MEMORY")
+        regressed = regressed or bool(flags)
+        print(
+            f"{case:<16} {base['mb_per_s']:14.1f} {cur['mb_per_s']:13.1f} {change:+7.1f}% "
+            f"{cur['peak_rss_mb']:9.1f}  {' '.join(flags)}"
+        )
+    return regressed
+
+
+def main():
+    """Main entry point for the benchmark runner."""
+    if len(sys.argv) > 1 and sys.argv[1] == "_case":
+        # Internal: run a single case and report it on stdout
+        case, library, workdir = sys.argv[2], Path(sys.argv[3]), Path(sys.argv[4])
+        result = run_case(case, library, workdir)
+        result["peak_rss_mb"] = peak_rss_mb()
+        print(json.dumps(result))
+        return
+
+    parser = argparse.ArgumentParser(
+        description="Run BrushsetMaker packaging benchmarks",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=__doc__,
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    run = subparsers.add_parser("run", help="Run the benchmarks")
+    run.add_argument("--library", type=Path, help="Existing library (default: generate one)")
+    run.add_argument("--sets", type=int, default=20, help="Brushsets in a generated library")
+    run.add_argument("--brushes", type=int, default=10, help="Brushes per generated set")
+    run.add_argument("--texture-size", type=int, default=512, help="Generated texture edge")
+    run.add_argument("--repeat", type=int, default=3, help="Runs per case, fastest is kept")
+    run.add_argument("--case", action="append", choices=CASES, help="Only run these cases")
+    run.add_argument("--save", metavar="NAME", help="Save results as baseline NAME")
+    run.add_argument("--compare", metavar="BASELINE", help="Compare against a saved baseline")
+    run.add_argument("--threshold", type=float, default=10.0, help="Regression threshold in %%")
+
+    cmp = subparsers.add_parser("compare", help="Compare two saved baselines")
+    cmp.add_argument("baseline", help="Baseline name or JSON path")
+    cmp.add_argument("current", help="Baseline name or JSON path to check")
+    cmp.add_argument("--threshold", type=float, default=10.0, help="Regression threshold in %%")
+
+    args = parser.parse_args()
+
+    if args.command == "compare":
+        regressed = compare(load_results(args.baseline), load_results(args.current), args.threshold)
+        sys.exit(1 if regressed else 0)
+
+    generated = None
+    library = args.library
+    if library is None:
+        from generate_library import generate_library  # noqa: PLC0415 - only when generating
+
+        generated = Path(tempfile.mkdtemp(prefix="brushsetmaker-library-"))
+        library = generated / "library"
+        summary = generate_library(library, args.sets, args.brushes, args.texture_size)
+        print(f"Generated {summary['files']} files, {summary['bytes'] / 1e6:.1f} MB")
+
+    try:
+        current = run_all(library, args.repeat, args.case or CASES)
+    finally:
+        if generated:
+            shutil.rmtree(generated, ignore_errors=True)
+
+    if args.save:
+        BASELINE_DIR.mkdir(parents=True, exist_ok=True)
+        with (BASELINE_DIR / f"{args.save}.json").open("w") as f:
+            json.dump(current, f, indent=2)
+        print(f"Saved baseline {args.save}")
+
+    if args.compare and compare(load_results(args.compare), current, args.threshold):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,3 +1,8 @@
 """BrushsetMaker - macOS utility to compile brushsets for Procreate."""
 
+import time
+
 __version__ = "0.4.0"
+
+# Taken before anything else is imported, so startup timing covers the imports too
+LAUNCH_TIME = time.perf_counter()
@@ -1,6 +1,20 @@
 """Main entry point for BrushsetMaker."""
 
-from .app import main
+import sys
+
+
+def main():
+    """Run a CLI subcommand when one is given, otherwise launch the app."""
+    # Packaging subcommands run headless, so avoid importing Toga for them, and GUI
+    # launches don't import the CLI and the packaging stack behind it
+    from .commands import COMMANDS
+    if len(sys.argv) > 1 and sys.argv[1] in (*COMMANDS, "-h", "--help", "--version"):
+        from .cli import main as cli_main
+        return cli_main()
+
+    from .app import main as app_main
+    return app_main().main_loop()
+
 
 if __name__ == '__main__':
-    main().main_loop()
+    sys.exit(main())
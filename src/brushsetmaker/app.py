@@ -2,13 +2,35 @@
 BrushsetMaker - macOS utility to compile brushsets for Procreate.
 
 Entry point for the application.
+
+Startup only imports Toga and the UI builder. The handlers, and through them the packaging
+engine, zipfile and plistlib, are imported the first time a command needs them. Set
+``BRUSHSETMAKER_STARTUP_TIMING=1`` to print how long launch took up to the first paint of
+the main window, or ``=exit`` to also quit right after, for timing launches from a script.
 """
 
+import asyncio
+import logging
+import os
+import sys
+import time
+
 import toga
-from . import __version__
-from .ui import UIBuilder
-from .core import BrushsetHandlers
+
+from . import LAUNCH_TIME, __version__
+from .core.log import configure_logging
 from .core.settings import Settings
+from .ui import UIBuilder
+
+logger = logging.getLogger(__name__)
+
+STARTUP_TIMING_ENV = "BRUSHSETMAKER_STARTUP_TIMING"
+
+
+def _handlers():
+    """Return BrushsetHandlers, importing the packaging stack on first use."""
+    from .core.handlers import BrushsetHandlers
+    return BrushsetHandlers
 
 
 class BrushsetMaker(toga.App):
@@ -16,27 +38,69 @@ class BrushsetMaker(toga.App):
 
     def startup(self):
         """Construct and show the Toga application."""
-        # Initialize settings
+        self.startup_marks = {"startup": time.perf_counter()}
+
+        # Settings are read from disk on first access
         self.settings = Settings()
+        self.settings_window = None
 
         # Build the main window UI
         main_box = UIBuilder.build_main_window(self)
         self.icon = "icon.icns"
+        self.startup_marks["views"] = time.perf_counter()
 
         # Create the main window
         self.main_window = toga.MainWindow(title=self.formal_name)
         self.main_window.content = main_box # type: ignore
         self.main_window.show() #type: ignore
+        self.startup_marks["shown"] = time.perf_counter()
+
+        # Runs once the event loop has drawn the window
+        self.loop.call_soon(self._startup_finished)
 
         # Initialize state
         self.selected_folder = None
         self.selected_single_folder = None
         self.progress_window = None
+        self.watch_stop = None
+        self.library = None
+        self.library_page = 0
+        self.library_futures = []
+        self.thumbnail_executor = None
+        self.thumbnail_cache = None
+        # Menu commands start handlers as tasks; the loop only keeps weak references
+        self.menu_tasks = set()
 
         # Add menu commands
         self._add_settings_command()
         self._add_file_menu_commands()
 
+    def _startup_finished(self):
+        """Record how long launch took and finish setup that can wait for the first paint."""
+        self.startup_marks["first_paint"] = time.perf_counter()
+        configure_logging(self.settings.get("logging_level", "info"))
+
+        timings = {
+            name: round((mark - LAUNCH_TIME) * 1000, 1)
+            for name, mark in self.startup_marks.items()
+        }
+        logger.info("Started up", extra={"data": {"milliseconds": timings}})
+
+        mode = os.environ.get(STARTUP_TIMING_ENV)
+        if mode:
+            print(
+                "startup: " + "  ".join(f"{name}={ms}ms" for name, ms in timings.items()),
+                file=sys.stderr,
+            )
+            if mode == "exit":
+                self.exit()
+
+    def _start_task(self, coro):
+        """Run a handler coroutine from a menu command, holding on to it until it is done."""
+        task = asyncio.create_task(coro)
+        self.menu_tasks.add(task)
+        task.add_done_callback(self.menu_tasks.discard)
+
     def _add_settings_command(self):
         """Add settings/preferences command to app menu."""
         def open_settings_action(command, **kwargs):
@@ -55,13 +119,14 @@ class BrushsetMaker(toga.App):
     def _add_file_menu_commands(self):
         """Add file menu commands for folder selection."""
         def select_single_action(command, **kwargs):
-            import asyncio
-            asyncio.create_task(self._handle_create_single(command))
+            UIBuilder.switch_view(self, "single")
+            self._start_task(self._handle_create_single(command))
             return True
 
         def select_bulk_action(command, **kwargs):
-            import asyncio
-            asyncio.create_task(self._handle_select_bulk(command))
+            # Selecting a root fills in the bulk view, which may not be built yet
+            UIBuilder.switch_view(self, "bulk")
+            self._start_task(self._handle_select_bulk(command))
             return True
 
         select_single_cmd = toga.Command(
@@ -80,35 +145,98 @@ class BrushsetMaker(toga.App):
             section=1
         )
 
+        def inspect_action(command, **kwargs):
+            self._start_task(self._handle_inspect_brushset(command))
+            return True
+
+        inspect_cmd = toga.Command(
+            inspect_action,
+            text="Inspect Brushset...",
+            tooltip="Show the brushes and files inside a .brushset",
+            group=toga.Group.FILE,
+            section=2
+        )
+
+        def merge_action(command, **kwargs):
+            self._start_task(self._handle_merge_brushsets(command))
+            return True
+
+        merge_cmd = toga.Command(
+            merge_action,
+            text="Merge Brushsets...",
+            tooltip="Combine the brushes of several .brushset files into one",
+            group=toga.Group.FILE,
+            section=2
+        )
+
         self.commands.add(select_single_cmd)
         self.commands.add(select_bulk_cmd)
+        self.commands.add(inspect_cmd)
+        self.commands.add(merge_cmd)
 
     # Handler wrappers to bridge UI callbacks to handler methods
     async def _handle_create_single(self, widget):
         """Wrapper for create single brushset handler."""
-        await BrushsetHandlers.create_single_brushset(self, widget)
+        await _handlers().create_single_brushset(self, widget)
 
     async def _handle_compile_single(self, widget):
         """Wrapper for compile single brushset handler."""
-        await BrushsetHandlers.compile_single_brushset(self, widget)
+        await _handlers().compile_single_brushset(self, widget)
 
     async def _handle_edit_metadata(self, widget):
         """Wrapper for edit metadata handler."""
-        await BrushsetHandlers.open_metadata_editor(self, widget)
+        await _handlers().open_metadata_editor(self, widget)
 
     async def _handle_select_bulk(self, widget):
         """Wrapper for select bulk folder handler."""
-        await BrushsetHandlers.select_bulk_folder(self, widget)
+        await _handlers().select_bulk_folder(self, widget)
 
     async def _handle_process_folders(self, widget):
         """Wrapper for process folders handler."""
-        await BrushsetHandlers.process_folders(self, widget)
+        await _handlers().process_folders(self, widget)
+
+    async def _handle_resume_folders(self, widget):
+        """Wrapper for resume folders handler."""
+        await _handlers().resume_folders(self, widget)
+
+    async def _handle_toggle_watch(self, widget):
+        """Wrapper for toggle watch handler."""
+        await _handlers().toggle_watch(self, widget)
+
+    async def _handle_unpack_brushsets(self, widget):
+        """Wrapper for unpack brushsets handler."""
+        await _handlers().unpack_brushsets(self, widget)
+
+    async def _handle_repack_brushsets(self, widget):
+        """Wrapper for repack brushsets handler."""
+        await _handlers().repack_brushsets(self, widget)
+
+    async def _handle_merge_brushsets(self, widget):
+        """Wrapper for merge brushsets handler."""
+        await _handlers().merge_brushsets(self, widget)
+
+    async def _handle_inspect_brushset(self, widget):
+        """Wrapper for inspect brushset handler."""
+        await _handlers().inspect_brushset(self, widget)
+
+    async def _handle_select_library(self, widget):
+        """Wrapper for select library folder handler."""
+        await _handlers().select_library_folder(self, widget)
+
+    async def _handle_library_previous(self, widget):
+        """Show the previous page of the brush library."""
+        await _handlers().show_library_page(self, self.library_page - 1)
+
+    async def _handle_library_next(self, widget):
+        """Show the next page of the brush library."""
+        await _handlers().show_library_page(self, self.library_page + 1)
 
     def _handle_open_settings(self, widget):
-        """Open the settings dialog."""
-        from .ui.settings_dialog import SettingsWindow
-        settings_window = SettingsWindow(self)
-        settings_window.show()
+        """Open the settings dialog, building it the first time."""
+        if self.settings_window is None:
+            from .ui.settings_dialog import SettingsWindow
+            self.settings_window = SettingsWindow(self)
+        self.settings_window.show()
 
 
 def main():
@@ -0,0 +1,822 @@
+"""Command-line interface for BrushsetMaker.
+
+Runs the packaging engine without Toga so brushsets can be built on headless machines.
+"""
+
+import argparse
+import json
+from pathlib import Path
+import sys
+import threading
+
+from . import __version__
+from .core.compression import CompressionPolicy
+from .core.duplicates import find_duplicates
+from .core.engine import (
+    BrushsetEngine,
+    DuplicateBrushesError,
+    EmptyFolderError,
+    PackagingOptions,
+    backup_existing,
+    resolve_workers,
+    unique_output_path,
+)
+from .core.extract import extract_bulk
+from .core.inspector import ArchiveError, inspect_archive
+from .core.log import configure_logging
+from .core.merge import merge_archives, split_archive
+from .core.repack import collect_archives, repack_bulk
+from .core.report import build_report, default_report_path, duplicate_rows, write_report
+from .core.settings import Settings
+from .core.trace import default_trace_path, write_trace
+from .core.tuner import DEFAULT_SAMPLE_BYTES, DEFAULT_TOLERANCE, apply_to_settings, tune_compression
+from .core.watcher import DEFAULT_DEBOUNCE, DEFAULT_POLL_INTERVAL, FolderWatcher
+
+
+def _build_parser():
+    """Build the argument parser for all subcommands."""
+    parser = argparse.ArgumentParser(
+        prog="brushsetmaker",
+        description="Package folders into Procreate .brushset files.",
+    )
+    parser.add_argument("--version", action="version", version=f"%(prog)s {__version__}")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    compression, common = _shared_options()
+    _add_packaging_parsers(subparsers, common)
+    _add_archive_parsers(subparsers, compression)
+    _add_tune_parser(subparsers)
+    _add_watch_parser(subparsers, common)
+    return parser
+
+
+def _shared_options():
+    """Return the parent parsers with the compression and packaging options."""
+    # Options for every command that compresses members
+    compression = argparse.ArgumentParser(add_help=False)
+    compression.add_argument(
+        "--compression-method",
+        choices=["deflate", "stored", "bzip2", "lzma"],
+        help="Override the compression method from settings",
+    )
+    compression.add_argument(
+        "--compression-level",
+        choices=["store", "fast", "normal", "maximum"],
+        help="Override the compression level from settings",
+    )
+    compression.add_argument(
+        "--compression-policy",
+        choices=["auto", "extensions", "off"],
+        help="How to handle files that are already compressed, such as PNG textures",
+    )
+
+    # Options shared by every packaging command
+    common = argparse.ArgumentParser(add_help=False, parents=[compression])
+    common.add_argument(
+        "--include-hidden",
+        action="store_true",
+        default=None,
+        help="Include hidden files in the archive",
+    )
+    common.add_argument(
+        "--threads",
+        type=int,
+        help="Compression threads per brushset (0 = one per CPU, default: from settings)",
+    )
+    common.add_argument(
+        "--plist-format",
+        choices=["xml", "binary"],
+        help="Format of generated brushset.plist files (default: from settings)",
+    )
+    common.add_argument(
+        "--report",
+        type=Path,
+        metavar="PATH",
+        help="Write a timing report to PATH (.csv for CSV, anything else for JSON)",
+    )
+    common.add_argument(
+        "--trace",
+        type=Path,
+        metavar="PATH",
+        help="Write a Chrome trace of the run to PATH (open in Perfetto or chrome://tracing)",
+    )
+    common.add_argument(
+        "--log-level",
+        choices=["none", "errors", "info", "debug"],
+        help="Override the logging level from settings (log: ~/.brushsetmaker/logs)",
+    )
+    common.add_argument("-q", "--quiet", action="store_true", help="Only print errors")
+
+    return compression, common
+
+
+def _add_packaging_parsers(subparsers, common):
+    """Add the ``build`` and ``bulk`` subcommands."""
+    build = subparsers.add_parser(
+        "build", parents=[common], help="Package a single folder into a brushset"
+    )
+    build.add_argument("folder", type=Path, help="Folder to package")
+    build.add_argument(
+        "-o", "--output", type=Path, help="Output file (default: <folder>.brushset next to it)"
+    )
+
+    bulk = subparsers.add_parser(
+        "bulk", parents=[common], help="Package every subfolder of a root folder"
+    )
+    bulk.add_argument("root", type=Path, help="Root folder containing brushset subfolders")
+    bulk.add_argument(
+        "-o", "--output-dir", type=Path, help="Directory for the archives (default: root)"
+    )
+    bulk.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        help="Number of worker processes (0 = one per CPU, default: from settings)",
+    )
+    bulk.add_argument(
+        "--resume",
+        action="store_true",
+        help="Continue an interrupted run, skipping folders it already finished",
+    )
+    bulk.add_argument(
+        "--force", action="store_true", help="Rebuild every folder, even if unchanged"
+    )
+    bulk.add_argument(
+        "--hash",
+        action="store_true",
+        default=None,
+        help="Compare file contents as well as timestamps when checking for changes",
+    )
+    bulk.add_argument(
+        "--stop-on-error", action="store_true", default=None, help="Stop at the first failure"
+    )
+    bulk.add_argument(
+        "--check-duplicates",
+        choices=["warn", "fail"],
+        help="Look for duplicate brushes first, and warn or fail without packaging",
+    )
+
+
+def _add_archive_parsers(subparsers, compression):
+    """Add the subcommands that read or rewrite existing brushsets."""
+    duplicates = subparsers.add_parser(
+        "duplicates", help="List brushes duplicated across the subfolders of a root folder"
+    )
+    duplicates.add_argument("root", type=Path, help="Root folder containing brushset subfolders")
+    duplicates.add_argument(
+        "--report", type=Path, metavar="PATH", help="Also write the groups to PATH as JSON"
+    )
+    duplicates.add_argument("-q", "--quiet", action="store_true", help="Only set the exit code")
+
+    inspect = subparsers.add_parser(
+        "inspect", help="Show what a .brushset archive contains without extracting it"
+    )
+    inspect.add_argument("archive", type=Path, help="Brushset archive to inspect")
+    inspect.add_argument(
+        "-m", "--members", action="store_true", help="List every member, not just the brushes"
+    )
+    inspect.add_argument("--json", action="store_true", help="Print the details as JSON")
+
+    unpack = subparsers.add_parser(
+        "unpack", help="Extract every .brushset in a root folder into editable subfolders"
+    )
+    unpack.add_argument("root", type=Path, help="Folder containing .brushset files")
+    unpack.add_argument(
+        "-o", "--output-dir", type=Path, help="Directory for the folders (default: root)"
+    )
+    unpack.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        help="Archives extracted at once (0 = one per CPU, default: from settings)",
+    )
+    unpack.add_argument(
+        "--overwrite", action="store_true", help="Replace folders that already exist"
+    )
+    unpack.add_argument("-q", "--quiet", action="store_true", help="Only print errors")
+
+    repack = subparsers.add_parser(
+        "repack",
+        parents=[compression],
+        help="Rewrite existing .brushset files with different compression settings",
+    )
+    repack.add_argument(
+        "archives", type=Path, nargs="+", help="Brushset files, or folders containing them"
+    )
+    repack.add_argument(
+        "-o",
+        "--output-dir",
+        type=Path,
+        help="Directory for the new archives (default: replace each archive in place)",
+    )
+    repack.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        help="Archives repacked at once (0 = one per CPU, default: from settings)",
+    )
+    repack.add_argument(
+        "--recompress",
+        action="store_const",
+        const=True,
+        help="Compress every member again, even in archives already written with these settings",
+    )
+    repack.add_argument("-q", "--quiet", action="store_true", help="Only print errors")
+
+    merge = subparsers.add_parser(
+        "merge", help="Combine the brushes of several .brushset files into one"
+    )
+    merge.add_argument("archives", type=Path, nargs="+", help="Brushset files to merge, in order")
+    merge.add_argument("-o", "--output", type=Path, required=True, help="Brushset file to write")
+    merge.add_argument("--name", help="Name of the merged brushset (default: output file name)")
+    merge.add_argument("-q", "--quiet", action="store_true", help="Only print errors")
+
+    split = subparsers.add_parser(
+        "split", help="Copy some brushes of a .brushset file into a new one"
+    )
+    split.add_argument("archive", type=Path, help="Brushset file to take the brushes from")
+    split.add_argument("brushes", nargs="+", help="Brush folder names (UUIDs) to take")
+    split.add_argument("-o", "--output", type=Path, required=True, help="Brushset file to write")
+    split.add_argument("--name", help="Name of the new brushset (default: output file name)")
+    split.add_argument(
+        "--remove",
+        action="store_true",
+        help="Also remove the brushes from the original brushset",
+    )
+    split.add_argument("-q", "--quiet", action="store_true", help="Only print errors")
+
+
+def _add_tune_parser(subparsers):
+    """Add the ``tune`` subcommand."""
+    tune = subparsers.add_parser(
+        "tune",
+        help="Trial-compress a sample of a library and recommend a compression setting",
+    )
+    tune.add_argument("root", type=Path, help="Root folder containing brushset subfolders")
+    tune.add_argument(
+        "--sample-mb",
+        type=float,
+        default=DEFAULT_SAMPLE_BYTES / (1024 * 1024),
+        help="About how much of the library to trial-compress (default: %(default)g)",
+    )
+    tune.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        help="Compression threads (0 = one per CPU, default: from settings)",
+    )
+    tune.add_argument(
+        "--tolerance",
+        type=float,
+        default=DEFAULT_TOLERANCE * 100,
+        help="Prefer the fastest setting within this percentage of the smallest size "
+        "(default: %(default)g)",
+    )
+    tune.add_argument(
+        "--compression-policy",
+        choices=["auto", "extensions", "off"],
+        help="Policy to measure under (default: from settings)",
+    )
+    tune.add_argument(
+        "--all-methods",
+        action="store_true",
+        help="Also measure bzip2 and lzma, which Procreate can't import",
+    )
+    tune.add_argument(
+        "--apply", action="store_true", help="Save the recommended setting to the settings"
+    )
+    tune.add_argument("--json", action="store_true", help="Print the results as JSON")
+
+
+def _add_watch_parser(subparsers, common):
+    """Add the ``watch`` subcommand."""
+    watch = subparsers.add_parser(
+        "watch",
+        parents=[common],
+        help="Repackage subfolders of a root folder whenever they change",
+    )
+    watch.add_argument("root", type=Path, help="Root folder containing brushset subfolders")
+    watch.add_argument(
+        "-o", "--output-dir", type=Path, help="Directory for the archives (default: root)"
+    )
+    watch.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        help="Number of worker processes (0 = one per CPU, default: from settings)",
+    )
+    watch.add_argument(
+        "--debounce",
+        type=float,
+        default=DEFAULT_DEBOUNCE,
+        help="Seconds without changes before rebuilding (default: %(default)s)",
+    )
+    watch.add_argument(
+        "--poll",
+        action="store_true",
+        help="Poll for changes instead of using inotify",
+    )
+    watch.add_argument(
+        "--interval",
+        type=float,
+        default=DEFAULT_POLL_INTERVAL,
+        help="Seconds between polls when polling (default: %(default)s)",
+    )
+    watch.add_argument(
+        "--no-initial-build",
+        dest="initial_build",
+        action="store_false",
+        help="Don't bring every subfolder up to date before watching",
+    )
+
+
+def _compression_policy(settings):
+    """Return the CompressionPolicy the settings describe."""
+    options = PackagingOptions.from_settings(settings)
+    return CompressionPolicy(
+        options.compression_method, options.compression_level, options.compression_policy
+    )
+
+
+def _compression_from_args(settings, args):
+    """Apply command-line compression overrides on top of the saved settings."""
+    if args.compression_method:
+        settings.set("compression_method", args.compression_method)
+    if args.compression_level:
+        settings.set("compression_level", args.compression_level)
+    if args.compression_policy:
+        settings.set("compression_policy", args.compression_policy)
+
+
+def _options_from_args(settings, args):
+    """Apply command-line overrides on top of the saved settings."""
+    _compression_from_args(settings, args)
+    if args.include_hidden is not None:
+        settings.set("include_hidden_files", args.include_hidden)
+    if args.threads is not None:
+        settings.set("compression_threads", args.threads)
+    if args.plist_format:
+        settings.set("plist_format", args.plist_format)
+    if getattr(args, "stop_on_error", None):
+        settings.set("error_handling", "stop")
+    if getattr(args, "jobs", None) is not None:
+        settings.set("bulk_workers", args.jobs)
+    if getattr(args, "force", False):
+        settings.set("incremental_builds", False)
+    if getattr(args, "hash", None):
+        settings.set("manifest_hash_contents", True)
+    if args.trace:
+        settings.set("trace_packaging", True)
+    if getattr(args, "check_duplicates", None):
+        settings.set("check_duplicate_brushes", True)
+        settings.set("duplicate_action", args.check_duplicates)
+    return PackagingOptions.from_settings(settings)
+
+
+def _write_report(settings, args, results, seconds, *, root, directory, duplicates=None):
+    """Write the run report requested on the command line or enabled in settings."""
+    path = args.report
+    if path is None and settings.get("generate_report", False):
+        path = default_report_path(directory, settings.get("report_format", "json"))
+    if path is None:
+        return
+    try:
+        write_report(build_report(results, seconds, root, duplicates), path)
+    except OSError as e:
+        print(f"Error writing report: {e}", file=sys.stderr)
+        return
+    if not args.quiet:
+        print(f"Report: {path}")
+
+
+def _write_trace(settings, args, events, directory):
+    """Write the trace requested on the command line or enabled in settings."""
+    if not settings.get("trace_packaging", False):
+        return
+    path = args.trace or default_trace_path(directory)
+    try:
+        write_trace(events, path)
+    except OSError as e:
+        print(f"Error writing trace: {e}", file=sys.stderr)
+        return
+    if not args.quiet:
+        print(f"Trace: {path}")
+
+
+def _print_issues(results, quiet):
+    """Print validation issues: errors always, warnings unless quiet."""
+    for result in results:
+        for issue in result.issues:
+            if issue.severity == "error" or not quiet:
+                print(f"{issue.severity.title()}: {result.folder.name}/{issue}", file=sys.stderr)
+
+
+def _print_duplicates(groups, label):
+    """Print duplicate brush groups to stderr, prefixed with ``label``."""
+    for group in groups:
+        print(
+            f"{label}: {len(group.brushes)} identical brushes ({group.size} bytes each): "
+            + ", ".join(group.brushes),
+            file=sys.stderr,
+        )
+
+
+def _run_build(settings, args):
+    """Handle the ``build`` subcommand."""
+    folder = args.folder
+    if not folder.is_dir():
+        print(f"Error: {folder} is not a folder", file=sys.stderr)
+        return 2
+
+    output = args.output or folder.parent / f"{folder.name}.brushset"
+    if output.suffix != ".brushset":
+        output = output.with_suffix(".brushset")
+
+    # There is nobody to prompt, so "prompt" behaves like "overwrite"
+    if output.exists() and settings.get("overwrite_behavior", "prompt") == "rename":
+        output = unique_output_path(output)
+    if settings.get("create_backup", False):
+        backup_existing(output)
+
+    engine = BrushsetEngine(_options_from_args(settings, args))
+    try:
+        result = engine.build(folder, output)
+    except KeyboardInterrupt:
+        print("Cancelled", file=sys.stderr)
+        return 130
+    except EmptyFolderError:
+        print(f"Error: {folder} is empty", file=sys.stderr)
+        return 1
+    except Exception as e:
+        print(f"Error creating brushset: {e}", file=sys.stderr)
+        return 1
+
+    _print_issues([result], args.quiet)
+    if not args.quiet:
+        print(f"Created {result.output} ({result.file_count} files, {result.output_bytes} bytes)")
+    _write_report(
+        settings, args, [result], result.seconds, root=folder, directory=output.parent
+    )
+    _write_trace(settings, args, result.trace_events, output.parent)
+    return 0
+
+
+def _run_bulk(settings, args):
+    """Handle the ``bulk`` subcommand."""
+    root = args.root
+    if not root.is_dir():
+        print(f"Error: {root} is not a folder", file=sys.stderr)
+        return 2
+    if args.output_dir:
+        args.output_dir.mkdir(parents=True, exist_ok=True)
+
+    engine = BrushsetEngine(_options_from_args(settings, args))
+
+    def report_progress(done, total, folder):
+        if not args.quiet:
+            print(f"[{done}/{total}] {folder.name}")
+
+    try:
+        bulk = engine.build_bulk(
+            root, output_dir=args.output_dir, progress=report_progress, resume=args.resume
+        )
+    except KeyboardInterrupt:
+        print("Cancelled", file=sys.stderr)
+        return 130
+    except DuplicateBrushesError as e:
+        _print_duplicates(e.groups, "Error")
+        print(f"Error: {e}, nothing was packaged", file=sys.stderr)
+        return 1
+
+    if not args.quiet:
+        _print_duplicates(bulk.duplicates, "Warning")
+    _print_issues(bulk.results, args.quiet)
+    for error in bulk.errors:
+        print(f"Error: {error}", file=sys.stderr)
+    if not args.quiet:
+        print(
+            f"Processed: {bulk.processed_count}  Unchanged: {bulk.skipped_count}  "
+            f"Errors: {bulk.error_count}"
+        )
+    _write_report(
+        settings,
+        args,
+        bulk.results,
+        bulk.seconds,
+        root=root,
+        directory=args.output_dir or root,
+        duplicates=bulk.duplicates if engine.options.check_duplicates else None,
+    )
+    _write_trace(settings, args, bulk.trace_events, args.output_dir or root)
+    return 1 if bulk.error_count else 0
+
+
+def _run_duplicates(settings, args):
+    """Handle the ``duplicates`` subcommand. Exits with 1 when duplicates are found."""
+    root = args.root
+    if not root.is_dir():
+        print(f"Error: {root} is not a folder", file=sys.stderr)
+        return 2
+
+    options = PackagingOptions.from_settings(settings)
+    engine = BrushsetEngine(options)
+    groups = find_duplicates(
+        engine.find_subfolders(root),
+        options.include_hidden_files,
+        threads=options.compression_threads,
+    )
+    if not args.quiet:
+        for group in groups:
+            print(f"{len(group.brushes)} copies, {group.size} bytes each:")
+            for brush in group.brushes:
+                print(f"  {brush}")
+        wasted = sum(group.wasted_bytes for group in groups)
+        print(f"Duplicate groups: {len(groups)}  Wasted: {wasted} bytes")
+    if args.report:
+        with args.report.open("w") as f:
+            json.dump({"root": str(root), "duplicates": duplicate_rows(groups)}, f, indent=2)
+    return 1 if groups else 0
+
+
+def _run_inspect(settings, args):  # noqa: ARG001 - same signature as the other runners
+    """Handle the ``inspect`` subcommand."""
+    try:
+        info = inspect_archive(args.archive)
+    except ArchiveError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+
+    if args.json:
+        print(json.dumps(info.as_dict(), indent=2))
+        return 0
+
+    methods = ", ".join(f"{count} {name}" for name, count in sorted(info.methods.items()))
+    print(f"{info.path}: {info.name or '(unnamed)'}")
+    print(
+        f"{len(info.members)} members ({methods}), "
+        f"{info.file_size} bytes stored in {info.compress_size}"
+    )
+    if info.metadata_error:
+        print(f"Warning: {info.metadata_error}", file=sys.stderr)
+    print("Brushes:")
+    for brush in info.brushes:
+        note = "" if brush.listed else "  (not in brushset.plist)"
+        if brush.listed and not brush.files:
+            note = "  (missing)"
+        print(f"  {brush.name}  {brush.files} files, {brush.file_size} bytes{note}")
+    if args.members:
+        print("Members:")
+        for member in info.members:
+            print(
+                f"  {member.crc:08x}  {member.method:<8} {member.file_size:>12} "
+                f"{member.compress_size:>12}  {member.name}"
+            )
+    return 0
+
+
+def _run_unpack(settings, args):
+    """Handle the ``unpack`` subcommand."""
+    root = args.root
+    if not root.is_dir():
+        print(f"Error: {root} is not a folder", file=sys.stderr)
+        return 2
+
+    jobs = args.jobs if args.jobs is not None else settings.get("bulk_workers", 0)
+    cancel_event = threading.Event()
+
+    def report_progress(done, total, archive):
+        if not args.quiet:
+            print(f"[{done}/{total}] {archive.name}")
+
+    try:
+        bulk = extract_bulk(
+            root,
+            output_dir=args.output_dir,
+            workers=resolve_workers(jobs),
+            overwrite=args.overwrite,
+            progress=report_progress,
+            cancel_event=cancel_event,
+        )
+    except KeyboardInterrupt:
+        cancel_event.set()
+        print("Cancelled", file=sys.stderr)
+        return 130
+
+    for error in bulk.errors:
+        print(f"Error: {error}", file=sys.stderr)
+    if not args.quiet:
+        print(
+            f"Unpacked: {bulk.processed_count}  Existing: {bulk.skipped_count}  "
+            f"Errors: {bulk.error_count}"
+        )
+    return 1 if bulk.error_count else 0
+
+
+def _run_repack(settings, args):
+    """Handle the ``repack`` subcommand."""
+    archives = collect_archives(args.archives)
+    missing = [archive for archive in archives if not archive.is_file()]
+    if missing:
+        print(f"Error: {missing[0]} is not a file", file=sys.stderr)
+        return 2
+
+    _compression_from_args(settings, args)
+    policy = _compression_policy(settings)
+    jobs = args.jobs if args.jobs is not None else settings.get("bulk_workers", 0)
+    cancel_event = threading.Event()
+
+    def report_progress(done, total, archive):
+        if not args.quiet:
+            print(f"[{done}/{total}] {archive.name}")
+
+    try:
+        bulk = repack_bulk(
+            archives,
+            policy,
+            output_dir=args.output_dir,
+            workers=resolve_workers(jobs),
+            recompress=args.recompress,
+            progress=report_progress,
+            cancel_event=cancel_event,
+            backup=args.output_dir is None and settings.get("create_backup", False),
+        )
+    except KeyboardInterrupt:
+        print("Cancelled", file=sys.stderr)
+        return 130
+
+    for error in bulk.errors:
+        print(f"Error: {error}", file=sys.stderr)
+    if not args.quiet:
+        copied = sum(result.copied_count for result in bulk.results)
+        files = sum(result.file_count for result in bulk.results)
+        print(
+            f"Repacked: {bulk.processed_count}  Errors: {bulk.error_count}  "
+            f"Members copied as-is: {copied}/{files}  Saved: {bulk.saved_bytes} bytes"
+        )
+    return 1 if bulk.error_count else 0
+
+
+def _run_merge(settings, args):
+    """Handle the ``merge`` subcommand."""
+    try:
+        result = merge_archives(
+            args.archives,
+            args.output,
+            name=args.name,
+            plist_format=settings.get("plist_format", "xml"),
+            policy=_compression_policy(settings),
+        )
+    except ArchiveError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+
+    for brush in result.duplicates:
+        print(f"Warning: {brush} is in more than one brushset, kept the first", file=sys.stderr)
+    if not args.quiet:
+        print(
+            f"Merged {len(args.archives)} brushsets into {result.output}: "
+            f"{len(result.brushes)} brushes, {result.output_bytes} bytes"
+        )
+    return 0
+
+
+def _run_split(settings, args):
+    """Handle the ``split`` subcommand."""
+    try:
+        result = split_archive(
+            args.archive,
+            args.output,
+            args.brushes,
+            name=args.name,
+            plist_format=settings.get("plist_format", "xml"),
+            remove=args.remove,
+            policy=_compression_policy(settings),
+        )
+    except ArchiveError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+
+    if not args.quiet:
+        print(
+            f"Split {len(result.brushes)} brushes into {result.output}: "
+            f"{result.output_bytes} bytes"
+        )
+    return 0
+
+
+def _run_tune(settings, args):
+    """Handle the ``tune`` subcommand."""
+    root = args.root
+    if not root.is_dir():
+        print(f"Error: {root} is not a folder", file=sys.stderr)
+        return 2
+
+    jobs = args.jobs if args.jobs is not None else settings.get("compression_threads", 0)
+    workers = resolve_workers(jobs)
+    try:
+        result = tune_compression(
+            root,
+            sample_bytes=int(args.sample_mb * 1024 * 1024),
+            workers=workers,
+            policy_mode=args.compression_policy or settings.get("compression_policy", "auto"),
+            all_methods=args.all_methods,
+            tolerance=args.tolerance / 100,
+            include_hidden=settings.get("include_hidden_files", False),
+            skip_hidden_folders=settings.get("skip_hidden_folders", True),
+        )
+    except KeyboardInterrupt:
+        print("Cancelled", file=sys.stderr)
+        return 130
+
+    if args.json:
+        print(json.dumps(result.as_dict(), indent=2))
+    else:
+        print(
+            f"Library: {result.file_count} files, {result.total_bytes} bytes  "
+            f"Sample: {result.sample_count} files, {result.sample_bytes} bytes"
+        )
+        print(f"  {'Setting':<16} {'Projected size':>15} {'CPU time':>10} {'Time':>8}")
+        for candidate in result.candidates:
+            note = "" if candidate.compatible else "  (not Procreate compatible)"
+            if candidate is result.best:
+                note = "  <- recommended"
+            print(
+                f"  {candidate.label:<16} {candidate.projected_bytes:>15} "
+                f"{candidate.projected_seconds:>9.2f}s "
+                f"{candidate.projected_seconds / workers:>7.2f}s{note}"
+            )
+        print(f"Time is the CPU time spread over {workers} threads")
+
+    if result.best is None:
+        print("Error: no files to measure", file=sys.stderr)
+        return 1
+    if args.apply:
+        apply_to_settings(settings, result.best)
+        if not args.json:
+            print(f"Saved {result.best.label} to {settings.settings_path}")
+    return 0
+
+
+def _run_watch(settings, args):
+    """Handle the ``watch`` subcommand."""
+    root = args.root
+    if not root.is_dir():
+        print(f"Error: {root} is not a folder", file=sys.stderr)
+        return 2
+    if args.output_dir:
+        args.output_dir.mkdir(parents=True, exist_ok=True)
+
+    stop_event = threading.Event()
+    engine = BrushsetEngine(_options_from_args(settings, args), stop_event)
+    watcher = FolderWatcher(
+        engine,
+        root,
+        output_dir=args.output_dir,
+        debounce=args.debounce,
+        force_polling=args.poll,
+        interval=args.interval,
+    )
+
+    def report_rebuild(bulk):
+        for result in bulk.results:
+            if not result.ok:
+                print(f"Error: {result.folder.name}: {result.error}", file=sys.stderr)
+            elif not result.skipped and not args.quiet:
+                print(f"Rebuilt {result.output.name} ({result.file_count} files)")
+
+    if not args.quiet:
+        print(f"Watching {root} (Ctrl+C to stop)")
+    try:
+        watcher.run(stop_event, on_rebuild=report_rebuild, initial_build=args.initial_build)
+    except KeyboardInterrupt:
+        stop_event.set()
+        if not args.quiet:
+            print("Stopped watching")
+    return 0
+
+
+# Handler per subcommand; each takes the loaded Settings and the parsed arguments
+_RUNNERS = {
+    "build": _run_build,
+    "bulk": _run_bulk,
+    "duplicates": _run_duplicates,
+    "inspect": _run_inspect,
+    "unpack": _run_unpack,
+    "repack": _run_repack,
+    "merge": _run_merge,
+    "split": _run_split,
+    "tune": _run_tune,
+    "watch": _run_watch,
+}
+
+
+def main(argv=None):
+    """Entry point for the ``brushsetmaker-cli`` script."""
+    args = _build_parser().parse_args(argv)
+    settings = Settings()
+    configure_logging(getattr(args, "log_level", None) or settings.get("logging_level", "info"))
+    return _RUNNERS[args.command](settings, args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,18 @@
+"""Names of the command-line subcommands.
+
+Kept free of imports so ``python -m brushsetmaker`` can tell a CLI run from a GUI launch
+without loading the packaging stack.
+"""
+
+COMMANDS = (
+    "build",
+    "bulk",
+    "watch",
+    "duplicates",
+    "inspect",
+    "unpack",
+    "repack",
+    "merge",
+    "split",
+    "tune",
+)
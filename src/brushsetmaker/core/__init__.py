@@ -1,5 +1,26 @@
-"""Core application logic."""
+"""Core application logic.
 
-from .handlers import BrushsetHandlers
+The engine and handlers pull in zipfile, multiprocessing and the rest of the packaging
+stack, so they are only imported when first used. Importing a light submodule such as
+``core.settings`` at startup doesn't pay for them.
+"""
 
-__all__ = ['BrushsetHandlers']
+import importlib
+
+_LAZY = {
+    'BrushsetEngine': '.engine',
+    'BrushsetHandlers': '.handlers',
+    'PackagingOptions': '.engine',
+}
+
+
+def __getattr__(name):
+    """Import the engine and handlers on first access."""
+    if name not in _LAZY:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(_LAZY[name], __name__), name)
+    globals()[name] = value
+    return value
+
+
+__all__ = ['BrushsetEngine', 'BrushsetHandlers', 'PackagingOptions']
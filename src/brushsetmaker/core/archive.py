@@ -0,0 +1,345 @@
+"""Low-level ZIP writing helpers for brushset archives.
+
+``zipfile.ZipFile`` only knows how to compress members itself, one at a time. The helpers
+here let members be compressed elsewhere (for example on a thread pool) and then written
+into the archive as ready-made entries.
+"""
+
+import bz2
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+import logging
+from pathlib import Path
+import struct
+import time
+import zipfile
+import zlib
+
+from .compression import PROBE_SIZE
+from .report import StageTimings
+from .validation import PLIST_NAME
+
+logger = logging.getLogger(__name__)
+
+# Members larger than this are streamed through ZipFile.write instead of being held in
+# memory while they wait for their turn in the archive.
+STREAM_THRESHOLD = 64 * 1024 * 1024
+
+COPY_CHUNK_SIZE = 1024 * 1024
+
+# Local file header: signature, versions, flags, method, time, date, CRC, sizes, name/extra
+LOCAL_HEADER = struct.Struct("<4s2B4HL2L2H")
+LOCAL_HEADER_SIGNATURE = b"PK\003\004"
+
+# General purpose flag bits that make raw member data unsafe to copy on its own
+_FLAG_ENCRYPTED = 0x01
+_FLAG_DATA_DESCRIPTOR = 0x08
+
+# Archive comment recording the policy members were compressed with, so a later build or
+# repack can tell whether the members can be copied as they are
+POLICY_COMMENT_PREFIX = b"brushsetmaker "
+
+
+def new_compressor(compress_type, compresslevel=None):
+    """Return a compressor producing raw member data for ``compress_type``, or None."""
+    if compress_type == zipfile.ZIP_DEFLATED:
+        if compresslevel is None:
+            compresslevel = zlib.Z_DEFAULT_COMPRESSION
+        return zlib.compressobj(compresslevel, zlib.DEFLATED, -15)
+    if compress_type == zipfile.ZIP_BZIP2:
+        return bz2.BZ2Compressor(compresslevel or 9)
+    if compress_type == zipfile.ZIP_LZMA:
+        return zipfile.LZMACompressor()
+    return None
+
+
+def zinfo_for_source(source):
+    """Build a ZipInfo for a SourceFile from its cached stat result."""
+    st = source.stat
+    date_time = time.localtime(st.st_mtime)[:6]
+    if date_time[0] < 1980:
+        date_time = (1980, 1, 1, 0, 0, 0)
+    zinfo = zipfile.ZipInfo(source.arcname, date_time)
+    zinfo.external_attr = (st.st_mode & 0xFFFF) << 16
+    zinfo.file_size = st.st_size
+    return zinfo
+
+
+def compress_file(source, policy, timings=None):
+    """Read and compress one file, returning ``(zinfo, payload)`` ready for write_compressed.
+
+    Safe to call from worker threads: zlib, bz2 and lzma release the GIL while compressing.
+    Time spent reading and compressing is added to ``timings`` when given.
+    """
+    timings = timings or StageTimings()
+    zinfo = zinfo_for_source(source)
+    start = time.perf_counter()
+    with timings.measure("read", source.arcname), source.path.open("rb") as f:
+        data = f.read()
+
+    read_done = time.perf_counter()
+    with timings.measure("compress", source.arcname):
+        compress_type = policy.method_for(zinfo.filename, head=data[:PROBE_SIZE])
+        zinfo.compress_type = compress_type
+        zinfo.file_size = len(data)
+        zinfo.CRC = zlib.crc32(data)
+        compressor = new_compressor(compress_type, policy.level_for(compress_type))
+        payload = data if compressor is None else compressor.compress(data) + compressor.flush()
+    zinfo.compress_size = len(payload)
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Compressed %s", source.arcname, extra={"data": {
+            "method": compress_type,
+            "bytes": zinfo.file_size,
+            "compressed_bytes": zinfo.compress_size,
+            "read_seconds": round(read_done - start, 6),
+            "compress_seconds": round(time.perf_counter() - read_done, 6),
+        }})
+    return zinfo, payload
+
+
+def file_crc32(path):
+    """Return the CRC-32 of a file without loading it all into memory."""
+    crc = 0
+    with Path(path).open("rb") as f:
+        while chunk := f.read(COPY_CHUNK_SIZE):
+            crc = zlib.crc32(chunk, crc)
+    return crc
+
+
+def iter_raw_member(zipf, zinfo):
+    """Yield the still-compressed bytes of a member of an archive opened for reading."""
+    fp = zipf.fp
+    with zipf._lock:
+        fp.seek(zinfo.header_offset)
+        header = LOCAL_HEADER.unpack(fp.read(LOCAL_HEADER.size))
+        if header[0] != LOCAL_HEADER_SIGNATURE:
+            raise zipfile.BadZipFile(f"Bad local header for {zinfo.filename}")
+        data_offset = zinfo.header_offset + LOCAL_HEADER.size + header[10] + header[11]
+
+    position = data_offset
+    remaining = zinfo.compress_size
+    while remaining > 0:
+        # Re-seek every chunk so other readers of the same file handle can interleave
+        with zipf._lock:
+            fp.seek(position)
+            chunk = fp.read(min(COPY_CHUNK_SIZE, remaining))
+        if not chunk:
+            raise zipfile.BadZipFile(f"Truncated data for {zinfo.filename}")
+        position += len(chunk)
+        remaining -= len(chunk)
+        yield chunk
+
+
+def copy_info(zinfo, filename=None):
+    """Return a ZipInfo for writing ``zinfo``'s raw data into another archive."""
+    new_info = zipfile.ZipInfo(filename or zinfo.filename, zinfo.date_time)
+    new_info.compress_type = zinfo.compress_type
+    new_info.CRC = zinfo.CRC
+    new_info.file_size = zinfo.file_size
+    new_info.compress_size = zinfo.compress_size
+    new_info.external_attr = zinfo.external_attr
+    new_info.create_system = zinfo.create_system
+    new_info.flag_bits = zinfo.flag_bits & ~_FLAG_DATA_DESCRIPTOR
+    return new_info
+
+
+def can_copy_raw(zinfo):
+    """Check whether a member's compressed data can be copied without recompressing."""
+    return not zinfo.flag_bits & _FLAG_ENCRYPTED and not zinfo.is_dir()
+
+
+def policy_comment(policy):
+    """Return the archive comment recording that members were written with ``policy``."""
+    return POLICY_COMMENT_PREFIX + policy.describe().encode()
+
+
+def written_with(zipf, policy):
+    """Check whether an archive's comment says its members were written with ``policy``."""
+    return zipf.comment == policy_comment(policy)
+
+
+def write_plist_member(zipf, data, policy):
+    """Append generated brushset.plist bytes to an archive being written."""
+    zinfo = zipfile.ZipInfo(PLIST_NAME, time.localtime()[:6])
+    zinfo.external_attr = 0o100644 << 16
+    compress_type = policy.method_for(PLIST_NAME, head=data)
+    zipf.writestr(zinfo, data, compress_type, policy.level_for(compress_type))
+
+
+class ReuseIndex:
+    """Finds members of a previous archive that can be copied instead of recompressed.
+
+    A member is reused when it uses one of the allowed methods and its source still has the
+    same size and modification time. The source must also either match the build manifest
+    record or have the same CRC-32 as the stored member.
+    """
+
+    def __init__(self, old_zip, methods, previous_files=None):
+        """Index ``old_zip``, an archive opened for reading."""
+        self.old_zip = old_zip
+        self.methods = methods
+        self.previous_files = previous_files or {}
+
+    def lookup(self, source):
+        """Return the old member's ZipInfo if ``source`` can reuse it, else None."""
+        old_info = self.old_zip.NameToInfo.get(source.arcname)
+        if old_info is None or old_info.compress_type not in self.methods:
+            return None
+        st = source.stat
+        # ZIP timestamps only have two-second resolution
+        mtime = time.localtime(st.st_mtime)[:6]
+        if (
+            not can_copy_raw(old_info)
+            or old_info.file_size != st.st_size
+            or old_info.date_time != (*mtime[:5], mtime[5] // 2 * 2)
+        ):
+            return None
+
+        record = self.previous_files.get(source.arcname)
+        if record and record[:2] == [st.st_size, st.st_mtime_ns]:
+            return old_info
+        if file_crc32(source.path) == old_info.CRC:
+            return old_info
+        return None
+
+
+class BrushsetZipFile(zipfile.ZipFile):
+    """ZipFile that can also append members whose data is already compressed."""
+
+    def write_compressed(self, zinfo, chunks):
+        """Append a member from pre-compressed data.
+
+        Args:
+            zinfo: ZipInfo with ``compress_type``, ``CRC``, ``file_size`` and
+                ``compress_size`` already filled in.
+            chunks: Bytes object or iterable of bytes holding the compressed payload.
+        """
+        if isinstance(chunks, bytes | bytearray | memoryview):
+            chunks = (chunks,)
+
+        with self._lock:
+            if self._writing:
+                raise ValueError("Can't write to ZIP archive while an open writing handle exists")
+            if zinfo.compress_type == zipfile.ZIP_LZMA:
+                # Compressed data includes an end-of-stream (EOS) marker
+                zinfo.flag_bits |= 0x02
+            if not zinfo.external_attr:
+                zinfo.external_attr = 0o600 << 16
+
+            self.fp.seek(self.start_dir)
+            zinfo.header_offset = self.fp.tell()
+            self._writecheck(zinfo)
+            self._didModify = True
+
+            self.fp.write(zinfo.FileHeader())
+            for chunk in chunks:
+                self.fp.write(chunk)
+
+            self.filelist.append(zinfo)
+            self.NameToInfo[zinfo.filename] = zinfo
+            self.start_dir = self.fp.tell()
+
+
+@dataclass
+class WriteSummary:
+    """Totals for the members written by write_members."""
+
+    file_count: int = 0
+    input_bytes: int = 0
+    reused_count: int = 0
+
+
+def write_members(  # noqa: PLR0915 - flush_one shares the window and totals
+    zipf, sources, policy, *, threads=1, reuse=None, check_cancelled=None, timings=None
+):
+    """Compress sources concurrently and write them in source order.
+
+    ``sources`` is consumed lazily, so a scanner can feed the archive directly. At most
+    ``threads * 2`` compressed members are held in memory at once; members above
+    STREAM_THRESHOLD are written through ``zipf.write`` when their turn comes. With a
+    single thread, members are compressed one at a time as they are written.
+
+    Args:
+        zipf: BrushsetZipFile opened for writing.
+        sources: Iterable of SourceFile objects.
+        policy: CompressionPolicy choosing the method and level of new members.
+        threads: Number of compression threads.
+        reuse: Optional ReuseIndex whose matching members are copied across as-is instead
+            of compressing the source again.
+        check_cancelled: Optional callable invoked before each member, expected to raise
+            to abort the write.
+        timings: Optional StageTimings to accumulate read, compress and write time into.
+            Streamed members are read, compressed and written in one pass, so all of their
+            time is counted as compress.
+
+    Returns:
+        WriteSummary with the number of files and bytes written.
+    """
+    summary = WriteSummary()
+    timings = timings or StageTimings()
+    window = deque()
+    # Checked once so suppressed per-member records cost a single branch
+    debug = logger.isEnabledFor(logging.DEBUG)
+
+    def flush_one():
+        if check_cancelled:
+            check_cancelled()
+        start = time.perf_counter()
+        source, kind, payload = window.popleft()
+        if kind == "reuse":
+            with timings.measure("write", source.arcname):
+                zipf.write_compressed(copy_info(payload), iter_raw_member(reuse.old_zip, payload))
+            summary.reused_count += 1
+        elif kind == "stream":
+            with timings.measure("compress", source.arcname):
+                compress_type = policy.method_for(source.arcname, path=source.path)
+                zipf.write(
+                    source.path, source.arcname, compress_type, policy.level_for(compress_type)
+                )
+        else:
+            if kind == "inline":
+                member = compress_file(source, policy, timings)
+            else:
+                # Time spent here means the writer is starved by the compression threads
+                with timings.span("wait", file=source.arcname):
+                    member = payload.result()
+            with timings.measure("write", source.arcname):
+                zipf.write_compressed(*member)
+        summary.file_count += 1
+        summary.input_bytes += source.size
+        if debug:
+            logger.debug("Wrote %s", source.arcname, extra={"data": {
+                "kind": kind,
+                "bytes": source.size,
+                "seconds": round(time.perf_counter() - start, 6),
+            }})
+
+    with ThreadPoolExecutor(max_workers=max(1, threads)) as executor:
+        try:
+            for source in sources:
+                if check_cancelled:
+                    check_cancelled()
+                old_info = None
+                if reuse:
+                    with timings.measure("read", source.arcname):
+                        old_info = reuse.lookup(source)
+                if old_info is not None:
+                    window.append((source, "reuse", old_info))
+                elif source.size > STREAM_THRESHOLD:
+                    window.append((source, "stream", None))
+                elif threads <= 1:
+                    window.append((source, "inline", None))
+                else:
+                    future = executor.submit(compress_file, source, policy, timings)
+                    window.append((source, "compress", future))
+                if len(window) >= max(1, threads) * 2:
+                    flush_one()
+            while window:
+                flush_one()
+        except BaseException:
+            # Don't compress members that will never be written
+            executor.shutdown(cancel_futures=True)
+            raise
+
+    return summary
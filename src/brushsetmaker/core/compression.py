@@ -0,0 +1,119 @@
+"""Per-member compression policy for brushset archives.
+
+Brushsets are mostly PNG textures that are already compressed, so deflating them again
+costs CPU for next to no size gain. The policy decides, member by member, whether to use
+the configured method or store the data as-is.
+"""
+
+from pathlib import Path, PurePath
+import zipfile
+import zlib
+
+# Formats that are already compressed and are always stored
+STORED_EXTENSIONS = frozenset({
+    ".png", ".jpg", ".jpeg", ".gif", ".webp", ".heic", ".heif",
+    ".zip", ".brushset", ".brush", ".swatches", ".gz", ".bz2", ".xz",
+    ".mp4", ".mov", ".m4a", ".mp3",
+})
+
+# Formats that always compress well and are never probed
+COMPRESSED_EXTENSIONS = frozenset({
+    ".archive", ".plist", ".json", ".xml", ".txt", ".md", ".svg", ".csv",
+})
+
+# How much of a file the trial compression looks at, and the ratio above which the
+# data is treated as incompressible
+PROBE_SIZE = 64 * 1024
+PROBE_RATIO = 0.95
+
+POLICY_MODES = ("auto", "extensions", "off")
+
+
+def effective_level(compress_type, compresslevel):
+    """Clamp a 0-9 level to what the given ZIP method accepts."""
+    if compresslevel is None:
+        return None
+    if compress_type == zipfile.ZIP_BZIP2:
+        return max(1, compresslevel)
+    if compress_type == zipfile.ZIP_DEFLATED:
+        return compresslevel
+    # Stored has no level and zipfile ignores it for LZMA
+    return None
+
+
+def is_incompressible(head):
+    """Trial-compress the first block of a file and report whether it is worth deflating."""
+    if not head:
+        return False
+    sample = head[:PROBE_SIZE]
+    return len(zlib.compress(sample, 1)) > len(sample) * PROBE_RATIO
+
+
+class CompressionPolicy:
+    """Chooses the compression method and level for each archive member."""
+
+    def __init__(self, compress_type=zipfile.ZIP_DEFLATED, compresslevel=None, mode="auto"):
+        """Initialize the policy.
+
+        Args:
+            compress_type: Method used for members that are worth compressing.
+            compresslevel: Level for that method, 0-9.
+            mode: ``auto`` combines extension rules with a trial compression of the first
+                block, ``extensions`` only uses extension rules, ``off`` compresses
+                everything with ``compress_type``.
+        """
+        self.compress_type = compress_type
+        self.compresslevel = effective_level(compress_type, compresslevel)
+        self.mode = mode if mode in POLICY_MODES else "auto"
+
+    @property
+    def active(self):
+        """Whether the policy can ever choose something other than ``compress_type``."""
+        return self.mode != "off" and self.compress_type != zipfile.ZIP_STORED
+
+    def allowed_methods(self):
+        """Return every method this policy may pick, for validating reused members."""
+        if self.active:
+            return {self.compress_type, zipfile.ZIP_STORED}
+        return {self.compress_type}
+
+    def needs_probe(self, name):
+        """Whether ``method_for`` has to look at a member's contents to decide."""
+        if not self.active or self.mode != "auto":
+            return False
+        suffix = PurePath(name).suffix.lower()
+        return suffix not in STORED_EXTENSIONS and suffix not in COMPRESSED_EXTENSIONS
+
+    def method_for(self, name, head=None, path=None):
+        """Return the ZIP method to use for a member.
+
+        Args:
+            name: Member name or path, used for the extension rules.
+            head: The first bytes of the file, if already read.
+            path: File to read the first block from when ``head`` is not given.
+        """
+        if not self.active:
+            return self.compress_type
+
+        suffix = PurePath(name).suffix.lower()
+        if suffix in STORED_EXTENSIONS:
+            return zipfile.ZIP_STORED
+        if suffix in COMPRESSED_EXTENSIONS or self.mode == "extensions":
+            return self.compress_type
+
+        if head is None and path is not None:
+            with Path(path).open("rb") as f:
+                head = f.read(PROBE_SIZE)
+        if is_incompressible(head):
+            return zipfile.ZIP_STORED
+        return self.compress_type
+
+    def level_for(self, compress_type):
+        """Return the level to pass along with ``compress_type``."""
+        if compress_type == self.compress_type:
+            return self.compresslevel
+        return None
+
+    def describe(self):
+        """Return the method, level and mode as a string, equal only for equal policies."""
+        return f"method={self.compress_type} level={self.compresslevel} policy={self.mode}"
@@ -0,0 +1,156 @@
+"""Duplicate brush detection across a bulk root.
+
+Brush folders are compared in tiers so that I/O stays proportional to the number of likely
+duplicates rather than to the size of the library:
+
+1. Group by total size and file count, which only needs the stat results from the scan.
+2. Within each group, hash the first and last block of every file.
+3. Only where those still agree, and some file is too large for the blocks to cover it
+   completely, hash the full contents.
+"""
+
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+import hashlib
+import logging
+from pathlib import Path
+
+from .scanner import iter_source_files
+
+logger = logging.getLogger(__name__)
+
+BLOCK_SIZE = 64 * 1024
+DUPLICATE_ACTIONS = ("warn", "fail")
+
+
+@dataclass
+class BrushFolder:
+    """A brush folder inside a brushset folder, with its files from the scan."""
+
+    brushset: str
+    name: str
+    files: list = field(default_factory=list)  # (relative path, size, absolute path)
+
+    @property
+    def label(self):
+        """Return ``<brushset>/<brush>`` for reports."""
+        return f"{self.brushset}/{self.name}"
+
+    @property
+    def size(self):
+        """Total size of the brush folder's files."""
+        return sum(size for _, size, _ in self.files)
+
+
+@dataclass
+class DuplicateGroup:
+    """Brush folders with identical contents."""
+
+    size: int
+    brushes: list[str]
+
+    @property
+    def wasted_bytes(self):
+        """Bytes taken up by every copy beyond the first."""
+        return self.size * (len(self.brushes) - 1)
+
+
+def collect_brushes(brushset_folders, include_hidden=False):
+    """Scan brushset folders and return their brush folders, each with its files."""
+    brushes = []
+    for folder in brushset_folders:
+        by_name = {}
+        for source in iter_source_files(folder, include_hidden):
+            name, sep, rest = source.arcname.partition("/")
+            if not sep:
+                continue
+            if name not in by_name:
+                by_name[name] = BrushFolder(Path(folder).name, name)
+            by_name[name].files.append((rest, source.size, source.path))
+        brushes.extend(by_name.values())
+    return brushes
+
+
+def _partial_digest(brush):
+    """Hash the relative paths, sizes and first and last block of each file."""
+    digest = hashlib.blake2b(digest_size=16)
+    for relpath, size, path in sorted(brush.files):
+        digest.update(f"{relpath}\0{size}\0".encode())
+        with Path(path).open("rb") as f:
+            digest.update(f.read(BLOCK_SIZE))
+            if size > BLOCK_SIZE:
+                f.seek(max(BLOCK_SIZE, size - BLOCK_SIZE))
+                digest.update(f.read(BLOCK_SIZE))
+    return digest.hexdigest()
+
+
+def _full_digest(brush):
+    """Hash the relative paths and full contents of each file."""
+    digest = hashlib.blake2b(digest_size=16)
+    for relpath, size, path in sorted(brush.files):
+        digest.update(f"{relpath}\0{size}\0".encode())
+        with Path(path).open("rb") as f:
+            while chunk := f.read(1024 * 1024):
+                digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _covered_by_blocks(brush):
+    """Whether the partial hash already read every byte of the brush folder."""
+    return all(size <= 2 * BLOCK_SIZE for _, size, _ in brush.files)
+
+
+def _refine(groups, digest_fn, executor):
+    """Split candidate groups by ``digest_fn``, keeping only subgroups with duplicates."""
+    refined = []
+    for group in groups:
+        by_digest = defaultdict(list)
+        for brush, digest in zip(group, executor.map(digest_fn, group), strict=True):
+            by_digest[digest].append(brush)
+        refined.extend(subgroup for subgroup in by_digest.values() if len(subgroup) > 1)
+    return refined
+
+
+def find_duplicates(brushset_folders, include_hidden=False, threads=4):
+    """Find brush folders with identical contents across ``brushset_folders``.
+
+    Args:
+        brushset_folders: Brushset source folders to compare, typically every subfolder
+            of a bulk root.
+        include_hidden: Whether hidden files count towards a brush folder's contents.
+        threads: Number of threads hashing files.
+
+    Returns:
+        List of DuplicateGroup, the most wasteful first.
+    """
+    brushes = collect_brushes(brushset_folders, include_hidden)
+    by_size = defaultdict(list)
+    for brush in brushes:
+        by_size[(brush.size, len(brush.files))].append(brush)
+    candidates = [group for group in by_size.values() if len(group) > 1]
+    size_candidates = sum(len(group) for group in candidates)
+
+    with ThreadPoolExecutor(max_workers=max(1, threads)) as executor:
+        candidates = _refine(candidates, _partial_digest, executor)
+        partial_candidates = sum(len(group) for group in candidates)
+        confirmed = [group for group in candidates if all(map(_covered_by_blocks, group))]
+        uncertain = [group for group in candidates if not all(map(_covered_by_blocks, group))]
+        confirmed.extend(_refine(uncertain, _full_digest, executor))
+
+    groups = [
+        DuplicateGroup(group[0].size, sorted(brush.label for brush in group))
+        for group in confirmed
+    ]
+    groups.sort(key=lambda group: (-group.wasted_bytes, group.brushes))
+    logger.info(
+        "Found %d duplicate brush groups",
+        len(groups),
+        extra={"data": {
+            "brushes": len(brushes),
+            "size_candidates": size_candidates,
+            "partial_candidates": partial_candidates,
+            "wasted_bytes": sum(group.wasted_bytes for group in groups),
+        }},
+    )
+    return groups
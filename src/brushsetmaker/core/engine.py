@@ -0,0 +1,744 @@
+"""UI-free packaging engine for BrushsetMaker.
+
+Everything needed to turn a folder into a ``.brushset`` archive lives here so it can be
+driven from the Toga handlers, the command line or a batch job without a display server.
+"""
+
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from contextlib import ExitStack
+from dataclasses import dataclass, field, replace
+import itertools
+import logging
+import multiprocessing
+import os
+from pathlib import Path
+import shutil
+import time
+import zipfile
+
+from .archive import (
+    BrushsetZipFile,
+    ReuseIndex,
+    policy_comment,
+    write_members,
+    write_plist_member,
+    written_with,
+)
+from .compression import CompressionPolicy
+from .duplicates import find_duplicates
+from .journal import BulkJournal
+from .log import configure_worker_logging, start_queue_listener
+from .manifest import BuildManifest, is_up_to_date, make_entry, snapshot_files
+from .metadata import dump_metadata, generate_metadata, load_metadata, save_metadata
+from .report import StageTimings
+from .scanner import has_entries, iter_source_files
+from .trace import TraceRecorder
+from .validation import PLIST_NAME, validate_brushset
+
+logger = logging.getLogger(__name__)
+
+
+class PackagingError(Exception):
+    """Raised when a folder cannot be packaged into a brushset."""
+
+
+class EmptyFolderError(PackagingError):
+    """Raised when a folder contains no files to package."""
+
+
+class PackagingCancelledError(PackagingError):
+    """Raised when a packaging job is cancelled before it finishes."""
+
+
+class DuplicateBrushesError(PackagingError):
+    """Raised when duplicate brushes are found and the run is set to fail on them."""
+
+    def __init__(self, groups):
+        """Store the DuplicateGroup list that caused the failure."""
+        super().__init__(f"Found {len(groups)} groups of duplicate brushes")
+        self.groups = groups
+
+
+@dataclass
+class PackagingOptions:
+    """Settings that control how brushsets are packaged."""
+
+    compression_method: int = zipfile.ZIP_DEFLATED
+    compression_level: int = 6
+    compression_policy: str = "auto"
+    include_hidden_files: bool = False
+    skip_hidden_folders: bool = True
+    warn_empty_folders: bool = True
+    stop_on_error: bool = False
+    workers: int = 1
+    compression_threads: int = 1
+    incremental: bool = False
+    hash_contents: bool = False
+    reuse_entries: bool = True
+    trace: bool = False
+    validate_structure: bool = False
+    verify_uuids: bool = False
+    check_duplicates: bool = False
+    duplicate_action: str = "warn"
+    create_plist: bool = False
+    populate_brushes: bool = False
+    name_template: str = "{folder_name}"
+    plist_format: str = "xml"
+    write_plist_to_source: bool = False
+
+    @classmethod
+    def from_settings(cls, settings):
+        """Build packaging options from a Settings instance."""
+        return cls(
+            compression_method=settings.get_compression_method(),
+            compression_level=settings.get_compression_level(),
+            compression_policy=settings.get("compression_policy", "auto"),
+            include_hidden_files=settings.get("include_hidden_files", False),
+            skip_hidden_folders=settings.get("skip_hidden_folders", True),
+            warn_empty_folders=settings.get("warn_empty_folders", True),
+            stop_on_error=settings.get("error_handling", "continue") == "stop",
+            workers=resolve_workers(settings.get("bulk_workers", 0)),
+            compression_threads=resolve_workers(settings.get("compression_threads", 0)),
+            incremental=settings.get("incremental_builds", True),
+            hash_contents=settings.get("manifest_hash_contents", False),
+            reuse_entries=settings.get("reuse_compressed_entries", True),
+            trace=settings.get("trace_packaging", False),
+            validate_structure=settings.get("validate_brush_structure", False),
+            verify_uuids=settings.get("verify_uuid_format", True),
+            check_duplicates=settings.get("check_duplicate_brushes", False),
+            duplicate_action=settings.get("duplicate_action", "warn"),
+            create_plist=settings.get("auto_create_plist", True),
+            populate_brushes=settings.get("auto_populate_brushes", True),
+            name_template=str(settings.get("default_name_template", "{folder_name}")),
+            write_plist_to_source=settings.get("write_plist_to_source", False),
+            plist_format=settings.get("plist_format", "xml"),
+        )
+
+    def fingerprint(self):
+        """Return the options that affect archive contents, for change detection."""
+        return {
+            "compression_method": self.compression_method,
+            "compression_level": self.compression_level,
+            "compression_policy": self.compression_policy,
+            "include_hidden_files": self.include_hidden_files,
+            "metadata": [
+                self.create_plist, self.populate_brushes, self.name_template, self.plist_format
+            ],
+        }
+
+
+@dataclass
+class BrushsetResult:
+    """Outcome of packaging a single folder."""
+
+    folder: Path
+    output: Path
+    file_count: int = 0
+    input_bytes: int = 0
+    output_bytes: int = 0
+    reused_count: int = 0
+    error: str | None = None
+    empty: bool = False
+    skipped: bool = False
+    manifest_entry: dict | None = None
+    seconds: float = 0.0
+    timings: dict = field(default_factory=dict)
+    trace_events: list = field(default_factory=list)
+    issues: list = field(default_factory=list)
+
+    @property
+    def ok(self):
+        """Whether the brushset was written successfully."""
+        return self.error is None
+
+
+@dataclass
+class BulkResult:
+    """Outcome of packaging every subfolder of a root folder."""
+
+    root: Path
+    results: list[BrushsetResult] = field(default_factory=list)
+    stopped: bool = False
+    cancelled: bool = False
+    seconds: float = 0.0
+    trace_events: list = field(default_factory=list)
+    duplicates: list = field(default_factory=list)
+
+    @property
+    def processed_count(self):
+        """Number of brushsets written successfully."""
+        return sum(1 for result in self.results if result.ok and not result.skipped)
+
+    @property
+    def skipped_count(self):
+        """Number of brushsets left alone because nothing changed."""
+        return sum(1 for result in self.results if result.skipped)
+
+    @property
+    def error_count(self):
+        """Number of folders that failed or were reported as empty."""
+        return sum(1 for result in self.results if not result.ok)
+
+    @property
+    def errors(self):
+        """Human readable error lines, one per failed folder."""
+        return [f"{result.folder.name}: {result.error}" for result in self.results if not result.ok]
+
+
+def resolve_workers(workers):
+    """Turn a worker count setting into a positive number, where 0 means one per CPU."""
+    workers = int(workers or 0)
+    if workers <= 0:
+        return os.cpu_count() or 1
+    return workers
+
+
+def unique_output_path(path):
+    """Return a path next to ``path`` that does not exist yet, adding a numeric suffix."""
+    path = Path(path)
+    counter = 1
+    candidate = path
+    while candidate.exists():
+        candidate = path.parent / f"{path.stem}_{counter}{path.suffix}"
+        counter += 1
+    return candidate
+
+
+def backup_existing(path):
+    """Copy an existing output to ``<name>.brushset.backup`` before it is overwritten."""
+    path = Path(path)
+    if not path.exists():
+        return None
+    backup_path = path.with_suffix(path.suffix + ".backup")
+    shutil.copy2(path, backup_path)
+    return backup_path
+
+
+class BrushsetEngine:
+    """Scans, filters, compresses and writes brushset archives."""
+
+    def __init__(self, options=None, cancel_event=None):
+        """Initialize the engine.
+
+        Args:
+            options: PackagingOptions, defaults are used when omitted.
+            cancel_event: Optional ``threading.Event``-like object. Once it is set, running
+                builds stop at the next member and remove their partial archive.
+        """
+        self.options = options or PackagingOptions()
+        self.cancel_event = cancel_event
+        self._journal = None
+        self._tracer = None
+
+    def cancelled(self):
+        """Whether cancellation has been requested."""
+        return self.cancel_event is not None and self.cancel_event.is_set()
+
+    def check_cancelled(self):
+        """Raise PackagingCancelledError if cancellation has been requested."""
+        if self.cancelled():
+            raise PackagingCancelledError("Cancelled")
+
+    def iter_source_files(self, folder):
+        """Lazily yield a SourceFile for every file that belongs in the archive."""
+        return iter_source_files(folder, self.options.include_hidden_files)
+
+    def has_files(self, folder):
+        """Check whether a folder contains anything at all."""
+        return has_entries(folder)
+
+    def find_subfolders(self, root):
+        """Return the subfolders of ``root`` that should be packaged."""
+        subdirs = []
+        for d in sorted(Path(root).iterdir()):
+            if not d.is_dir():
+                continue
+            if self.options.skip_hidden_folders and d.name.startswith((".", "_")):
+                continue
+            subdirs.append(d)
+        return subdirs
+
+    def build(  # noqa: PLR0915 - scan, write, plist and validation share one pass
+        self, folder, output_path, *, sources=None, previous_files=None, reuse=None, timings=None
+    ):
+        """Package ``folder`` into ``output_path`` and return a BrushsetResult.
+
+        The archive is written next to ``output_path`` and moved into place once complete.
+        If an archive already exists there, members whose sources are unchanged are copied
+        across still compressed rather than being compressed again. With
+        ``options.create_plist`` or ``options.populate_brushes`` set, brushset.plist is
+        generated from the scanned member names and written into the archive, in
+        ``options.plist_format``, in place of the folder's own copy; the folder itself is
+        only updated with ``options.write_plist_to_source``.
+
+        Args:
+            folder: Folder to package.
+            output_path: Archive to write.
+            sources: Iterable of SourceFile objects, scanned lazily here when omitted.
+            previous_files: Manifest file records from the last build, used to trust
+                unchanged members without re-reading them.
+            reuse: Override ``options.reuse_entries`` for this build.
+            timings: StageTimings to accumulate into, a fresh one is used when omitted.
+                The totals end up in ``result.timings`` either way, and with
+                ``options.trace`` set the spans end up in ``result.trace_events``.
+
+        Raises:
+            EmptyFolderError: If the folder has no files to package.
+            PackagingCancelledError: If the cancel event was set while writing.
+        """
+        start = time.perf_counter()
+        folder = Path(folder)
+        output_path = Path(output_path)
+        result = BrushsetResult(folder=folder, output=output_path)
+        timings = timings or StageTimings(TraceRecorder() if self.options.trace else None)
+        self.check_cancelled()
+        if reuse is None:
+            reuse = self.options.reuse_entries
+
+        if sources is None:
+            sources = timings.timed_iter(self.iter_source_files(folder), "scan")
+        sources = _require_sources(sources)
+        validating = self.options.validate_structure or self.options.verify_uuids
+        plist_path = folder / PLIST_NAME
+        has_plist = plist_path.is_file()
+        generating = self._generates_plist(has_plist)
+        # Validation and metadata reuse the scan: member names are collected as they are written
+        arcnames = []
+        if validating or generating:
+            sources = _collect_arcnames(sources, arcnames)
+        if generating:
+            sources = (source for source in sources if source.arcname != PLIST_NAME)
+        plist_data = metadata = None
+
+        partial_path = output_path.with_name(output_path.name + ".partial")
+        method = self.options.compression_method
+        policy = CompressionPolicy(
+            method, self.options.compression_level, self.options.compression_policy
+        )
+        try:
+            with ExitStack() as stack:
+                stack.enter_context(timings.span("build", folder=folder.name))
+                reuse_index = None
+                if reuse and output_path.is_file():
+                    reuse_index = _open_reuse_index(stack, output_path, policy, previous_files)
+
+                zipf = stack.enter_context(BrushsetZipFile(partial_path, "w", method))
+                summary = write_members(
+                    zipf,
+                    sources,
+                    policy,
+                    threads=self.options.compression_threads,
+                    reuse=reuse_index,
+                    check_cancelled=self.check_cancelled,
+                    timings=timings,
+                )
+                if generating:
+                    with timings.measure("plist"):
+                        metadata = self._generate_metadata(folder, arcnames, has_plist)
+                        plist_data = dump_metadata(metadata, self.options.plist_format)
+                        write_plist_member(zipf, plist_data, policy)
+                zipf.comment = policy_comment(policy)
+            partial_path.replace(output_path)
+        except BaseException:
+            partial_path.unlink(missing_ok=True)
+            raise
+
+        result.file_count = summary.file_count
+        result.input_bytes = summary.input_bytes
+        if plist_data is not None:
+            result.file_count += 1
+            result.input_bytes += len(plist_data)
+            if self.options.write_plist_to_source and save_metadata(
+                plist_path, metadata, self.options.plist_format
+            ):
+                logger.info("Updated %s", plist_path)
+        result.reused_count = summary.reused_count
+        result.output_bytes = output_path.stat().st_size
+        if validating:
+            result.issues = self._validate(folder, arcnames, metadata, timings)
+        result.timings = timings.as_dict()
+        result.seconds = time.perf_counter() - start
+        if timings.tracer:
+            result.trace_events = timings.tracer.events
+        logger.info(
+            "Built %s",
+            output_path.name,
+            extra={"data": {
+                "folder": str(folder),
+                "files": result.file_count,
+                "reused": result.reused_count,
+                "input_bytes": result.input_bytes,
+                "output_bytes": result.output_bytes,
+                "seconds": round(result.seconds, 4),
+                "stages": {stage: round(sec, 4) for stage, sec in result.timings.items()},
+            }},
+        )
+        return result
+
+    def _generates_plist(self, has_plist):
+        """Whether brushset.plist is generated rather than copied from the folder."""
+        if has_plist:
+            # Converting to binary means the folder's own plist can't be copied as-is
+            return self.options.populate_brushes or self.options.plist_format != "xml"
+        return self.options.create_plist
+
+    def _validate(self, folder, arcnames, metadata, timings):
+        """Validate ``folder`` from its member names, logging and returning the issues."""
+        with timings.measure("validate"):
+            issues = validate_brushset(
+                folder,
+                arcnames,
+                check_structure=self.options.validate_structure,
+                check_uuids=self.options.verify_uuids,
+                metadata=metadata,
+            )
+        if issues:
+            logger.warning(
+                "%s has %d validation issues",
+                folder.name,
+                len(issues),
+                extra={"data": {"issues": [str(issue) for issue in issues]}},
+            )
+        return issues
+
+    def _generate_metadata(self, folder, arcnames, has_plist):
+        """Create or refresh the metadata for ``folder`` from its scanned member names."""
+        existing = None
+        if has_plist:
+            existing = load_metadata(folder / PLIST_NAME)
+            if existing is None:
+                logger.warning("Replacing unreadable %s in %s", PLIST_NAME, folder.name)
+        return generate_metadata(
+            folder.name,
+            arcnames,
+            existing,
+            populate=self.options.populate_brushes,
+            name_template=self.options.name_template,
+        )
+
+    def build_bulk(self, root, output_dir=None, progress=None, resume=False, only=None):
+        """Package every subfolder of ``root`` into ``<subdir>.brushset``.
+
+        Subfolders are packaged on a pool of worker processes when ``options.workers`` is
+        greater than one. Progress, errors, stop-on-error and cancellation are always handled
+        here, in the calling process. With ``options.incremental`` set, folders whose inputs,
+        options and output match the build manifest are skipped. Every finished folder is
+        checkpointed to a journal so an interrupted run can be resumed. With ``options.trace``
+        set, the spans from every worker are collected in ``bulk.trace_events``.
+
+        Args:
+            root: Folder whose subfolders are packaged.
+            output_dir: Where to write archives, defaults to ``root``.
+            progress: Optional callable ``progress(done, total, folder)`` invoked after each
+                folder finishes.
+            resume: Skip folders the previous, interrupted run already finished, as long as
+                their outputs are intact.
+            only: Optional collection of subfolder names to package, leaving the others
+                alone. Partial runs like this are not journaled or checked for duplicates.
+
+        Raises:
+            DuplicateBrushesError: If ``options.check_duplicates`` is set, duplicates are
+                found and ``options.duplicate_action`` is "fail". Nothing is packaged.
+        """
+        start = time.perf_counter()
+        root = Path(root)
+        output_dir = Path(output_dir) if output_dir else root
+        bulk = BulkResult(root=root)
+        manifest = BuildManifest.for_output_dir(output_dir) if self.options.incremental else None
+        jobs = [
+            (
+                subdir,
+                output_dir / f"{subdir.name}.brushset",
+                manifest.get(subdir.name) if manifest else None,
+            )
+            for subdir in self.find_subfolders(root)
+            if only is None or subdir.name in only
+        ]
+
+        if self.options.check_duplicates and only is None:
+            bulk.duplicates = find_duplicates(
+                [job[0] for job in jobs],
+                self.options.include_hidden_files,
+                threads=self.options.compression_threads,
+            )
+            if bulk.duplicates and self.options.duplicate_action == "fail":
+                raise DuplicateBrushesError(bulk.duplicates)
+
+        # A partial run must not clobber the journal of an interrupted full run
+        journal = BulkJournal.for_job(root, output_dir) if only is None else None
+        jobs_to_run = _skip_completed(jobs, journal, bulk) if resume and journal else jobs
+
+        logger.info(
+            "Bulk run of %s started",
+            root,
+            extra={"data": {
+                "folders": len(jobs),
+                "to_build": len(jobs_to_run),
+                "workers": self.options.workers,
+                "threads": self.options.compression_threads,
+                "incremental": self.options.incremental,
+                "resume": resume,
+            }},
+        )
+        self._journal = journal
+        self._tracer = TraceRecorder() if self.options.trace else None
+        if journal:
+            journal.start(root, resume=resume)
+        finished = False
+        try:
+            with ExitStack() as stack:
+                if self._tracer:
+                    stack.enter_context(self._tracer.span("bulk", root=root.name))
+                if self.options.workers > 1 and len(jobs_to_run) > 1:
+                    self._build_bulk_parallel(jobs_to_run, bulk, progress)
+                else:
+                    self._build_bulk_serial(jobs_to_run, bulk, progress)
+            finished = not self.cancelled() and not bulk.stopped and not bulk.error_count
+        finally:
+            if journal:
+                journal.close(finished=finished)
+            self._journal = None
+            if manifest is not None:
+                for result in bulk.results:
+                    manifest.set(result.folder.name, result.manifest_entry)
+                manifest.save()
+            if self._tracer:
+                bulk.trace_events = self._tracer.events
+                self._tracer = None
+
+        bulk.cancelled = self.cancelled()
+        bulk.seconds = time.perf_counter() - start
+        logger.info(
+            "Bulk run of %s %s",
+            root,
+            "cancelled" if bulk.cancelled else "stopped" if bulk.stopped else "finished",
+            extra={"data": {
+                "built": bulk.processed_count,
+                "unchanged": bulk.skipped_count,
+                "errors": bulk.error_count,
+                "seconds": round(bulk.seconds, 4),
+            }},
+        )
+        # Completion order depends on scheduling; keep reports in folder order
+        order = {job[0]: idx for idx, job in enumerate(jobs)}
+        bulk.results.sort(key=lambda result: order[result.folder])
+        return bulk
+
+    def _build_bulk_serial(self, jobs, bulk, progress):
+        """Package bulk jobs one after another in this process."""
+        for idx, (subdir, output_path, entry) in enumerate(jobs, 1):
+            if self.cancelled():
+                break
+            result = self._build_one(subdir, output_path, entry)
+            if self._record(bulk, result, subdir, progress, done=idx, total=len(jobs)):
+                break
+
+    def _build_bulk_parallel(self, jobs, bulk, progress):
+        """Package bulk jobs concurrently on a process pool."""
+        workers = min(self.options.workers, len(jobs))
+        jobs_out = {subdir: output_path for subdir, output_path, _ in jobs}
+        # Split the compression threads between processes so the machine isn't oversubscribed
+        options = replace(
+            self.options, compression_threads=max(1, self.options.compression_threads // workers)
+        )
+        # Workers can't see our cancel event, so mirror it into one they inherit
+        context = multiprocessing.get_context()
+        worker_cancel = context.Event()
+        # Workers hand their log records to this process, the only one writing the log file
+        log_level = logging.getLogger("brushsetmaker").getEffectiveLevel()
+        # The "none" logging level sits above CRITICAL; workers then have nothing to send
+        logging_off = log_level > logging.CRITICAL
+        log_queue = None if logging_off else context.Queue()
+        executor = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=context,
+            initializer=_init_worker,
+            initargs=(worker_cancel, log_queue, log_level),
+        )
+        with ExitStack() as stack:
+            if log_queue is not None:
+                stack.callback(start_queue_listener(log_queue).stop)
+            stack.enter_context(executor)
+            pending = {
+                executor.submit(_build_in_worker, options, subdir, output_path, entry): subdir
+                for subdir, output_path, entry in jobs
+            }
+            done_count = 0
+            while pending:
+                finished, _ = wait(pending, timeout=0.2, return_when=FIRST_COMPLETED)
+                if self.cancelled() and not worker_cancel.is_set():
+                    worker_cancel.set()
+                    for queued in pending:
+                        queued.cancel()
+                for future in finished:
+                    subdir = pending.pop(future)
+                    done_count += 1
+                    try:
+                        result = future.result()
+                    except Exception as e:
+                        logger.error("Worker failed on %s: %s", subdir.name, e, exc_info=e)
+                        result = BrushsetResult(folder=subdir, output=jobs_out[subdir], error=str(e))
+                    if self._record(
+                        bulk, result, subdir, progress, done=done_count, total=len(jobs)
+                    ):
+                        # Let running folders finish but drop everything still queued
+                        for queued in pending:
+                            queued.cancel()
+                        pending = {f: d for f, d in pending.items() if not f.cancelled()}
+                if worker_cancel.is_set():
+                    pending = {f: d for f, d in pending.items() if not f.cancelled()}
+
+    def _record(self, bulk, result, subdir, progress, *, done, total):
+        """Store a bulk result and report progress, returning True when the run should stop."""
+        # Folders interrupted by a cancel come back as None and must be redone on resume
+        if self._journal and (result is not None or not self.cancelled()):
+            self._journal.record(result, subdir.name)
+        if result is not None:
+            bulk.results.append(result)
+            if self._tracer:
+                # Worker spans are merged into the run trace rather than kept per result
+                self._tracer.extend(result.trace_events)
+                result.trace_events = []
+        if progress:
+            progress(done, total, subdir)
+        failed = result is not None and not result.ok and not result.empty
+        if failed and self.options.stop_on_error:
+            bulk.stopped = True
+        return bulk.stopped
+
+    def _build_one(self, subdir, output_path, entry=None):
+        """Package one bulk subfolder, capturing errors and stage timings in the result."""
+        start = time.perf_counter()
+        timings = StageTimings(TraceRecorder() if self.options.trace else None)
+        with timings.span("brushset", folder=subdir.name):
+            result = self._package_one(subdir, output_path, entry, timings)
+        if result is not None:
+            result.timings = timings.as_dict()
+            result.seconds = time.perf_counter() - start
+            if timings.tracer:
+                result.trace_events = timings.tracer.events
+        return result
+
+    def _package_one(self, subdir, output_path, entry, timings):
+        """Package one bulk subfolder, returning None if it was cancelled or ignored."""
+        try:
+            if self.options.incremental:
+                return self._package_incremental(subdir, output_path, entry, timings)
+            return self.build(subdir, output_path, timings=timings)
+        except PackagingCancelledError:
+            logger.info("Cancelled %s", subdir.name)
+            return None
+        except EmptyFolderError as e:
+            if not self.options.warn_empty_folders:
+                return None
+            logger.warning("Skipped empty folder %s", subdir.name)
+            return BrushsetResult(folder=subdir, output=output_path, error=str(e), empty=True)
+        except Exception as e:
+            logger.error("Failed to package %s: %s", subdir.name, e, exc_info=True)
+            return BrushsetResult(folder=subdir, output=output_path, error=str(e))
+
+    def _package_incremental(self, subdir, output_path, entry, timings):
+        """Package one bulk subfolder unless the build manifest says it is unchanged."""
+        # One walk feeds both the change check and, if needed, the archive
+        with timings.measure("scan"):
+            sources = list(self.iter_source_files(subdir))
+            previous_files = entry.get("files") if entry else None
+            files = snapshot_files(sources, previous_files, self.options.hash_contents)
+        fingerprint = self.options.fingerprint()
+        if is_up_to_date(entry, files, fingerprint, output_path):
+            logger.debug("Unchanged %s", subdir.name)
+            result = BrushsetResult(
+                folder=subdir,
+                output=output_path,
+                file_count=len(files),
+                input_bytes=sum(record[0] for record in files.values()),
+                output_bytes=entry["output"][0],
+                skipped=True,
+                manifest_entry={**entry, "files": files},
+            )
+            # The archive is up to date, but the folder's problems still need reporting
+            if self.options.validate_structure or self.options.verify_uuids:
+                arcnames = list(files)
+                has_plist = (subdir / PLIST_NAME).is_file()
+                metadata = None
+                if self._generates_plist(has_plist):
+                    metadata = self._generate_metadata(subdir, arcnames, has_plist)
+                result.issues = self._validate(subdir, arcnames, metadata, timings)
+            return result
+
+        # Members can only be reused when they were written with the same options
+        same_options = bool(entry) and entry.get("settings") == fingerprint
+        result = self.build(
+            subdir,
+            output_path,
+            sources=sources,
+            previous_files=previous_files,
+            reuse=None if same_options else False,
+            timings=timings,
+        )
+        result.manifest_entry = make_entry(files, fingerprint, output_path)
+        return result
+
+
+def _open_reuse_index(stack, output_path, policy, previous_files):
+    """Open the previous archive at ``output_path`` for reuse, or return None.
+
+    The archive stays open until ``stack`` closes.
+    """
+    try:
+        old_zip = stack.enter_context(zipfile.ZipFile(output_path))
+    except (zipfile.BadZipFile, OSError) as e:
+        # A damaged previous archive only costs the reuse, not the build
+        logger.warning("Not reusing members of %s: %s", output_path.name, e)
+        return None
+    if not written_with(old_zip, policy):
+        # Members of another method, level or policy would be copied as they are, so the
+        # new settings would never take effect
+        logger.info("Not reusing members of %s: compression settings changed", output_path.name)
+        return None
+    return ReuseIndex(old_zip, policy.allowed_methods(), previous_files)
+
+
+def _skip_completed(jobs, journal, bulk):
+    """Record the jobs ``journal`` lists as finished as skipped; return the rest."""
+    completed = journal.completed()
+    for subdir, output_path, entry in jobs:
+        if subdir.name in completed:
+            bulk.results.append(BrushsetResult(
+                folder=subdir, output=output_path, skipped=True, manifest_entry=entry
+            ))
+    return [job for job in jobs if job[0].name not in completed]
+
+
+def _require_sources(sources):
+    """Return ``sources`` as an iterator, raising EmptyFolderError if it yields nothing."""
+    sources = iter(sources)
+    first = next(sources, None)
+    if first is None:
+        raise EmptyFolderError("Folder is empty")
+    return itertools.chain((first,), sources)
+
+
+def _collect_arcnames(sources, arcnames):
+    """Pass sources through unchanged, appending each member name to ``arcnames``."""
+    for source in sources:
+        arcnames.append(source.arcname)
+        yield source
+
+
+# Set by _init_worker in each pool process
+_worker_state = {}
+
+
+def _init_worker(cancel_event, log_queue=None, log_level=logging.INFO):
+    """Process pool initializer that stores the shared cancel event and sets up logging."""
+    _worker_state["cancel_event"] = cancel_event
+    if log_queue is not None:
+        configure_worker_logging(log_queue, log_level)
+    else:
+        logging.getLogger("brushsetmaker").setLevel(log_level)
+
+
+def _build_in_worker(options, subdir, output_path, entry):
+    """Process pool entry point that packages one bulk subfolder."""
+    return BrushsetEngine(options, _worker_state.get("cancel_event"))._build_one(subdir, output_path, entry)
@@ -0,0 +1,279 @@
+"""Unpack ``.brushset`` archives back into editable folders.
+
+The reverse of bulk packaging: every archive in a root folder is extracted into a
+``<name>/`` folder, several archives at a time. Members are streamed to disk in chunks,
+so memory use doesn't grow with member size. Archives are checked before anything is
+written: member names must stay inside the destination, and declared sizes and
+compression ratios must look like brushes rather than a zip bomb. ``zipfile`` never
+returns more bytes than a member declares, so the declared sizes bound what is written.
+"""
+
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
+import logging
+import os
+from pathlib import Path, PurePosixPath
+import shutil
+import stat
+import time
+import zipfile
+
+from .inspector import ArchiveError
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 1024 * 1024
+
+# Zip bomb limits; real brushsets stay far below every one of them
+MAX_MEMBERS = 100_000
+MAX_TOTAL_BYTES = 16 * 1024 ** 3
+MAX_RATIO = 200
+RATIO_CHECK_MIN_BYTES = 1024 * 1024  # tiny members legitimately compress very well
+
+
+class UnsafeArchiveError(ArchiveError):
+    """Raised when an archive would write outside its folder or looks like a zip bomb."""
+
+
+class ExtractCancelledError(ArchiveError):
+    """Raised when an extraction is cancelled before it finishes."""
+
+
+@dataclass
+class ExtractResult:
+    """Outcome of unpacking a single archive."""
+
+    archive: Path
+    output: Path
+    file_count: int = 0
+    output_bytes: int = 0
+    error: str | None = None
+    skipped: bool = False
+    seconds: float = 0.0
+
+    @property
+    def ok(self):
+        """Whether the archive was unpacked, or deliberately left alone."""
+        return self.error is None
+
+
+@dataclass
+class BulkExtractResult:
+    """Outcome of unpacking every archive in a root folder."""
+
+    root: Path
+    results: list[ExtractResult] = field(default_factory=list)
+    cancelled: bool = False
+    seconds: float = 0.0
+
+    @property
+    def processed_count(self):
+        """Number of archives unpacked."""
+        return sum(1 for result in self.results if result.ok and not result.skipped)
+
+    @property
+    def skipped_count(self):
+        """Number of archives whose folder already existed."""
+        return sum(1 for result in self.results if result.skipped)
+
+    @property
+    def error_count(self):
+        """Number of archives that could not be unpacked."""
+        return sum(1 for result in self.results if not result.ok)
+
+    @property
+    def errors(self):
+        """Human readable error lines, one per failed archive."""
+        return [
+            f"{result.archive.name}: {result.error}" for result in self.results if not result.ok
+        ]
+
+
+def find_archives(root):
+    """Return the ``.brushset`` files directly inside ``root``, in name order."""
+    return sorted(
+        path for path in Path(root).iterdir()
+        if path.suffix == ".brushset" and path.is_file() and not path.name.startswith(".")
+    )
+
+
+def safe_member_path(dest, name):
+    """Return where member ``name`` goes below ``dest``.
+
+    Raises:
+        UnsafeArchiveError: If the name is absolute or climbs out of ``dest``.
+    """
+    # Archives made on Windows sometimes use backslashes as separators
+    posix = PurePosixPath(name.replace("\\", "/"))
+    parts = [part for part in posix.parts if part not in ("", ".")]
+    if posix.is_absolute() or ".." in parts or (parts and ":" in parts[0]):
+        raise UnsafeArchiveError(f"Member {name!r} points outside the destination folder")
+    return Path(dest, *parts)
+
+
+def check_members(infolist):
+    """Reject archives whose central directory promises too much data.
+
+    Raises:
+        UnsafeArchiveError: On too many members, too many bytes in total, a member with a
+            bomb-like compression ratio, or a symlink member.
+    """
+    if len(infolist) > MAX_MEMBERS:
+        raise UnsafeArchiveError(f"Too many members ({len(infolist)})")
+    total = 0
+    for zinfo in infolist:
+        total += zinfo.file_size
+        if stat.S_ISLNK(zinfo.external_attr >> 16):
+            raise UnsafeArchiveError(f"Member {zinfo.filename!r} is a symbolic link")
+        if (
+            zinfo.file_size > RATIO_CHECK_MIN_BYTES
+            and zinfo.file_size > zinfo.compress_size * MAX_RATIO
+        ):
+            ratio = zinfo.file_size // max(1, zinfo.compress_size)
+            raise UnsafeArchiveError(f"Member {zinfo.filename!r} expands {ratio}x")
+    if total > MAX_TOTAL_BYTES:
+        raise UnsafeArchiveError(f"Archive expands to {total} bytes")
+
+
+def extract_archive(archive, dest, check_cancelled=None, overwrite=False):
+    """Extract ``archive`` into the folder ``dest``.
+
+    Members are written into a hidden ``.partial`` folder that is renamed into place once
+    everything has been extracted, so ``dest`` never holds half an archive. An existing
+    ``dest`` is only replaced, as a whole, with ``overwrite`` set.
+
+    Returns:
+        Tuple of (file count, bytes written).
+
+    Raises:
+        ArchiveError: If the archive can't be read or fails a CRC check.
+        UnsafeArchiveError: If the archive fails the safety checks.
+        ExtractCancelledError: If ``check_cancelled`` reported a cancel.
+    """
+    dest = Path(dest)
+    partial = dest.with_name(f".{dest.name}.partial")
+    shutil.rmtree(partial, ignore_errors=True)
+    file_count = written = 0
+    try:
+        with zipfile.ZipFile(archive) as zf:
+            infolist = zf.infolist()
+            check_members(infolist)
+            # Validate every name before writing anything
+            targets = [(zinfo, safe_member_path(partial, zinfo.filename)) for zinfo in infolist]
+            partial.mkdir(parents=True)
+            for zinfo, target in targets:
+                if check_cancelled and check_cancelled():
+                    raise ExtractCancelledError("Cancelled")
+                if zinfo.is_dir():
+                    target.mkdir(parents=True, exist_ok=True)
+                    continue
+                target.parent.mkdir(parents=True, exist_ok=True)
+                with zf.open(zinfo) as src, target.open("wb") as dst:
+                    shutil.copyfileobj(src, dst, CHUNK_SIZE)
+                    written += dst.tell()
+                # Keep timestamps so a later incremental repack sees unchanged files
+                mtime = time.mktime((*zinfo.date_time, 0, 0, -1))
+                os.utime(target, (mtime, mtime))
+                file_count += 1
+        if overwrite and dest.exists():
+            old = dest.with_name(f".{dest.name}.old")
+            # Left behind by an interrupted run; a folder can't be renamed onto a full one
+            shutil.rmtree(old, ignore_errors=True)
+            dest.replace(old)
+            partial.replace(dest)
+            shutil.rmtree(old, ignore_errors=True)
+        else:
+            partial.replace(dest)
+    except (OSError, zipfile.BadZipFile, RuntimeError, NotImplementedError) as e:
+        # RuntimeError and NotImplementedError: encrypted members, unsupported methods
+        shutil.rmtree(partial, ignore_errors=True)
+        raise ArchiveError(str(e)) from e
+    except BaseException:
+        shutil.rmtree(partial, ignore_errors=True)
+        raise
+    return file_count, written
+
+
+def extract_bulk(
+    root, output_dir=None, *, workers=1, overwrite=False, progress=None, cancel_event=None
+):
+    """Unpack every ``.brushset`` in ``root`` into ``<output_dir>/<name>/``.
+
+    Archives are extracted on a thread pool; decompression and file I/O release the GIL.
+
+    Args:
+        root: Folder containing the archives.
+        output_dir: Where to create the folders, defaults to ``root``.
+        workers: Number of archives extracted at once.
+        overwrite: Replace folders that already exist instead of skipping their archive.
+        progress: Optional callable ``progress(done, total, archive)``.
+        cancel_event: Optional ``threading.Event``-like object that stops the run.
+
+    Returns:
+        BulkExtractResult with one ExtractResult per archive, in name order.
+    """
+    start = time.perf_counter()
+    root = Path(root)
+    output_dir = Path(output_dir) if output_dir else root
+    output_dir.mkdir(parents=True, exist_ok=True)
+    archives = find_archives(root)
+    bulk = BulkExtractResult(root=root)
+    cancelled = cancel_event.is_set if cancel_event is not None else None
+    logger.info(
+        "Unpacking %d archives from %s",
+        len(archives),
+        root,
+        extra={"data": {"workers": workers, "overwrite": overwrite}},
+    )
+
+    def extract_one(archive):
+        result = ExtractResult(archive=archive, output=output_dir / archive.stem)
+        if cancelled and cancelled():
+            return None
+        if result.output.exists() and not overwrite:
+            result.skipped = True
+            return result
+        item_start = time.perf_counter()
+        try:
+            result.file_count, result.output_bytes = extract_archive(
+                archive, result.output, cancelled, overwrite
+            )
+        except ExtractCancelledError:
+            return None
+        except ArchiveError as e:
+            logger.error("Failed to unpack %s: %s", archive.name, e)
+            result.error = str(e)
+        result.seconds = time.perf_counter() - item_start
+        return result
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        futures = {executor.submit(extract_one, archive): archive for archive in archives}
+        try:
+            for done, future in enumerate(as_completed(futures), 1):
+                result = future.result()
+                if result is not None:
+                    bulk.results.append(result)
+                if progress:
+                    progress(done, len(archives), futures[future])
+        except BaseException:
+            # e.g. KeyboardInterrupt: stop running extractions too, not just queued ones
+            if cancel_event is not None:
+                cancel_event.set()
+            executor.shutdown(cancel_futures=True)
+            raise
+
+    bulk.cancelled = bool(cancelled and cancelled())
+    bulk.results.sort(key=lambda result: result.archive.name)
+    bulk.seconds = time.perf_counter() - start
+    logger.info(
+        "Unpacked %d archives from %s",
+        bulk.processed_count,
+        root,
+        extra={"data": {
+            "skipped": bulk.skipped_count,
+            "errors": bulk.error_count,
+            "cancelled": bulk.cancelled,
+            "seconds": round(bulk.seconds, 4),
+        }},
+    )
+    return bulk
@@ -1,7 +1,30 @@
 """Event handlers for BrushsetMaker application."""
 
-import zipfile
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+import threading
+
+from .compression import CompressionPolicy
+from .engine import (
+    BrushsetEngine,
+    DuplicateBrushesError,
+    PackagingCancelledError,
+    PackagingOptions,
+    backup_existing,
+    resolve_workers,
+    unique_output_path,
+)
+from .extract import extract_bulk, find_archives
+from .inspector import ArchiveError, inspect_archive
+from .journal import BulkJournal
+from .library import BrushLibrary, brush_name
+from .merge import merge_archives, split_archive
+from .repack import repack_bulk
+from .report import build_report, default_report_path, write_report
+from .thumbnails import ThumbnailCache
+from .trace import default_trace_path, write_trace
+from .watcher import FolderWatcher
 
 
 class BrushsetHandlers:
@@ -22,8 +45,7 @@ class BrushsetHandlers:
             folder = Path(folder_path)
 
             # Check if folder has files
-            files = list(folder.rglob('*'))
-            if not files:
+            if not BrushsetEngine().has_files(folder):
                 await app.main_window.error_dialog("Error", "Selected folder is empty.")
                 return
 
@@ -77,34 +99,29 @@ class BrushsetHandlers:
                     if not proceed:
                         return
                 elif overwrite_behavior == "rename":
-                    counter = 1
-                    base = save_path.stem
-                    while save_path.exists():
-                        save_path = save_path.parent / f"{base}_{counter}.brushset"
-                        counter += 1
+                    save_path = unique_output_path(save_path)
 
             # Create backup if enabled
-            if save_path.exists() and settings.get("create_backup", False):
-                import shutil
-                backup_path = save_path.with_suffix('.brushset.backup')
-                shutil.copy2(save_path, backup_path)
-
-            # Get compression settings
-            compression_method = settings.get_compression_method()
-
-            # Create the brushset
-            with zipfile.ZipFile(save_path, 'w', compression_method) as zipf:
-                files = list(folder.rglob('*'))
-                include_hidden = settings.get("include_hidden_files", False)
-
-                for file_path in files:
-                    if file_path.is_file():
-                        # Skip hidden files if setting is disabled
-                        if not include_hidden and file_path.name.startswith('.'):
-                            continue
+            if settings.get("create_backup", False):
+                backup_existing(save_path)
+
+            # Create the brushset on a worker thread so the UI stays responsive
+            app.cancel_event = threading.Event()
+            engine = BrushsetEngine(PackagingOptions.from_settings(settings), app.cancel_event)
+            BrushsetHandlers.create_progress_window(app, 1)
+            app.progress_label.text = f"Packaging {folder.name}..."
+            try:
+                result = await asyncio.to_thread(engine.build, folder, save_path)
+            except PackagingCancelledError:
+                return
+            finally:
+                BrushsetHandlers.close_progress_window(app)
 
-                        arcname = file_path.relative_to(folder)
-                        zipf.write(file_path, arcname)
+            report_path = BrushsetHandlers.write_report(
+                settings, [result], result.seconds, folder, save_path.parent
+            )
+            if settings.get("trace_packaging", False):
+                write_trace(result.trace_events, default_trace_path(save_path.parent))
 
             # Open output folder if enabled
             if settings.get("open_output_folder", False):
@@ -113,14 +130,25 @@ class BrushsetHandlers:
 
             # Show success dialog if enabled
             if settings.get("show_success_dialogs", True):
-                await app.main_window.info_dialog(
-                    "Success",
-                    f"Brushset created successfully:\n{save_path.name}"
-                )
+                message = f"Brushset created successfully:\n{save_path.name}"
+                if report_path:
+                    message += f"\n\nReport saved to {report_path.name}"
+                await app.main_window.info_dialog("Success", message)
 
         except Exception as e:
             await app.main_window.error_dialog("Error", f"Error creating brushset: {e}")
 
+    @staticmethod
+    def write_report(settings, results, seconds, root, directory, *, duplicates=None):
+        """Write a timing report into ``directory`` if reports are enabled.
+
+        Returns the report path, or None when reports are off.
+        """
+        if not settings.get("generate_report", False):
+            return None
+        path = default_report_path(directory, settings.get("report_format", "json"))
+        return write_report(build_report(results, seconds, root, duplicates), path)
+
     @staticmethod
     async def open_metadata_editor(app, widget):
         """Open a window to edit brushset metadata plist."""
@@ -138,6 +166,105 @@ class BrushsetHandlers:
         except Exception as e:
             await app.main_window.error_dialog("Error", f"Error opening metadata editor: {e}")
 
+    @staticmethod
+    async def inspect_brushset(app, widget):
+        """Pick a .brushset archive and show what it contains."""
+        try:
+            archive_path = await app.main_window.open_file_dialog(
+                title="Select Brushset to Inspect",
+                file_types=['brushset']
+            )
+            if not archive_path:
+                return
+
+            # Reads only the central directory and brushset.plist
+            info = await asyncio.to_thread(inspect_archive, archive_path)
+
+            from ..ui.inspector_window import InspectorWindow
+            InspectorWindow(app, info).show()
+
+        except ArchiveError as e:
+            await app.main_window.error_dialog("Error", str(e))
+        except Exception as e:
+            await app.main_window.error_dialog("Error", f"Error inspecting brushset: {e}")
+
+    @staticmethod
+    async def merge_brushsets(app, widget):
+        """Pick several .brushset archives and combine their brushes into a new one."""
+        try:
+            archive_paths = await app.main_window.open_file_dialog(
+                title="Select Brushsets to Merge",
+                multiple_select=True,
+                file_types=['brushset']
+            )
+            if not archive_paths or len(archive_paths) < 2:
+                return
+
+            output_path = await app.main_window.save_file_dialog(
+                title="Save Merged Brushset",
+                suggested_filename="Merged.brushset",
+                file_types=['brushset']
+            )
+            if not output_path:
+                return
+
+            # Members are copied across still compressed, so this is only file I/O
+            result = await asyncio.to_thread(
+                merge_archives,
+                archive_paths,
+                output_path,
+                plist_format=app.settings.get("plist_format", "xml"),
+                policy=BrushsetHandlers._compression_policy(app.settings),
+            )
+
+            message = (
+                f"Merged {len(archive_paths)} brushsets into {result.output.name} "
+                f"with {len(result.brushes)} brushes."
+            )
+            if result.duplicates:
+                message += (
+                    f"\n\n{len(result.duplicates)} brushes were in more than one brushset; "
+                    "the first copy was kept."
+                )
+            if result.duplicates or app.settings.get("show_success_dialogs", True):
+                await app.main_window.info_dialog("Merge Complete", message)
+
+        except ArchiveError as e:
+            await app.main_window.error_dialog("Error", str(e))
+        except Exception as e:
+            await app.main_window.error_dialog("Error", f"Error merging brushsets: {e}")
+
+    @staticmethod
+    async def split_brushes(app, info, brushes, window):
+        """Copy the brushes selected in an inspector window into a new .brushset."""
+        try:
+            output_path = await window.save_file_dialog(
+                title="Save Brushes As",
+                suggested_filename=f"{info.path.stem} Selection.brushset",
+                file_types=['brushset']
+            )
+            if not output_path:
+                return
+
+            result = await asyncio.to_thread(
+                split_archive,
+                info.path,
+                output_path,
+                brushes,
+                plist_format=app.settings.get("plist_format", "xml"),
+                policy=BrushsetHandlers._compression_policy(app.settings),
+            )
+            if app.settings.get("show_success_dialogs", True):
+                await window.info_dialog(
+                    "Split Complete",
+                    f"Saved {len(result.brushes)} brushes to {result.output.name}."
+                )
+
+        except ArchiveError as e:
+            await window.error_dialog("Error", str(e))
+        except Exception as e:
+            await window.error_dialog("Error", f"Error splitting brushset: {e}")
+
     @staticmethod
     async def select_bulk_folder(app, widget):
         """Handle bulk folder selection."""
@@ -148,21 +275,178 @@ class BrushsetHandlers:
             )
 
             if folder_path:
+                # A watch on the previous root ends when another root is picked
+                if app.watch_stop:
+                    app.watch_stop.set()
                 app.selected_folder = folder_path
                 app.folder_label.text = f"Selected: {Path(folder_path).name}"
                 app.process_button.enabled = True
+                app.watch_button.enabled = True
+                app.unpack_button.enabled = True
+                app.repack_button.enabled = True
+                # Offer to resume if a previous run over this folder was interrupted
+                app.resume_button.enabled = BulkJournal.for_job(folder_path, folder_path).exists()
             else:
                 app.folder_label.text = "No folder selected"
 
         except Exception as e:
             await app.main_window.error_dialog("Error", f"Error selecting folder: {e}")
 
+    @staticmethod
+    async def toggle_watch(app, widget):
+        """Start or stop watching the selected root folder for changes."""
+        if app.watch_stop:
+            app.watch_stop.set()
+            app.watch_button.enabled = False
+            return
+        if not app.selected_folder:
+            await app.main_window.error_dialog("Error", "No folder selected. Please select a folder first.")
+            return
+
+        root_path = Path(app.selected_folder)
+        stop_event = threading.Event()
+        app.watch_stop = stop_event
+        # The stop event doubles as the cancel event so stopping interrupts a rebuild too
+        engine = BrushsetEngine(PackagingOptions.from_settings(app.settings), stop_event)
+        watcher = FolderWatcher(engine, root_path)
+        loop = asyncio.get_running_loop()
+
+        def show_rebuild(bulk):
+            if stop_event.is_set():
+                return
+            rebuilt = [r.folder.name for r in bulk.results if r.ok and not r.skipped]
+            status = f"Watching: {root_path.name}"
+            if rebuilt:
+                status += f" (rebuilt {', '.join(rebuilt[:3])}"
+                status += f" and {len(rebuilt) - 3} more)" if len(rebuilt) > 3 else ")"
+            if bulk.error_count:
+                status += f" - {bulk.error_count} errors"
+            app.folder_label.text = status
+
+        app.watch_button.text = "Stop Watching"
+        app.process_button.enabled = False
+        app.resume_button.enabled = False
+        # Unpacking and repacking write into the root the watcher is rebuilding from
+        app.unpack_button.enabled = False
+        app.repack_button.enabled = False
+        app.folder_label.text = f"Watching: {root_path.name}"
+        try:
+            await asyncio.to_thread(
+                watcher.run,
+                stop_event,
+                on_rebuild=lambda bulk: loop.call_soon_threadsafe(show_rebuild, bulk),
+            )
+        except Exception as e:
+            await app.main_window.error_dialog("Error", f"Watching stopped: {e}")
+        finally:
+            if app.watch_stop is stop_event:
+                app.watch_stop = None
+            app.watch_button.text = "Watch for Changes"
+            app.watch_button.enabled = True
+            app.process_button.enabled = True
+            app.unpack_button.enabled = True
+            app.repack_button.enabled = True
+            selected = Path(app.selected_folder)
+            app.folder_label.text = f"Selected: {selected.name}"
+            app.resume_button.enabled = BulkJournal.for_job(selected, selected).exists()
+
+    @staticmethod
+    async def select_library_folder(app, widget):
+        """Pick a root folder and show the first page of its brushes."""
+        try:
+            folder_path = await app.main_window.select_folder_dialog(
+                title="Select Brush Library"
+            )
+            if not folder_path:
+                return
+
+            app.library = BrushLibrary(folder_path, app.settings.get("skip_hidden_folders", True))
+            app.library_label.text = f"Library: {Path(folder_path).name}"
+            await BrushsetHandlers.show_library_page(app, 0)
+
+        except Exception as e:
+            await app.main_window.error_dialog("Error", f"Error opening library: {e}")
+
+    @staticmethod
+    async def show_library_page(app, number):
+        """Show one page of the brush library, loading names and thumbnails in the background."""
+        library = app.library
+        if library is None or number < 0:
+            return
+
+        # Rows of the page being left no longer need their thumbnails
+        for future in app.library_futures:
+            future.cancel()
+        app.library_futures = []
+
+        # Indexing touches the disk, so it stays off the UI thread
+        entries, has_next = await asyncio.to_thread(
+            lambda: (library.page(number), library.has_page(number + 1))
+        )
+        if library is not app.library:
+            return  # Another library was picked in the meantime
+
+        app.library_page = number
+        app.library_table.data = [
+            {"brush": entry.folder, "brushset": entry.brushset} for entry in entries
+        ]
+        page_text = f"Page {number + 1}"
+        if library.complete:
+            pages = max(1, -(-len(library) // library.page_size))
+            page_text += f" of {pages} ({len(library)} brushes)"
+        app.library_page_label.text = page_text
+        app.library_prev_button.enabled = number > 0
+        app.library_next_button.enabled = has_next
+
+        executor, cache = BrushsetHandlers._thumbnail_pool(app)
+        loop = asyncio.get_running_loop()
+        for row, entry in zip(app.library_table.data, entries, strict=True):
+            future = executor.submit(_brush_details, cache, entry)
+            future.add_done_callback(
+                lambda f, row=row: loop.call_soon_threadsafe(_show_brush_details, row, f)
+            )
+            app.library_futures.append(future)
+
+    @staticmethod
+    def _thumbnail_pool(app):
+        """Return the shared thumbnail thread pool and cache, creating them on first use."""
+        if app.thumbnail_executor is None:
+            max_bytes = int(app.settings.get("thumbnail_cache_mb", 200)) * 1024 * 1024
+            app.thumbnail_cache = ThumbnailCache(max_bytes=max_bytes)
+            app.thumbnail_executor = ThreadPoolExecutor(
+                max_workers=2, thread_name_prefix="thumbnails"
+            )
+        return app.thumbnail_executor, app.thumbnail_cache
+
+    @staticmethod
+    def _compression_policy(settings):
+        """Return the CompressionPolicy the settings describe."""
+        options = PackagingOptions.from_settings(settings)
+        return CompressionPolicy(
+            options.compression_method, options.compression_level, options.compression_policy
+        )
+
+    @staticmethod
+    def _lock_root_actions(app, locked):
+        """Disable the buttons that package, watch or rewrite the selected root folder.
+
+        Used while an unpack or repack writes into the root. Unlocking re-enables them, and
+        Resume only when the root has an interrupted run to resume.
+        """
+        for button in (app.process_button, app.watch_button, app.unpack_button, app.repack_button):
+            button.enabled = not locked
+        if locked:
+            app.resume_button.enabled = False
+        else:
+            root = Path(app.selected_folder)
+            app.resume_button.enabled = BulkJournal.for_job(root, root).exists()
+
     @staticmethod
     def create_progress_window(app, total):
-        """Create a progress window."""
+        """Create a progress window with a Cancel button wired to ``app.cancel_event``."""
+        import toga
         from toga.style import Pack
         from toga.style.pack import COLUMN
-        import toga
 
         # Create progress window
         app.progress_window = toga.Window(title="Processing Brushsets")
@@ -191,16 +475,44 @@ class BrushsetHandlers:
             style=Pack(padding=(0, 0, 0, 0), font_size=12)
         )
 
+        # Cancel button
+        app.cancel_button = toga.Button(
+            "Cancel",
+            on_press=lambda w: BrushsetHandlers.cancel_processing(app),
+            style=Pack(padding=(20, 0, 0, 0), width=120, height=32)
+        )
+
         progress_box.add(app.progress_label)
         progress_box.add(app.progress_bar)
         progress_box.add(app.current_folder_label)
+        progress_box.add(app.cancel_button)
 
         app.progress_window.content = progress_box
         app.progress_window.show()
 
     @staticmethod
-    async def process_folders(app, widget):
-        """Process all subfolders in the selected root folder."""
+    def cancel_processing(app):
+        """Ask the running packaging job to stop."""
+        if getattr(app, 'cancel_event', None):
+            app.cancel_event.set()
+        app.progress_label.text = "Cancelling..."
+        app.cancel_button.enabled = False
+
+    @staticmethod
+    def close_progress_window(app):
+        """Close the progress window if it is open."""
+        if app.progress_window:
+            app.progress_window.close()
+            app.progress_window = None
+
+    @staticmethod
+    async def resume_folders(app, widget):
+        """Resume the last interrupted bulk run for the selected root folder."""
+        await BrushsetHandlers.process_folders(app, widget, resume=True)
+
+    @staticmethod
+    async def unpack_brushsets(app, widget):
+        """Extract every .brushset in the selected root folder into a subfolder."""
         if not app.selected_folder:
             await app.main_window.error_dialog("Error", "No folder selected. Please select a folder first.")
             return
@@ -209,79 +521,217 @@ class BrushsetHandlers:
             root_path = Path(app.selected_folder)
             settings = app.settings
 
-            # Get all subdirectories, respecting skip_hidden setting
-            subdirs = []
-            for d in root_path.iterdir():
-                if d.is_dir():
-                    if settings.should_skip_folder(d.name):
-                        continue
-                    subdirs.append(d)
+            archives = find_archives(root_path)
+            if not archives:
+                await app.main_window.info_dialog("No Brushsets", "No .brushset files found in the selected directory.")
+                return
 
-            if not subdirs:
-                await app.main_window.info_dialog("No Folders", "No subfolders found in the selected directory.")
+            app.cancel_event = threading.Event()
+            # Packaging or watching the root now would read half-written folders
+            BrushsetHandlers._lock_root_actions(app, True)
+            BrushsetHandlers.create_progress_window(app, len(archives))
+            app.progress_window.title = "Unpacking Brushsets"
+            app.progress_label.text = f"Unpacking 0 of {len(archives)} brushsets..."
+
+            show_details = settings.get("show_progress_details", True)
+            loop = asyncio.get_running_loop()
+
+            def update_progress(done, total, archive):
+                if app.cancel_event.is_set():
+                    return
+                if show_details:
+                    app.current_folder_label.text = f"Unpacked: {archive.name}"
+                app.progress_label.text = f"Unpacking {done} of {total} brushsets..."
+                app.progress_bar.value = done
+
+            # Existing folders may hold edits, so they are never replaced from the app
+            bulk = await asyncio.to_thread(
+                extract_bulk,
+                root_path,
+                workers=resolve_workers(settings.get("bulk_workers", 0)),
+                progress=lambda *args: loop.call_soon_threadsafe(update_progress, *args),
+                cancel_event=app.cancel_event,
+            )
+            BrushsetHandlers.close_progress_window(app)
+
+            if bulk.cancelled:
+                await app.main_window.info_dialog(
+                    "Unpacking Cancelled",
+                    f"Cancelled after {bulk.processed_count} brushsets. "
+                    "Unfinished folders were not created."
+                )
                 return
 
-            # Create and show progress window
-            BrushsetHandlers.create_progress_window(app, len(subdirs))
+            message = f"Unpacked: {bulk.processed_count}"
+            if bulk.skipped_count:
+                message += f"\nSkipped, folder already exists: {bulk.skipped_count}"
+            if bulk.error_count:
+                error_details = "\n".join(bulk.errors[:5])
+                if len(bulk.errors) > 5:
+                    error_details += f"\n... and {len(bulk.errors) - 5} more errors"
+                message += f"\nErrors: {bulk.error_count}\n\nErrors:\n{error_details}"
+                await app.main_window.info_dialog("Unpacking Complete", message)
+            elif settings.get("show_success_dialogs", True):
+                await app.main_window.info_dialog("Success", message)
 
-            processed_count = 0
-            error_count = 0
-            errors = []
+        except Exception as e:
+            BrushsetHandlers.close_progress_window(app)
+            await app.main_window.error_dialog("Error", f"Fatal error: {e}")
+        finally:
+            BrushsetHandlers._lock_root_actions(app, False)
+
+    @staticmethod
+    async def repack_brushsets(app, widget):
+        """Rewrite every .brushset in the selected root folder with the current compression settings."""
+        if not app.selected_folder:
+            await app.main_window.error_dialog("Error", "No folder selected. Please select a folder first.")
+            return
+
+        try:
+            root_path = Path(app.selected_folder)
+            settings = app.settings
+
+            archives = find_archives(root_path)
+            if not archives:
+                await app.main_window.info_dialog("No Brushsets", "No .brushset files found in the selected directory.")
+                return
+
+            options = PackagingOptions.from_settings(settings)
+            policy = BrushsetHandlers._compression_policy(settings)
+
+            app.cancel_event = threading.Event()
+            # A watch would rebuild the archives being rewritten, and a bulk run replace them
+            BrushsetHandlers._lock_root_actions(app, True)
+            BrushsetHandlers.create_progress_window(app, len(archives))
+            app.progress_window.title = "Repacking Brushsets"
+            app.progress_label.text = f"Repacking 0 of {len(archives)} brushsets..."
 
-            # Get settings
-            compression_method = settings.get_compression_method()
-            warn_empty = settings.get("warn_empty_folders", True)
-            stop_on_error = settings.get("error_handling", "continue") == "stop"
-            include_hidden = settings.get("include_hidden_files", False)
             show_details = settings.get("show_progress_details", True)
+            loop = asyncio.get_running_loop()
+
+            def update_progress(done, total, archive):
+                if app.cancel_event.is_set():
+                    return
+                if show_details:
+                    app.current_folder_label.text = f"Repacked: {archive.name}"
+                app.progress_label.text = f"Repacking {done} of {total} brushsets..."
+                app.progress_bar.value = done
+
+            # Archives are replaced in place, each only once its new copy is complete
+            bulk = await asyncio.to_thread(
+                repack_bulk,
+                archives,
+                policy,
+                workers=options.workers,
+                progress=lambda *args: loop.call_soon_threadsafe(update_progress, *args),
+                cancel_event=app.cancel_event,
+                backup=settings.get("create_backup", False),
+            )
+            BrushsetHandlers.close_progress_window(app)
 
-            for idx, subdir in enumerate(subdirs, 1):
-                try:
-                    if show_details:
-                        app.current_folder_label.text = f"Processing: {subdir.name}"
-                    app.progress_label.text = f"Processing {idx} of {len(subdirs)} folders..."
+            if bulk.cancelled:
+                await app.main_window.info_dialog(
+                    "Repacking Cancelled",
+                    f"Cancelled after {bulk.processed_count} brushsets. "
+                    "Unfinished brushsets were left as they were."
+                )
+                return
 
-                    # Create zip file path
-                    zip_filename = f"{subdir.name}.brushset"
-                    zip_path = root_path / zip_filename
+            saved_mb = bulk.saved_bytes / (1024 * 1024)
+            message = f"Repacked: {bulk.processed_count}\nSize change: {-saved_mb:+.1f} MB"
+            if bulk.error_count:
+                error_details = "\n".join(bulk.errors[:5])
+                if len(bulk.errors) > 5:
+                    error_details += f"\n... and {len(bulk.errors) - 5} more errors"
+                message += f"\nErrors: {bulk.error_count}\n\nErrors:\n{error_details}"
+                await app.main_window.info_dialog("Repacking Complete", message)
+            elif settings.get("show_success_dialogs", True):
+                await app.main_window.info_dialog("Success", message)
 
-                    # Create zip file with compression settings
-                    with zipfile.ZipFile(zip_path, 'w', compression_method) as zipf:
-                        # Get all files in the subfolder
-                        files = list(subdir.rglob('*'))
+        except Exception as e:
+            BrushsetHandlers.close_progress_window(app)
+            await app.main_window.error_dialog("Error", f"Fatal error: {e}")
+        finally:
+            BrushsetHandlers._lock_root_actions(app, False)
 
-                        if not files:
-                            if warn_empty:
-                                errors.append(f"{subdir.name}: Folder is empty")
-                                error_count += 1
-                            continue
+    @staticmethod
+    async def process_folders(app, widget, resume=False):
+        """Process all subfolders in the selected root folder."""
+        if not app.selected_folder:
+            await app.main_window.error_dialog("Error", "No folder selected. Please select a folder first.")
+            return
 
-                        # Add each file to the zip
-                        for file_path in files:
-                            if file_path.is_file():
-                                # Skip hidden files if setting is disabled
-                                if not include_hidden and file_path.name.startswith('.'):
-                                    continue
+        try:
+            root_path = Path(app.selected_folder)
+            settings = app.settings
 
-                                # Calculate relative path from subfolder
-                                arcname = file_path.relative_to(subdir)
-                                zipf.write(file_path, arcname)
+            app.cancel_event = threading.Event()
+            engine = BrushsetEngine(PackagingOptions.from_settings(settings), app.cancel_event)
 
-                    processed_count += 1
+            # Get all subdirectories, respecting skip_hidden setting
+            subdirs = engine.find_subfolders(root_path)
 
-                except Exception as e:
-                    errors.append(f"{subdir.name}: {str(e)}")
-                    error_count += 1
+            if not subdirs:
+                await app.main_window.info_dialog("No Folders", "No subfolders found in the selected directory.")
+                return
 
-                    if stop_on_error:
-                        break
+            # Create and show progress window
+            BrushsetHandlers.create_progress_window(app, len(subdirs))
 
-                # Update progress bar
-                app.progress_bar.value = idx
+            show_details = settings.get("show_progress_details", True)
+            loop = asyncio.get_running_loop()
+
+            def update_progress(done, total, folder):
+                if app.cancel_event.is_set():
+                    return
+                if show_details:
+                    app.current_folder_label.text = f"Processed: {folder.name}"
+                app.progress_label.text = f"Processing {done} of {total} folders..."
+                app.progress_bar.max = total
+                app.progress_bar.value = done
+
+            # Package on a worker thread; progress is handed back to the UI thread
+            try:
+                bulk = await asyncio.to_thread(
+                    engine.build_bulk,
+                    root_path,
+                    progress=lambda *args: loop.call_soon_threadsafe(update_progress, *args),
+                    resume=resume,
+                )
+            except DuplicateBrushesError as e:
+                BrushsetHandlers.close_progress_window(app)
+                details = "\n".join(
+                    ", ".join(group.brushes) for group in e.groups[:5]
+                )
+                if len(e.groups) > 5:
+                    details += f"\n... and {len(e.groups) - 5} more groups"
+                await app.main_window.error_dialog(
+                    "Duplicate Brushes",
+                    f"{e}. Nothing was packaged.\n\n{details}"
+                )
+                return
+            app.resume_button.enabled = BulkJournal.for_job(root_path, root_path).exists()
+            report_path = BrushsetHandlers.write_report(
+                settings,
+                bulk.results,
+                bulk.seconds,
+                root_path,
+                root_path,
+                duplicates=bulk.duplicates if engine.options.check_duplicates else None,
+            )
+            if settings.get("trace_packaging", False):
+                write_trace(bulk.trace_events, default_trace_path(root_path))
 
             # Close progress window
-            app.progress_window.close()
-            app.progress_window = None
+            BrushsetHandlers.close_progress_window(app)
+
+            if bulk.cancelled:
+                await app.main_window.info_dialog(
+                    "Processing Cancelled",
+                    f"Cancelled after {bulk.processed_count} brushsets. "
+                    "Unfinished brushsets were not written."
+                )
+                return
 
             # Open output folder if enabled
             if settings.get("open_output_folder", False):
@@ -289,23 +739,59 @@ class BrushsetHandlers:
                 subprocess.run(['open', str(root_path)])
 
             # Show completion dialog
-            if error_count > 0:
-                error_details = "\n".join(errors[:5])  # Show first 5 errors
-                if len(errors) > 5:
-                    error_details += f"\n... and {len(errors) - 5} more errors"
-                await app.main_window.info_dialog(
-                    "Processing Complete",
-                    f"Successfully processed: {processed_count}\nErrors: {error_count}\n\nErrors:\n{error_details}"
-                )
-            else:
-                if settings.get("show_success_dialogs", True):
-                    await app.main_window.info_dialog(
-                        "Success",
-                        f"Successfully processed all {processed_count} brushsets!"
-                    )
+            if bulk.error_count or settings.get("show_success_dialogs", True):
+                title, message = BrushsetHandlers._bulk_message(bulk, report_path)
+                await app.main_window.info_dialog(title, message)
 
         except Exception as e:
-            if app.progress_window:
-                app.progress_window.close()
-                app.progress_window = None
+            BrushsetHandlers.close_progress_window(app)
             await app.main_window.error_dialog("Error", f"Fatal error: {e}")
+
+    @staticmethod
+    def _bulk_message(bulk, report_path):
+        """Return the title and text of the dialog shown when a bulk run finishes."""
+        issue_count = sum(len(result.issues) for result in bulk.results)
+        duplicate_count = len(bulk.duplicates)
+        if bulk.error_count:
+            errors = bulk.errors
+            error_details = "\n".join(errors[:5])  # Show first 5 errors
+            if len(errors) > 5:
+                error_details += f"\n... and {len(errors) - 5} more errors"
+            if issue_count:
+                error_details += f"\n\nValidation issues: {issue_count}"
+            if duplicate_count:
+                error_details += f"\nDuplicate brush groups: {duplicate_count}"
+            if report_path:
+                error_details += f"\n\nReport saved to {report_path.name}"
+            return (
+                "Processing Complete",
+                f"Successfully processed: {bulk.processed_count}\n"
+                f"Unchanged: {bulk.skipped_count}\n"
+                f"Errors: {bulk.error_count}\n\nErrors:\n{error_details}",
+            )
+
+        message = f"Successfully processed all {bulk.processed_count} brushsets!"
+        if bulk.skipped_count:
+            message += f"\n{bulk.skipped_count} unchanged brushsets were skipped."
+        if issue_count:
+            message += f"\n{issue_count} validation issues were found."
+        if duplicate_count:
+            message += f"\n{duplicate_count} groups of duplicate brushes were found."
+        if report_path:
+            message += f"\nReport saved to {report_path.name}"
+        return "Success", message
+
+
+def _brush_details(cache, entry):
+    """Read a brush's name and thumbnail, on a thumbnail pool thread."""
+    return brush_name(entry), cache.thumbnail_for(entry.path)
+
+
+def _show_brush_details(row, future):
+    """Fill in a library row once its details are ready, on the UI thread."""
+    if future.cancelled() or future.exception() is not None:
+        return
+    import toga
+
+    name, thumbnail = future.result()
+    row.brush = (toga.Icon(thumbnail), name) if thumbnail else name
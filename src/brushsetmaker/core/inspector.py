@@ -0,0 +1,204 @@
+"""Read-only inspection of existing ``.brushset`` archives.
+
+Only the ZIP central directory at the end of the file and the small ``brushset.plist``
+member are read; member data is never decompressed. ``zipfile`` locates the central
+directory by seeking from the end, so opening an archive takes the same few reads
+whether it holds megabytes or gigabytes.
+"""
+
+from dataclasses import dataclass, field
+from pathlib import Path
+import plistlib
+import zipfile
+
+from .validation import PLIST_NAME
+
+METHOD_NAMES = {
+    zipfile.ZIP_STORED: "stored",
+    zipfile.ZIP_DEFLATED: "deflate",
+    zipfile.ZIP_BZIP2: "bzip2",
+    zipfile.ZIP_LZMA: "lzma",
+}
+
+# brushset.plist is tiny in practice; anything larger isn't worth decompressing to inspect
+MAX_PLIST_BYTES = 4 * 1024 * 1024
+
+
+class ArchiveError(Exception):
+    """Raised when a file can't be read as a brushset archive."""
+
+
+def method_name(compress_type):
+    """Return the short name of a ZIP compression method."""
+    return METHOD_NAMES.get(compress_type, f"method {compress_type}")
+
+
+@dataclass(slots=True)
+class ArchiveMember:
+    """One entry of an archive's central directory."""
+
+    name: str
+    compress_type: int
+    file_size: int
+    compress_size: int
+    crc: int
+    date_time: tuple
+
+    @property
+    def method(self):
+        """Compression method name."""
+        return method_name(self.compress_type)
+
+    @property
+    def ratio(self):
+        """Compressed size as a fraction of the original size."""
+        return self.compress_size / self.file_size if self.file_size else 1.0
+
+
+@dataclass
+class BrushSummary:
+    """A brush folder found in an archive."""
+
+    name: str
+    files: int = 0
+    file_size: int = 0
+    compress_size: int = 0
+    listed: bool = False
+
+
+@dataclass
+class ArchiveInfo:
+    """What an archive contains, as recorded in its central directory."""
+
+    path: Path
+    size: int
+    members: list[ArchiveMember] = field(default_factory=list)
+    metadata: dict | None = None
+    metadata_error: str | None = None
+    comment: str = ""
+
+    @property
+    def name(self):
+        """Brushset name from brushset.plist, if it has one."""
+        return (self.metadata or {}).get("name")
+
+    @property
+    def file_size(self):
+        """Total uncompressed size of every member."""
+        return sum(member.file_size for member in self.members)
+
+    @property
+    def compress_size(self):
+        """Total compressed size of every member."""
+        return sum(member.compress_size for member in self.members)
+
+    @property
+    def methods(self):
+        """Number of members per compression method name."""
+        counts = {}
+        for member in self.members:
+            counts[member.method] = counts.get(member.method, 0) + 1
+        return counts
+
+    @property
+    def brushes(self):
+        """BrushSummary per brush folder, plus any brushes listed in the plist but absent.
+
+        Brushes are in the order brushset.plist lists them, then any unlisted folders.
+        """
+        by_name = {}
+        for member in self.members:
+            brush, sep, rest = member.name.partition("/")
+            if not sep or not rest or member.name.endswith("/"):
+                continue
+            summary = by_name.setdefault(brush, BrushSummary(brush))
+            summary.files += 1
+            summary.file_size += member.file_size
+            summary.compress_size += member.compress_size
+
+        listed = [str(brush) for brush in (self.metadata or {}).get("brushes", [])]
+        ordered = []
+        for brush in listed:
+            summary = by_name.pop(brush, None) or BrushSummary(brush)
+            summary.listed = True
+            ordered.append(summary)
+        ordered.extend(by_name[name] for name in sorted(by_name))
+        return ordered
+
+    def as_dict(self):
+        """Return the inspection result as JSON-serializable data."""
+        return {
+            "path": str(self.path),
+            "size": self.size,
+            "name": self.name,
+            "files": len(self.members),
+            "file_size": self.file_size,
+            "compress_size": self.compress_size,
+            "methods": self.methods,
+            "metadata_error": self.metadata_error,
+            "brushes": [
+                {
+                    "name": brush.name,
+                    "listed": brush.listed,
+                    "files": brush.files,
+                    "file_size": brush.file_size,
+                    "compress_size": brush.compress_size,
+                }
+                for brush in self.brushes
+            ],
+            "members": [
+                {
+                    "name": member.name,
+                    "method": member.method,
+                    "file_size": member.file_size,
+                    "compress_size": member.compress_size,
+                    "crc": f"{member.crc:08x}",
+                }
+                for member in self.members
+            ],
+        }
+
+
+def inspect_archive(path):
+    """Read an archive's central directory and brushset.plist.
+
+    Raises:
+        ArchiveError: If the file is missing or not a ZIP archive.
+    """
+    path = Path(path)
+    try:
+        with zipfile.ZipFile(path) as zf:
+            members = [
+                ArchiveMember(
+                    zinfo.filename,
+                    zinfo.compress_type,
+                    zinfo.file_size,
+                    zinfo.compress_size,
+                    zinfo.CRC,
+                    zinfo.date_time,
+                )
+                for zinfo in zf.infolist()
+            ]
+            metadata, error = read_archive_metadata(zf)
+            comment = zf.comment.decode(errors="replace")
+            size = zf.fp.seek(0, 2)
+    except (OSError, zipfile.BadZipFile) as e:
+        raise ArchiveError(f"Can't read {path}: {e}") from e
+    return ArchiveInfo(path, size, members, metadata, error, comment)
+
+
+def read_archive_metadata(zf):
+    """Return the parsed brushset.plist member, or an error message."""
+    try:
+        zinfo = zf.getinfo(PLIST_NAME)
+    except KeyError:
+        return None, f"no {PLIST_NAME}"
+    if zinfo.file_size > MAX_PLIST_BYTES:
+        return None, f"{PLIST_NAME} is too large to inspect ({zinfo.file_size} bytes)"
+    try:
+        metadata = plistlib.loads(zf.read(zinfo))
+    except Exception as e:
+        return None, f"{PLIST_NAME} can't be read: {e}"
+    if not isinstance(metadata, dict):
+        return None, f"{PLIST_NAME} is not a dictionary"
+    return metadata, None
@@ -0,0 +1,128 @@
+"""On-disk checkpoint journal that lets interrupted bulk runs resume."""
+
+from datetime import datetime
+import hashlib
+import json
+import os
+from pathlib import Path
+import zipfile
+
+JOURNAL_DIR = Path.home() / ".brushsetmaker" / "jobs"
+
+
+class BulkJournal:
+    """Append-only record of the subfolders a bulk run has finished.
+
+    Each finished folder is written as one JSON line and synced to disk straight away, so
+    a crash, kill or lost network mount costs at most the folders that were in flight.
+    """
+
+    def __init__(self, path):
+        """Create a journal backed by ``path``."""
+        self.path = Path(path)
+        self._file = None
+
+    @classmethod
+    def for_job(cls, root, output_dir):
+        """Return the journal for bulk runs of ``root`` writing into ``output_dir``."""
+        key = f"{Path(root).resolve()}\0{Path(output_dir).resolve()}"
+        digest = hashlib.sha1(key.encode("utf-8")).hexdigest()
+        return cls(JOURNAL_DIR / f"{digest}.jsonl")
+
+    def exists(self):
+        """Whether an unfinished run left a journal behind."""
+        return self.path.exists()
+
+    def load(self):
+        """Return the last recorded entry for each folder name.
+
+        A torn final line from a crash is ignored.
+        """
+        entries = {}
+        if not self.path.exists():
+            return entries
+        with self.path.open() as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                if record.get("type") == "folder":
+                    entries[record["name"]] = record
+        return entries
+
+    def completed(self):
+        """Return the names of folders that finished and whose output is still intact."""
+        return {
+            name
+            for name, record in self.load().items()
+            if record["status"] == "empty"
+            or (record["status"] == "done" and self._output_intact(record))
+        }
+
+    def _output_intact(self, record):
+        """Check that a journaled output still exists unchanged and has a readable directory."""
+        output = Path(record["output_path"])
+        try:
+            st = output.stat()
+        except OSError:
+            return False
+        if record.get("output") != [st.st_size, st.st_mtime_ns]:
+            return False
+        try:
+            with zipfile.ZipFile(output) as zipf:
+                return len(zipf.infolist()) == record.get("members", len(zipf.infolist()))
+        except (OSError, zipfile.BadZipFile):
+            return False
+
+    def start(self, root, resume=False):
+        """Open the journal for writing, starting fresh unless resuming."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = self.path.open("a" if resume else "w")
+        self._append({
+            "type": "start",
+            "root": str(root),
+            "resume": resume,
+            "time": datetime.now().isoformat(timespec="seconds"),
+        })
+
+    def record(self, result, name):
+        """Checkpoint one finished folder. ``result`` may be None for ignored empty folders."""
+        if result is None or result.empty:
+            self._append({"type": "folder", "name": name, "status": "empty"})
+            return
+        if not result.ok:
+            self._append({"type": "folder", "name": name, "status": "failed"})
+            return
+
+        # Counted from the archive itself: file_count of an incrementally skipped folder
+        # leaves out a generated brushset.plist
+        try:
+            st = result.output.stat()
+            with zipfile.ZipFile(result.output) as zipf:
+                members = len(zipf.infolist())
+        except (OSError, zipfile.BadZipFile):
+            self._append({"type": "folder", "name": name, "status": "failed"})
+            return
+        self._append({
+            "type": "folder",
+            "name": name,
+            "status": "done",
+            "output_path": str(result.output),
+            "output": [st.st_size, st.st_mtime_ns],
+            "members": members,
+        })
+
+    def _append(self, record):
+        """Write one record and force it to disk."""
+        self._file.write(json.dumps(record) + "\n")
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def close(self, finished=False):
+        """Close the journal, deleting it when the run finished cleanly."""
+        if self._file:
+            self._file.close()
+            self._file = None
+        if finished:
+            self.path.unlink(missing_ok=True)
@@ -0,0 +1,130 @@
+"""Lazy index of the brushes in a bulk root, for browsing large libraries.
+
+Brush folders are discovered one brushset folder at a time, and only as far as the pages
+asked for, so opening a library of tens of thousands of brushes costs a few directory
+listings. Each indexed brush is a small slotted record; names are read from
+``Brush.archive`` only for the rows actually shown.
+"""
+
+from dataclasses import dataclass
+from functools import lru_cache
+import os
+from pathlib import Path
+import plistlib
+import threading
+
+from .validation import REQUIRED_BRUSH_FILES
+
+PAGE_SIZE = 100
+
+
+@dataclass(slots=True, frozen=True)
+class BrushEntry:
+    """A brush folder inside a brushset folder."""
+
+    brushset: str
+    folder: str
+    path: Path
+
+    @property
+    def archive_path(self):
+        """Path of the brush's ``Brush.archive``."""
+        return self.path / REQUIRED_BRUSH_FILES[0]
+
+
+class BrushLibrary:
+    """Pages through the brush folders below a bulk root, indexing only as needed.
+
+    Safe to call from several threads; indexing happens under a lock.
+    """
+
+    def __init__(self, root, skip_hidden_folders=True, page_size=PAGE_SIZE):
+        """Prepare to browse ``root`` without touching the disk yet."""
+        self.root = Path(root)
+        self.skip_hidden_folders = skip_hidden_folders
+        self.page_size = page_size
+        self._entries = []
+        self._pending = None
+        self._complete = False
+        self._lock = threading.Lock()
+
+    def _skip(self, name):
+        """Whether a brushset folder is left out, following BrushsetEngine.find_subfolders."""
+        return self.skip_hidden_folders and name.startswith((".", "_"))
+
+    def _iter_brushes(self):
+        """Yield BrushEntry objects in brushset then brush folder name order."""
+        with os.scandir(self.root) as it:
+            brushsets = sorted(
+                (entry for entry in it if entry.is_dir() and not self._skip(entry.name)),
+                key=lambda entry: entry.name,
+            )
+        for brushset in brushsets:
+            try:
+                with os.scandir(brushset.path) as it:
+                    folders = sorted(
+                        entry.name
+                        for entry in it
+                        if entry.is_dir(follow_symlinks=False) and not entry.name.startswith(".")
+                    )
+            except OSError:
+                continue
+            for folder in folders:
+                yield BrushEntry(brushset.name, folder, Path(brushset.path, folder))
+
+    def _index_until(self, count):
+        """Index brushes until at least ``count`` are known or the library is exhausted."""
+        if self._pending is None and not self._complete:
+            self._pending = self._iter_brushes()
+        while not self._complete and len(self._entries) < count:
+            entry = next(self._pending, None)
+            if entry is None:
+                self._complete = True
+                self._pending = None
+            else:
+                self._entries.append(entry)
+
+    @property
+    def complete(self):
+        """Whether every brush has been indexed, making ``len()`` exact."""
+        return self._complete
+
+    def __len__(self):
+        """Number of brushes indexed so far."""
+        return len(self._entries)
+
+    def page(self, number):
+        """Return the BrushEntry list for zero-based page ``number``."""
+        start = number * self.page_size
+        with self._lock:
+            # One entry past the page tells whether there is a next page
+            self._index_until(start + self.page_size + 1)
+            return self._entries[start:start + self.page_size]
+
+    def has_page(self, number):
+        """Whether page ``number`` has any brushes."""
+        with self._lock:
+            self._index_until(number * self.page_size + 1)
+            return len(self._entries) > number * self.page_size
+
+
+@lru_cache(maxsize=4096)
+def _archive_name(path, mtime_ns, size):  # noqa: ARG001 - mtime_ns and size key the cache
+    """Read the brush name out of a keyed-archiver ``Brush.archive``."""
+    with Path(path).open("rb") as f:
+        archive = plistlib.load(f)
+    objects = archive["$objects"]
+    root = objects[archive["$top"]["root"].data]
+    name = root.get("name")
+    if isinstance(name, plistlib.UID):
+        name = objects[name.data]
+    return name if isinstance(name, str) and name != "$null" else None
+
+
+def brush_name(entry):
+    """Return the name stored in a brush's Brush.archive, or its folder name."""
+    try:
+        st = entry.archive_path.stat()
+        return _archive_name(entry.archive_path, st.st_mtime_ns, st.st_size) or entry.folder
+    except Exception:
+        return entry.folder
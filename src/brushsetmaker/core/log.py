@@ -0,0 +1,100 @@
+"""Structured logging for the packaging engine.
+
+Records go to a rotating JSON-lines file under ``~/.brushsetmaker/logs``. Call sites pass
+structured fields through ``extra={"data": {...}}`` and use %-style arguments, so records
+below the configured level are dropped before any formatting happens. Hot loops should
+check ``log.isEnabledFor(logging.DEBUG)`` once before building their ``extra`` dicts.
+"""
+
+from datetime import datetime
+import json
+import logging
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from pathlib import Path
+
+LOG_DIR = Path.home() / ".brushsetmaker" / "logs"
+LOG_FILE = LOG_DIR / "brushsetmaker.log"
+MAX_LOG_BYTES = 5 * 1024 * 1024
+LOG_BACKUPS = 3
+
+# Setting value to logging level; "none" sits above CRITICAL so nothing is ever emitted
+LOG_LEVELS = {
+    "none": logging.CRITICAL + 10,
+    "errors": logging.ERROR,
+    "info": logging.INFO,
+    "debug": logging.DEBUG,
+}
+
+logger = logging.getLogger("brushsetmaker")
+logger.addHandler(logging.NullHandler())
+
+
+class JsonFormatter(logging.Formatter):
+    """Formats each record as one JSON object per line."""
+
+    def format(self, record):
+        """Return the record as a JSON line, merging in its ``data`` fields."""
+        entry = {
+            "time": datetime.fromtimestamp(record.created).isoformat(timespec="milliseconds"),
+            "level": record.levelname.lower(),
+            "logger": record.name,
+            "pid": record.process,
+            "thread": record.threadName,
+            "message": record.getMessage(),
+        }
+        entry.update(getattr(record, "data", None) or {})
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+def configure_logging(level_name="info", log_file=None):
+    """Point the ``brushsetmaker`` logger at a rotating log file, replacing earlier setup.
+
+    Args:
+        level_name: One of the ``logging_level`` setting values: none, errors, info, debug.
+        log_file: Log file path, defaults to LOG_FILE.
+    """
+    level = LOG_LEVELS.get(str(level_name), logging.INFO)
+    for handler in list(logger.handlers):
+        logger.removeHandler(handler)
+        handler.close()
+    logger.setLevel(level)
+    logger.propagate = False
+
+    if level > logging.CRITICAL:
+        logger.addHandler(logging.NullHandler())
+        return
+
+    log_file = Path(log_file or LOG_FILE)
+    try:
+        log_file.parent.mkdir(parents=True, exist_ok=True)
+        handler = RotatingFileHandler(
+            log_file, maxBytes=MAX_LOG_BYTES, backupCount=LOG_BACKUPS, encoding="utf-8", delay=True
+        )
+    except OSError:
+        # Logging must never stop packaging, e.g. on a read-only home directory
+        logger.addHandler(logging.NullHandler())
+        return
+    handler.setFormatter(JsonFormatter())
+    logger.addHandler(handler)
+
+
+def start_queue_listener(queue):
+    """Forward records that worker processes put on ``queue`` to this process's handlers.
+
+    Only the main process writes the log file, so rotation stays safe. Returns the
+    started QueueListener; call ``stop()`` on it when the workers are done.
+    """
+    listener = QueueListener(queue, *logger.handlers, respect_handler_level=True)
+    listener.start()
+    return listener
+
+
+def configure_worker_logging(queue, level):
+    """Send this worker process's records to the main process through ``queue``."""
+    for handler in list(logger.handlers):
+        logger.removeHandler(handler)
+    logger.setLevel(level)
+    logger.propagate = False
+    logger.addHandler(QueueHandler(queue))
@@ -0,0 +1,130 @@
+"""Persistent build manifest used to skip unchanged folders in bulk runs."""
+
+import hashlib
+import json
+from pathlib import Path
+
+MANIFEST_VERSION = 1
+MANIFEST_DIR = Path.home() / ".brushsetmaker" / "manifests"
+
+
+def hash_file(path):
+    """Return a hex content hash of a file."""
+    digest = hashlib.blake2b(digest_size=16)
+    with Path(path).open("rb") as f:
+        while chunk := f.read(1024 * 1024):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def snapshot_files(sources, previous_files=None, hash_contents=False):
+    """Record size, mtime and optionally a content hash for every source file.
+
+    Hashes are only recomputed for files whose size or mtime differ from
+    ``previous_files``; unchanged files keep their recorded hash.
+
+    Args:
+        sources: Iterable of SourceFile objects.
+        previous_files: The ``files`` mapping of the previous manifest entry, if any.
+        hash_contents: Whether to store a content hash for each file.
+
+    Returns:
+        Mapping of POSIX arcname to ``[size, mtime_ns]`` or ``[size, mtime_ns, hash]``.
+    """
+    previous_files = previous_files or {}
+    files = {}
+    for source in sources:
+        record = [source.stat.st_size, source.stat.st_mtime_ns]
+        if hash_contents:
+            previous = previous_files.get(source.arcname)
+            if previous and len(previous) == 3 and previous[:2] == record:
+                record.append(previous[2])
+            else:
+                record.append(hash_file(source.path))
+        files[source.arcname] = record
+    return files
+
+
+def _same_file(previous, current):
+    """Compare two file records, falling back to the content hash when mtimes differ."""
+    if previous[:2] == current[:2]:
+        return True
+    if len(previous) == 3 and len(current) == 3:
+        return previous[0] == current[0] and previous[2] == current[2]
+    return False
+
+
+def is_up_to_date(entry, files, fingerprint, output_path):
+    """Check whether a previous manifest entry still describes the current inputs and output."""
+    if not entry or entry.get("settings") != fingerprint:
+        return False
+
+    output_path = Path(output_path)
+    try:
+        st = output_path.stat()
+    except OSError:
+        return False
+    if entry.get("output") != [st.st_size, st.st_mtime_ns]:
+        return False
+
+    previous_files = entry.get("files", {})
+    if previous_files.keys() != files.keys():
+        return False
+    return all(_same_file(previous_files[key], record) for key, record in files.items())
+
+
+def make_entry(files, fingerprint, output_path):
+    """Build the manifest entry for a freshly written brushset."""
+    st = Path(output_path).stat()
+    return {
+        "settings": fingerprint,
+        "output": [st.st_size, st.st_mtime_ns],
+        "files": files,
+    }
+
+
+class BuildManifest:
+    """Per-output-directory record of what each bulk subfolder was built from."""
+
+    def __init__(self, path):
+        """Load the manifest at ``path``, starting empty if it is missing or unreadable."""
+        self.path = Path(path)
+        self.folders = self._load()
+
+    @classmethod
+    def for_output_dir(cls, output_dir):
+        """Return the manifest that tracks archives written to ``output_dir``."""
+        key = hashlib.sha1(str(Path(output_dir).resolve()).encode("utf-8")).hexdigest()
+        return cls(MANIFEST_DIR / f"{key}.json")
+
+    def _load(self):
+        """Read the folder entries from disk."""
+        if not self.path.exists():
+            return {}
+        try:
+            with self.path.open() as f:
+                data = json.load(f)
+        except Exception:
+            return {}
+        if data.get("version") != MANIFEST_VERSION:
+            return {}
+        return data.get("folders", {})
+
+    def get(self, name):
+        """Return the entry for a subfolder name, or None."""
+        return self.folders.get(name)
+
+    def set(self, name, entry):
+        """Store or remove the entry for a subfolder name."""
+        if entry is None:
+            self.folders.pop(name, None)
+        else:
+            self.folders[name] = entry
+
+    def save(self):
+        """Atomically write the manifest to disk."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(".tmp")
+        with tmp_path.open("w") as f:
+            json.dump({"version": MANIFEST_VERSION, "folders": self.folders}, f)
+        tmp_path.replace(self.path)
@@ -0,0 +1,234 @@
+"""Merge several ``.brushset`` archives into one, or split brushes out of one.
+
+Both operations copy each member's compressed bytes straight from one archive into another,
+so they cost only I/O: nothing is decompressed or compressed again. The one member that is
+written fresh is ``brushset.plist``, whose ``brushes`` list is rebuilt to match the brush
+folders the new archive holds and which is compressed with the given CompressionPolicy.
+"""
+
+from dataclasses import dataclass, field
+import logging
+from pathlib import Path
+import time
+import zipfile
+
+from .archive import BrushsetZipFile, can_copy_raw, copy_info, iter_raw_member, write_plist_member
+from .compression import CompressionPolicy
+from .inspector import ArchiveError, read_archive_metadata
+from .metadata import dump_metadata
+from .validation import PLIST_NAME, brush_files
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class MergeResult:
+    """Outcome of writing one merged or split archive."""
+
+    output: Path
+    brushes: list[str] = field(default_factory=list)
+    file_count: int = 0
+    output_bytes: int = 0
+    # Brushes left out because an earlier archive already had a folder of the same name
+    duplicates: list[str] = field(default_factory=list)
+    seconds: float = 0.0
+
+
+def _archive_brushes(zf, metadata):
+    """Return the brush folders of an open archive.
+
+    Every top-level folder counts, as it does for validation and the inspector. Folders
+    listed in brushset.plist come first in that order, then the rest in name order.
+    """
+    folders = brush_files(zinfo.filename for zinfo in zf.infolist())
+    listed = [str(brush) for brush in (metadata or {}).get("brushes", [])]
+    ordered = list(dict.fromkeys(brush for brush in listed if brush in folders))
+    return ordered + sorted(set(folders).difference(ordered))
+
+
+def _copy_member(zf, zinfo, out):
+    """Copy one member's data into ``out`` without decompressing it."""
+    if zinfo.is_dir():
+        out.writestr(copy_info(zinfo), b"")
+    elif can_copy_raw(zinfo):
+        out.write_compressed(copy_info(zinfo), iter_raw_member(zf, zinfo))
+    else:
+        raise ArchiveError(f"{zinfo.filename} is encrypted and can't be copied")
+
+
+def _write_archive(output, members, metadata, plist_format, policy):
+    """Write ``members``, a list of ``(zipfile, zinfo)`` pairs, and a new brushset.plist.
+
+    The archive is written next to ``output`` and moved into place once complete, so
+    ``output`` may be one of the archives being read.
+
+    Returns:
+        Tuple of (file count, archive size).
+    """
+    partial_path = output.with_name(output.name + ".partial")
+    file_count = 0
+    try:
+        with BrushsetZipFile(partial_path, "w") as out:
+            for zf, zinfo in members:
+                _copy_member(zf, zinfo, out)
+                file_count += not zinfo.is_dir()
+            write_plist_member(out, dump_metadata(metadata, plist_format), policy)
+        partial_path.replace(output)
+    except (OSError, zipfile.BadZipFile) as e:
+        partial_path.unlink(missing_ok=True)
+        raise ArchiveError(str(e)) from e
+    except BaseException:
+        partial_path.unlink(missing_ok=True)
+        raise
+    return file_count + 1, output.stat().st_size
+
+
+def _open_archive(path):
+    """Open an archive for reading, returning it with its brushset.plist."""
+    try:
+        zf = zipfile.ZipFile(path)
+    except (OSError, zipfile.BadZipFile) as e:
+        raise ArchiveError(f"Can't read {path}: {e}") from e
+    metadata, _ = read_archive_metadata(zf)
+    return zf, metadata
+
+
+def merge_archives(archives, output, *, name=None, plist_format="xml", policy=None):
+    """Combine the brushes of several archives into a new archive.
+
+    Brushes keep the order of the archives and of each archive's brushset.plist. A brush
+    folder that an earlier archive already contributed is left out and reported in
+    ``duplicates``; brush folders are UUIDs, so the same name means the same brush.
+    Other top-level files are taken from the first archive that has them.
+
+    Args:
+        archives: Archive paths to merge, in order.
+        output: Archive to write.
+        name: Name of the merged brushset, defaults to the output file name.
+        plist_format: ``"xml"`` or ``"binary"`` for the new brushset.plist.
+        policy: CompressionPolicy for the new brushset.plist, deflate by default.
+
+    Returns:
+        MergeResult for the new archive.
+
+    Raises:
+        ArchiveError: If an archive can't be read or the output can't be written.
+    """
+    start = time.perf_counter()
+    output = Path(output)
+    policy = policy or CompressionPolicy()
+    result = MergeResult(output=output)
+    metadata = {}
+    members = []
+    seen = set()
+    opened = []
+    try:
+        for archive in archives:
+            zf, source_metadata = _open_archive(archive)
+            opened.append(zf)
+            if not metadata and source_metadata:
+                metadata = source_metadata
+            brushes = _archive_brushes(zf, source_metadata)
+            dropped = {brush for brush in brushes if brush in seen}
+            result.duplicates.extend(sorted(dropped))
+            result.brushes.extend(brush for brush in brushes if brush not in dropped)
+            taken = set()
+            for zinfo in zf.infolist():
+                if zinfo.filename == PLIST_NAME:
+                    continue
+                top = zinfo.filename.partition("/")[0]
+                if top in seen or top in dropped:
+                    continue
+                taken.add(top)
+                members.append((zf, zinfo))
+            seen |= taken
+
+        metadata = dict(metadata, name=name or output.stem, brushes=result.brushes)
+        result.file_count, result.output_bytes = _write_archive(
+            output, members, metadata, plist_format, policy
+        )
+    finally:
+        for zf in opened:
+            zf.close()
+
+    result.seconds = time.perf_counter() - start
+    logger.info(
+        "Merged %d archives into %s",
+        len(opened),
+        output.name,
+        extra={"data": {
+            "brushes": len(result.brushes),
+            "duplicates": len(result.duplicates),
+            "files": result.file_count,
+            "output_bytes": result.output_bytes,
+            "seconds": round(result.seconds, 4),
+        }},
+    )
+    return result
+
+
+def split_archive(
+    archive, output, brushes, *, name=None, plist_format="xml", remove=False, policy=None
+):
+    """Copy some brushes of an archive into a new archive.
+
+    Args:
+        archive: Archive to take the brushes from.
+        output: Archive to write.
+        brushes: Brush folder names (UUIDs) to take.
+        name: Name of the new brushset, defaults to the output file name.
+        plist_format: ``"xml"`` or ``"binary"`` for the new brushset.plist files.
+        remove: Also rewrite ``archive`` without the brushes that were split out.
+        policy: CompressionPolicy for the new brushset.plist files, deflate by default.
+
+    Returns:
+        MergeResult for the new archive.
+
+    Raises:
+        ArchiveError: If a brush isn't in the archive, or an archive can't be read or
+            written.
+    """
+    start = time.perf_counter()
+    archive = Path(archive)
+    output = Path(output)
+    policy = policy or CompressionPolicy()
+    result = MergeResult(output=output)
+    wanted = set(brushes)
+    zf, metadata = _open_archive(archive)
+    with zf:
+        available = _archive_brushes(zf, metadata)
+        missing = sorted(wanted.difference(available))
+        if missing:
+            raise ArchiveError(f"{archive.name} has no brush {', '.join(missing)}")
+        result.brushes = [brush for brush in available if brush in wanted]
+
+        taken, kept = [], []
+        for zinfo in zf.infolist():
+            if zinfo.filename == PLIST_NAME:
+                continue
+            top, sep, _ = zinfo.filename.partition("/")
+            (taken if sep and top in wanted else kept).append((zf, zinfo))
+
+        split_metadata = dict(metadata or {}, name=name or output.stem, brushes=result.brushes)
+        result.file_count, result.output_bytes = _write_archive(
+            output, taken, split_metadata, plist_format, policy
+        )
+        if remove:
+            remaining = [brush for brush in available if brush not in wanted]
+            source_metadata = dict(metadata or {"name": archive.stem}, brushes=remaining)
+            _write_archive(archive, kept, source_metadata, plist_format, policy)
+
+    result.seconds = time.perf_counter() - start
+    logger.info(
+        "Split %d brushes from %s into %s",
+        len(result.brushes),
+        archive.name,
+        output.name,
+        extra={"data": {
+            "files": result.file_count,
+            "output_bytes": result.output_bytes,
+            "removed": remove,
+            "seconds": round(result.seconds, 4),
+        }},
+    )
+    return result
@@ -0,0 +1,141 @@
+"""Brushset metadata (``brushset.plist``) generation, loading and saving.
+
+Metadata is built from the member names the packaging scan produced, so generating it for
+hundreds of sets costs one small plist read per set and no extra directory walks. Parsed
+plists are cached per process, keyed by path, modification time and size, so repeated
+runs and the editor only parse a plist again once it has changed.
+"""
+
+import copy
+from datetime import datetime
+from pathlib import Path
+import plistlib
+import threading
+
+from .validation import PLIST_NAME, brush_files, is_uuid_format
+
+PLIST_FORMATS = {"xml": plistlib.FMT_XML, "binary": plistlib.FMT_BINARY}
+
+# Parsed plists by path, with the (mtime_ns, size) they were parsed at
+MAX_CACHED_PLISTS = 1024
+_cache = {}
+_cache_lock = threading.Lock()
+
+
+def format_name(template, folder_name):
+    """Fill in a brushset name template such as ``"{folder_name}"``."""
+    now = datetime.now()
+    return template.format(
+        folder_name=folder_name,
+        date=now.strftime("%Y-%m-%d"),
+        datetime=now.strftime("%Y-%m-%d %H:%M"),
+    )
+
+
+def _remember(path, st, metadata):
+    """Cache a parsed plist against the stat result it was read or written with."""
+    with _cache_lock:
+        _cache.pop(path, None)
+        _cache[path] = ((st.st_mtime_ns, st.st_size), metadata)
+        if len(_cache) > MAX_CACHED_PLISTS:
+            _cache.pop(next(iter(_cache)))
+
+
+def read_metadata(plist_path):
+    """Parse a plist in either format, reusing the cached result while the file is unchanged.
+
+    Returns a copy the caller is free to modify.
+
+    Raises:
+        OSError: If the file can't be read.
+        plistlib.InvalidFileException: If it isn't a plist.
+    """
+    path = Path(plist_path)
+    st = path.stat()
+    with _cache_lock:
+        cached = _cache.get(path)
+    if cached is not None and cached[0] == (st.st_mtime_ns, st.st_size):
+        return copy.deepcopy(cached[1])
+    with Path(path).open("rb") as f:
+        metadata = plistlib.load(f)
+    _remember(path, st, metadata)
+    return copy.deepcopy(metadata)
+
+
+def load_metadata(plist_path):
+    """Return the parsed brushset.plist at ``plist_path``, or None if missing or invalid."""
+    try:
+        metadata = read_metadata(plist_path)
+    except Exception:
+        return None
+    return metadata if isinstance(metadata, dict) else None
+
+
+def generate_metadata(folder_name, arcnames, existing=None, populate=True, name_template=None):
+    """Create or refresh brushset metadata.
+
+    Args:
+        folder_name: Name of the brushset source folder.
+        arcnames: Member names from the packaging scan.
+        existing: Parsed brushset.plist to refresh, if the folder has one. Keys other than
+            ``brushes`` are kept as they are.
+        populate: Rebuild the ``brushes`` list from the UUID-named brush folders. Brushes
+            already listed keep their order; new ones are appended in name order.
+        name_template: Template for ``name`` when there is no existing metadata.
+
+    Returns:
+        The metadata dict.
+    """
+    if existing is not None:
+        metadata = dict(existing)
+    else:
+        metadata = {"name": format_name(name_template or "{folder_name}", folder_name)}
+
+    if populate:
+        on_disk = sorted(brush for brush in brush_files(arcnames) if is_uuid_format(brush))
+        present = set(on_disk)
+        listed = [brush for brush in metadata.get("brushes", []) if brush in present]
+        kept = set(listed)
+        metadata["brushes"] = listed + [brush for brush in on_disk if brush not in kept]
+    else:
+        metadata.setdefault("brushes", [])
+    return metadata
+
+
+def dump_metadata(metadata, fmt="xml"):
+    """Serialize metadata as an XML or binary plist, for an archive or for disk."""
+    return plistlib.dumps(metadata, fmt=PLIST_FORMATS.get(fmt, plistlib.FMT_XML))
+
+
+def save_metadata(plist_path, metadata, fmt="xml"):
+    """Write metadata to ``plist_path`` unless the file already holds the same bytes.
+
+    The file is replaced atomically and the cache updated, so reading it back is free.
+
+    Returns:
+        True if the file was written.
+    """
+    path = Path(plist_path)
+    data = dump_metadata(metadata, fmt)
+    try:
+        if path.read_bytes() == data:
+            return False
+    except OSError:
+        pass
+    temp_path = path.with_name(path.name + ".partial")
+    temp_path.write_bytes(data)
+    temp_path.replace(path)
+    _remember(path, path.stat(), copy.deepcopy(metadata))
+    return True
+
+
+__all__ = [
+    "PLIST_FORMATS",
+    "PLIST_NAME",
+    "dump_metadata",
+    "format_name",
+    "generate_metadata",
+    "load_metadata",
+    "read_metadata",
+    "save_metadata",
+]
@@ -1,11 +1,13 @@
 """Plist editor window for editing brushset metadata."""
 
-import plistlib
 from pathlib import Path
 
 import toga
 from toga.style import Pack
 
+from .metadata import PLIST_NAME, load_metadata, save_metadata
+from .validation import is_uuid_format
+
 
 class PlistEditorWindow:
     """Window for editing brushset metadata plist files."""
@@ -14,7 +16,7 @@ class PlistEditorWindow:
         """Initialize the plist editor window."""
         self.app = app
         self.folder_path = Path(folder_path)
-        self.plist_path = self.folder_path / "brushset.plist"
+        self.plist_path = self.folder_path / PLIST_NAME
         self.metadata = self._load_or_create_metadata()
 
         # Create the window
@@ -23,13 +25,10 @@ class PlistEditorWindow:
 
     def _load_or_create_metadata(self):
         """Load existing plist or create default metadata."""
-        if self.plist_path.exists():
-            try:
-                with open(self.plist_path, 'rb') as f:
-                    return plistlib.load(f)
-            except Exception:
-                # If plist is invalid, return default
-                pass
+        # Parsed plists are cached by mtime, so reopening an unchanged folder is free
+        metadata = load_metadata(self.plist_path)
+        if metadata is not None:
+            return metadata
 
         # Auto-detect brush folders (UUID format)
         brush_uuids = []
@@ -45,15 +44,7 @@ class PlistEditorWindow:
 
     def _is_uuid_format(self, name):
         """Check if string matches UUID format."""
-        # UUID format: 8-4-4-4-12 hex digits
-        parts = name.split('-')
-        if len(parts) != 5:
-            return False
-        try:
-            return (len(parts[0]) == 8 and len(parts[1]) == 4 and
-                    len(parts[2]) == 4 and len(parts[3]) == 4 and len(parts[4]) == 12)
-        except Exception:
-            return False
+        return is_uuid_format(name)
 
     def _build_editor_ui(self):
         """Build the editor UI."""
@@ -134,8 +125,11 @@ class PlistEditorWindow:
             self.metadata['name'] = self.name_input.value
 
             # Write to plist file
-            with open(self.plist_path, 'wb') as f:
-                plistlib.dump(self.metadata, f)
+            save_metadata(
+                self.plist_path,
+                self.metadata,
+                self.app.settings.get("plist_format", "xml")
+            )
 
             await self.app.main_window.info_dialog(
                 "Success",
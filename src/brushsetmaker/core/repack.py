@@ -0,0 +1,285 @@
+"""Rewrite existing ``.brushset`` archives with different compression settings.
+
+Members go straight from the old archive to the new one. When a member already uses the
+method the CompressionPolicy picks for it, and the archive's comment says it was written
+with the same level and policy, its compressed bytes are copied across without being
+decompressed. Otherwise it is decompressed and compressed again in chunks through a
+spooled temporary file, so memory stays bounded whatever the member size. The CRC-32 and
+size of a member don't change with its compression, so they are taken from the old
+archive rather than recomputed.
+"""
+
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
+import logging
+from pathlib import Path
+import tempfile
+import time
+import zipfile
+
+from .archive import (
+    COPY_CHUNK_SIZE,
+    BrushsetZipFile,
+    can_copy_raw,
+    copy_info,
+    iter_raw_member,
+    new_compressor,
+    policy_comment,
+    written_with,
+)
+from .compression import PROBE_SIZE
+from .extract import find_archives
+from .inspector import ArchiveError
+
+logger = logging.getLogger(__name__)
+
+# Recompressed members are buffered in memory up to this size, then on disk
+SPOOL_SIZE = 8 * 1024 * 1024
+
+
+class RepackCancelledError(ArchiveError):
+    """Raised when a repack is cancelled before it finishes."""
+
+
+@dataclass
+class RepackResult:
+    """Outcome of repacking a single archive."""
+
+    archive: Path
+    output: Path
+    file_count: int = 0
+    copied_count: int = 0
+    input_bytes: int = 0
+    output_bytes: int = 0
+    error: str | None = None
+    seconds: float = 0.0
+
+    @property
+    def ok(self):
+        """Whether the archive was repacked."""
+        return self.error is None
+
+
+@dataclass
+class BulkRepackResult:
+    """Outcome of repacking many archives."""
+
+    results: list[RepackResult] = field(default_factory=list)
+    cancelled: bool = False
+    seconds: float = 0.0
+
+    @property
+    def processed_count(self):
+        """Number of archives repacked."""
+        return sum(1 for result in self.results if result.ok)
+
+    @property
+    def error_count(self):
+        """Number of archives that could not be repacked."""
+        return sum(1 for result in self.results if not result.ok)
+
+    @property
+    def errors(self):
+        """Human readable error lines, one per failed archive."""
+        return [
+            f"{result.archive.name}: {result.error}" for result in self.results if not result.ok
+        ]
+
+    @property
+    def saved_bytes(self):
+        """Total size reduction, negative when the archives grew."""
+        return sum(result.input_bytes - result.output_bytes for result in self.results)
+
+
+def target_method(zf, zinfo, policy):
+    """Return the method the policy wants for an existing member.
+
+    The first block is only decompressed when the policy needs to probe the contents.
+    """
+    if not policy.needs_probe(zinfo.filename):
+        return policy.method_for(zinfo.filename)
+    with zf.open(zinfo) as f:
+        return policy.method_for(zinfo.filename, head=f.read(PROBE_SIZE))
+
+
+def _recompress(zf, zinfo, compress_type, compresslevel, spool):
+    """Compress a member again into ``spool``, returning the new ZipInfo."""
+    new_info = copy_info(zinfo)
+    new_info.compress_type = compress_type
+    compressor = new_compressor(compress_type, compresslevel)
+    with zf.open(zinfo) as f:
+        while chunk := f.read(COPY_CHUNK_SIZE):
+            spool.write(chunk if compressor is None else compressor.compress(chunk))
+    if compressor is not None:
+        spool.write(compressor.flush())
+    new_info.compress_size = spool.tell()
+    spool.seek(0)
+    return new_info
+
+
+def repack_archive(
+    source, output, policy, *, recompress=None, check_cancelled=None, backup=False
+):
+    """Write a copy of ``source`` to ``output`` using ``policy`` for each member.
+
+    ``output`` may be ``source`` itself; the new archive is written next to it and moved
+    into place once complete.
+
+    Args:
+        source: Existing archive.
+        output: Archive to write.
+        policy: CompressionPolicy choosing each member's method and level.
+        recompress: Compress members again even when their method already matches, for
+            example to apply a different level. By default that happens unless the
+            archive's comment says it was written with ``policy``.
+        check_cancelled: Optional callable returning True once the repack should stop.
+        backup: Keep an existing ``output`` as ``<name>.brushset.backup``.
+
+    Returns:
+        RepackResult for the archive.
+
+    Raises:
+        ArchiveError: If the archive can't be read or written.
+        RepackCancelledError: If ``check_cancelled`` reported a cancel.
+    """
+    start = time.perf_counter()
+    source = Path(source)
+    output = Path(output)
+    result = RepackResult(archive=source, output=output)
+    partial_path = output.with_name(output.name + ".partial")
+    try:
+        result.input_bytes = source.stat().st_size
+        with zipfile.ZipFile(source) as zf, BrushsetZipFile(partial_path, "w") as out:
+            matches = written_with(zf, policy)
+            if recompress is None:
+                recompress = not matches
+            for zinfo in zf.infolist():
+                if check_cancelled and check_cancelled():
+                    raise RepackCancelledError("Cancelled")
+                if zinfo.is_dir():
+                    out.writestr(copy_info(zinfo), b"")
+                    continue
+                method = target_method(zf, zinfo, policy)
+                if method == zinfo.compress_type and can_copy_raw(zinfo) and not recompress:
+                    out.write_compressed(copy_info(zinfo), iter_raw_member(zf, zinfo))
+                    result.copied_count += 1
+                else:
+                    with tempfile.SpooledTemporaryFile(SPOOL_SIZE) as spool:
+                        new_info = _recompress(
+                            zf, zinfo, method, policy.level_for(method), spool
+                        )
+                        out.write_compressed(
+                            new_info, iter(lambda: spool.read(COPY_CHUNK_SIZE), b"")
+                        )
+                result.file_count += 1
+            # Copied members keep their old level unless the archive already matched
+            out.comment = policy_comment(policy) if recompress or matches else b""
+        if backup and output.exists():
+            # The old archive is moved aside rather than copied; it isn't needed any more
+            output.replace(output.with_suffix(output.suffix + ".backup"))
+        partial_path.replace(output)
+    except (OSError, zipfile.BadZipFile, RuntimeError, NotImplementedError) as e:
+        partial_path.unlink(missing_ok=True)
+        raise ArchiveError(str(e)) from e
+    except BaseException:
+        partial_path.unlink(missing_ok=True)
+        raise
+    result.output_bytes = output.stat().st_size
+    result.seconds = time.perf_counter() - start
+    logger.info(
+        "Repacked %s",
+        source.name,
+        extra={"data": {
+            "files": result.file_count,
+            "copied": result.copied_count,
+            "input_bytes": result.input_bytes,
+            "output_bytes": result.output_bytes,
+            "seconds": round(result.seconds, 4),
+        }},
+    )
+    return result
+
+
+def collect_archives(paths):
+    """Expand folders into the ``.brushset`` files they contain, keeping files as given."""
+    archives = []
+    for path in map(Path, paths):
+        archives.extend(find_archives(path) if path.is_dir() else [path])
+    return archives
+
+
+def repack_bulk(
+    archives,
+    policy,
+    *,
+    output_dir=None,
+    workers=1,
+    recompress=None,
+    progress=None,
+    cancel_event=None,
+    backup=False,
+):
+    """Repack many archives concurrently.
+
+    Each archive is handled by one thread; zlib, bz2 and lzma release the GIL while they
+    work, and raw copies are plain I/O.
+
+    Args:
+        archives: Archive paths, for example from collect_archives.
+        policy: CompressionPolicy for the new archives.
+        output_dir: Where to write the new archives; by default each replaces its source.
+        workers: Number of archives repacked at once.
+        recompress: See repack_archive.
+        progress: Optional callable ``progress(done, total, archive)``.
+        cancel_event: Optional ``threading.Event``-like object that stops the run.
+        backup: See repack_archive.
+
+    Returns:
+        BulkRepackResult with a RepackResult per finished archive, in the given order.
+    """
+    start = time.perf_counter()
+    archives = [Path(archive) for archive in archives]
+    if output_dir:
+        Path(output_dir).mkdir(parents=True, exist_ok=True)
+    bulk = BulkRepackResult()
+    cancelled = cancel_event.is_set if cancel_event is not None else None
+
+    def repack_one(archive):
+        if cancelled and cancelled():
+            return None
+        output = Path(output_dir, archive.name) if output_dir else archive
+        try:
+            return repack_archive(
+                archive,
+                output,
+                policy,
+                recompress=recompress,
+                check_cancelled=cancelled,
+                backup=backup,
+            )
+        except RepackCancelledError:
+            return None
+        except ArchiveError as e:
+            logger.error("Failed to repack %s: %s", archive.name, e)
+            return RepackResult(archive=archive, output=output, error=str(e))
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        futures = {executor.submit(repack_one, archive): archive for archive in archives}
+        try:
+            for done, future in enumerate(as_completed(futures), 1):
+                result = future.result()
+                if result is not None:
+                    bulk.results.append(result)
+                if progress:
+                    progress(done, len(archives), futures[future])
+        except BaseException:
+            if cancel_event is not None:
+                cancel_event.set()
+            executor.shutdown(cancel_futures=True)
+            raise
+
+    order = {archive: idx for idx, archive in enumerate(archives)}
+    bulk.results.sort(key=lambda result: order[result.archive])
+    bulk.cancelled = bool(cancelled and cancelled())
+    bulk.seconds = time.perf_counter() - start
+    return bulk
@@ -0,0 +1,229 @@
+"""Per-stage timing and throughput reports for packaging runs."""
+
+from contextlib import contextmanager
+import csv
+from dataclasses import asdict
+from datetime import datetime
+import json
+from pathlib import Path
+import threading
+import time
+
+# Stages a packaging run is broken down into. Compression threads overlap, so per-stage
+# totals can add up to more than the wall time of a build.
+STAGES = ("scan", "read", "compress", "write", "plist", "validate")
+
+REPORT_FORMATS = ("json", "csv")
+
+ROW_FIELDS = (
+    "name",
+    "status",
+    "output",
+    "files",
+    "reused",
+    "input_bytes",
+    "output_bytes",
+    "ratio",
+    "seconds",
+    *(f"{stage}_seconds" for stage in STAGES),
+    "issues",
+    "error",
+)
+
+
+class StageTimings:
+    """Thread-safe accumulator of the seconds spent in each packaging stage.
+
+    When given a TraceRecorder, every measured interval is also recorded as a trace span.
+    """
+
+    def __init__(self, tracer=None):
+        """Start every stage at zero."""
+        self.seconds = dict.fromkeys(STAGES, 0.0)
+        self.tracer = tracer
+        self._lock = threading.Lock()
+
+    def add(self, stage, seconds):
+        """Add ``seconds`` to ``stage``."""
+        with self._lock:
+            self.seconds[stage] += seconds
+
+    def _finish(self, stage, start_ns, detail):
+        """Account for an interval of ``stage`` that started at ``start_ns``."""
+        end_ns = time.perf_counter_ns()
+        self.add(stage, (end_ns - start_ns) / 1e9)
+        if self.tracer:
+            self.tracer.add_span(stage, start_ns, end_ns, args={"file": detail} if detail else None)
+
+    @contextmanager
+    def measure(self, stage, detail=None):
+        """Time the body of a ``with`` block as ``stage``.
+
+        ``detail``, typically the member name, is attached to the trace span.
+        """
+        start = time.perf_counter_ns()
+        try:
+            yield
+        finally:
+            self._finish(stage, start, detail)
+
+    @contextmanager
+    def span(self, name, **args):
+        """Trace the body of a ``with`` block without counting it towards any stage."""
+        if not self.tracer:
+            yield
+            return
+        with self.tracer.span(name, **args):
+            yield
+
+    def timed_iter(self, iterable, stage):
+        """Yield from ``iterable``, counting the time spent producing each item as ``stage``."""
+        iterator = iter(iterable)
+        while True:
+            start = time.perf_counter_ns()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                self._finish(stage, start, None)
+                return
+            self._finish(stage, start, getattr(item, "arcname", None))
+            yield item
+
+    def as_dict(self):
+        """Return a plain copy of the per-stage totals."""
+        with self._lock:
+            return dict(self.seconds)
+
+
+def _status(result):
+    """Return a one-word status for a BrushsetResult."""
+    if result.empty:
+        return "empty"
+    if not result.ok:
+        return "failed"
+    if result.skipped:
+        return "unchanged"
+    return "built"
+
+
+def _ratio(output_bytes, input_bytes):
+    """Return output size as a fraction of input size, or None when there was no input."""
+    return round(output_bytes / input_bytes, 4) if input_bytes else None
+
+
+def result_row(result):
+    """Flatten one BrushsetResult into a report row."""
+    row = {
+        "name": result.folder.name,
+        "status": _status(result),
+        "output": str(result.output),
+        "files": result.file_count,
+        "reused": result.reused_count,
+        "input_bytes": result.input_bytes,
+        "output_bytes": result.output_bytes,
+        "ratio": _ratio(result.output_bytes, result.input_bytes),
+        "seconds": round(result.seconds, 4),
+    }
+    for stage in STAGES:
+        row[f"{stage}_seconds"] = round(result.timings.get(stage, 0.0), 4)
+    row["issues"] = len(result.issues)
+    row["error"] = result.error or ""
+    return row
+
+
+def build_report(results, seconds, root=None, duplicates=None):
+    """Summarize packaging results into a report.
+
+    Args:
+        results: BrushsetResult objects, one per brushset.
+        seconds: Wall-clock duration of the whole run.
+        root: Folder the run packaged, recorded for reference.
+        duplicates: Optional DuplicateGroup list from the duplicate check.
+
+    Returns:
+        Dict with ``run`` totals and one ``brushsets`` row per result. Throughput only
+        counts brushsets that were actually written, not unchanged ones. Rows list their
+        validation issues under ``validation``.
+    """
+    rows = []
+    issues = []
+    for result in results:
+        row = result_row(result)
+        row["validation"] = [asdict(issue) for issue in result.issues]
+        issues.extend(result.issues)
+        rows.append(row)
+    built = [row for row in rows if row["status"] == "built"]
+    files = sum(row["files"] for row in built)
+    input_bytes = sum(row["input_bytes"] for row in built)
+    output_bytes = sum(row["output_bytes"] for row in built)
+
+    run = {
+        "generated": datetime.now().isoformat(timespec="seconds"),
+        "root": str(root) if root else None,
+        "brushsets": len(rows),
+        "built": len(built),
+        "unchanged": sum(1 for row in rows if row["status"] == "unchanged"),
+        "errors": sum(1 for row in rows if row["status"] in ("failed", "empty")),
+        "validation_errors": sum(1 for issue in issues if issue.severity == "error"),
+        "validation_warnings": sum(1 for issue in issues if issue.severity == "warning"),
+        "files": files,
+        "input_bytes": input_bytes,
+        "output_bytes": output_bytes,
+        "ratio": _ratio(output_bytes, input_bytes),
+        "seconds": round(seconds, 4),
+        "files_per_second": round(files / seconds, 1) if seconds else None,
+        "mb_per_second": round(input_bytes / 1e6 / seconds, 2) if seconds else None,
+    }
+    for stage in STAGES:
+        run[f"{stage}_seconds"] = round(sum(row[f"{stage}_seconds"] for row in rows), 4)
+    report = {"run": run, "brushsets": rows}
+    if duplicates is not None:
+        run["duplicate_groups"] = len(duplicates)
+        report["duplicates"] = duplicate_rows(duplicates)
+    return report
+
+
+def duplicate_rows(duplicates):
+    """Flatten DuplicateGroup objects for a report."""
+    return [
+        {"size": group.size, "wasted_bytes": group.wasted_bytes, "brushes": group.brushes}
+        for group in duplicates
+    ]
+
+
+def default_report_path(directory, fmt="json"):
+    """Return a timestamped report path inside ``directory``."""
+    stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+    return Path(directory) / f"brushsetmaker-report-{stamp}.{fmt}"
+
+
+def write_report(report, path):
+    """Write a report as CSV when ``path`` ends in ``.csv``, otherwise as JSON.
+
+    The CSV has one row per brushset followed by a ``TOTAL`` row for the whole run.
+    """
+    path = Path(path)
+    if path.suffix.lower() != ".csv":
+        with path.open("w") as f:
+            json.dump(report, f, indent=2)
+        return path
+
+    run = report["run"]
+    rows = report["brushsets"]
+    total = {
+        "name": "TOTAL",
+        "status": f"{run['built']} built, {run['unchanged']} unchanged, {run['errors']} errors",
+        "files": run["files"],
+        "input_bytes": run["input_bytes"],
+        "output_bytes": run["output_bytes"],
+        "ratio": run["ratio"],
+        "seconds": run["seconds"],
+        **{f"{stage}_seconds": run[f"{stage}_seconds"] for stage in STAGES},
+        "issues": run["validation_errors"] + run["validation_warnings"],
+    }
+    with path.open("w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=ROW_FIELDS, extrasaction="ignore")
+        writer.writeheader()
+        writer.writerows(rows)
+        writer.writerow(total)
+    return path
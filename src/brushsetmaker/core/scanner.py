@@ -0,0 +1,68 @@
+"""Single-pass directory scanner for brushset source folders.
+
+``os.scandir`` hands back file type information from the directory listing itself, so the
+tree is walked once and every file is stat-ed once, with the result cached on the entry.
+"""
+
+from dataclasses import dataclass
+import os
+from pathlib import Path
+
+
+@dataclass(slots=True)
+class SourceFile:
+    """A file found while scanning a source folder."""
+
+    path: Path
+    arcname: str
+    stat: os.stat_result
+
+    @property
+    def size(self):
+        """File size in bytes, from the cached stat result."""
+        return self.stat.st_size
+
+
+def iter_entries(folder):
+    """Yield every DirEntry below ``folder``, files and directories alike, depth first.
+
+    Entries are sorted by name within each directory so archives come out in a
+    deterministic order. Symlinked directories are not followed.
+    """
+    stack = [os.fspath(folder)]
+    while stack:
+        directory = stack.pop()
+        with os.scandir(directory) as it:
+            entries = sorted(it, key=lambda entry: entry.name)
+
+        subdirs = []
+        for entry in entries:
+            yield entry
+            if entry.is_dir(follow_symlinks=False):
+                subdirs.append(entry.path)
+        # Reverse so the stack pops subdirectories in name order
+        stack.extend(reversed(subdirs))
+
+
+def iter_source_files(folder, include_hidden=False):
+    """Lazily yield a SourceFile for every regular file that belongs in the archive.
+
+    Args:
+        folder: Folder to scan.
+        include_hidden: Whether to include files whose name starts with a dot.
+    """
+    folder = Path(folder)
+    prefix_len = len(os.fspath(folder)) + 1
+    for entry in iter_entries(folder):
+        if not include_hidden and entry.name.startswith("."):
+            continue
+        if not entry.is_file():
+            continue
+        arcname = entry.path[prefix_len:].replace(os.sep, "/")
+        yield SourceFile(Path(entry.path), arcname, entry.stat())
+
+
+def has_entries(folder):
+    """Check whether a folder contains anything, stopping at the first entry found."""
+    with os.scandir(folder) as it:
+        return next(it, None) is not None
@@ -1,17 +1,38 @@
 """Application settings management."""
 
 import json
+import logging
 from pathlib import Path
 
+logger = logging.getLogger(__name__)
+
+# compression_level setting values and the ZIP levels they stand for
+COMPRESSION_LEVELS = {
+    "store": 0,
+    "fast": 1,
+    "normal": 6,
+    "maximum": 9,
+}
+
 
 class Settings:
     """Manages application settings with persistent storage."""
 
     def __init__(self):
-        """Initialize settings with defaults."""
+        """Initialize settings with defaults.
+
+        The settings file is read on first access and its folder created on first save, so
+        constructing Settings at startup costs no I/O.
+        """
         self.settings_path = Path.home() / ".brushsetmaker" / "settings.json"
-        self.settings_path.parent.mkdir(parents=True, exist_ok=True)
-        self._settings = self._load_settings()
+        self._loaded = None
+
+    @property
+    def _settings(self):
+        """The settings dict, loaded from disk the first time it's needed."""
+        if self._loaded is None:
+            self._loaded = self._load_settings()
+        return self._loaded
 
     def _get_defaults(self):
         """Return default settings."""
@@ -25,18 +46,24 @@ class Settings:
             # Compression Settings
             "compression_level": "normal",  # store, fast, normal, maximum
             "compression_method": "deflate",  # deflate, stored, bzip2, lzma
+            "compression_policy": "auto",  # auto, extensions, off
+            "compression_threads": 0,  # threads per brushset, 0 = one per CPU
+            "reuse_compressed_entries": True,
 
             # Metadata Defaults
             "default_name_template": "{folder_name}",
             "default_author": "",
             "auto_create_plist": True,
             "auto_populate_brushes": True,
+            "write_plist_to_source": False,
+            "plist_format": "xml",  # xml, binary
 
             # Validation & Checks
             "validate_brush_structure": False,
             "warn_empty_folders": True,
             "verify_uuid_format": True,
             "check_duplicate_brushes": False,
+            "duplicate_action": "warn",  # warn, fail
 
             # UI Preferences
             "show_progress_details": True,
@@ -45,20 +72,26 @@ class Settings:
             # Bulk Processing
             "skip_hidden_folders": True,
             "error_handling": "continue",  # continue, stop
+            "bulk_workers": 0,  # worker processes, 0 = one per CPU
+            "incremental_builds": True,
+            "manifest_hash_contents": False,
             "generate_report": False,
+            "report_format": "json",  # json, csv
 
             # Advanced
             "include_hidden_files": False,
             "preserve_timestamps": False,
             "create_backup": False,
             "logging_level": "info",  # none, errors, info, debug
+            "trace_packaging": False,
+            "thumbnail_cache_mb": 200,
         }
 
     def _load_settings(self):
         """Load settings from file or return defaults."""
         if self.settings_path.exists():
             try:
-                with open(self.settings_path) as f:
+                with self.settings_path.open() as f:
                     loaded = json.load(f)
                     # Merge with defaults to handle new settings
                     defaults = self._get_defaults()
@@ -71,10 +104,11 @@ class Settings:
     def save(self):
         """Save current settings to file."""
         try:
-            with open(self.settings_path, 'w') as f:
+            self.settings_path.parent.mkdir(parents=True, exist_ok=True)
+            with self.settings_path.open('w') as f:
                 json.dump(self._settings, f, indent=2)
         except Exception as e:
-            print(f"Failed to save settings: {e}")
+            logger.error("Failed to save settings: %s", e)
 
     def get(self, key, default=None):
         """Get a setting value."""
@@ -86,14 +120,8 @@ class Settings:
 
     def get_compression_level(self):
         """Get ZIP compression level as integer."""
-        levels = {
-            "store": 0,
-            "fast": 1,
-            "normal": 6,
-            "maximum": 9
-        }
         level_name = str(self.get("compression_level", "normal"))
-        return levels.get(level_name, 6)
+        return COMPRESSION_LEVELS.get(level_name, 6)
 
     def get_compression_method(self):
         """Get ZIP compression method constant."""
@@ -115,10 +143,5 @@ class Settings:
 
     def format_brushset_name(self, folder_name):
         """Format brushset name using template."""
-        from datetime import datetime
-        template = str(self.get("default_name_template", "{folder_name}"))
-        return template.format(
-            folder_name=folder_name,
-            date=datetime.now().strftime("%Y-%m-%d"),
-            datetime=datetime.now().strftime("%Y-%m-%d %H:%M")
-        )
+        from .metadata import format_name
+        return format_name(str(self.get("default_name_template", "{folder_name}")), folder_name)
@@ -0,0 +1,179 @@
+"""Size-bounded on-disk cache of brush thumbnails.
+
+Thumbnails live under ``~/.brushsetmaker/cache/thumbnails`` named by a hash of the source
+image, so renaming or moving a brush doesn't invalidate them and identical textures share
+one file. The least recently used thumbnails are deleted once the cache grows past its
+limit. Downscaling uses Pillow when it is installed; without it, only the small
+``QuickLook/Thumbnail.png`` previews Procreate stores in each brush are used.
+"""
+
+from collections import OrderedDict
+import hashlib
+import io
+import logging
+import os
+from pathlib import Path
+import threading
+
+try:
+    from PIL import Image
+except ImportError:  # Pillow is optional
+    Image = None
+
+logger = logging.getLogger(__name__)
+
+CACHE_DIR = Path.home() / ".brushsetmaker" / "cache" / "thumbnails"
+DEFAULT_MAX_BYTES = 200 * 1024 * 1024
+THUMBNAIL_SIZE = 96
+
+# Images tried in order for a brush folder's thumbnail
+THUMBNAIL_SOURCES = ("QuickLook/Thumbnail.png", "Shape.png", "Grain.png")
+
+# Without Pillow, larger images are skipped rather than shown at full size
+MAX_UNSCALED_BYTES = 256 * 1024
+
+# Source hashes remembered by (path, mtime_ns, size), so unchanged images aren't re-read
+MAX_REMEMBERED_HASHES = 50_000
+
+
+class ThumbnailCache:
+    """Creates brush thumbnails on demand and keeps them in an LRU directory.
+
+    Safe to use from a pool of worker threads.
+    """
+
+    def __init__(self, cache_dir=CACHE_DIR, max_bytes=DEFAULT_MAX_BYTES):
+        """Use ``cache_dir`` for thumbnails, holding at most ``max_bytes`` of them."""
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._usage = None  # key -> size, least recently used first
+        self._total = 0
+        self._hashes = OrderedDict()
+
+    def _load_usage(self):
+        """Read the cache directory once, ordering thumbnails by last use."""
+        if self._usage is not None:
+            return
+        files = []
+        try:
+            with os.scandir(self.cache_dir) as it:
+                for entry in it:
+                    if entry.name.endswith(".png") and entry.is_file():
+                        st = entry.stat()
+                        files.append((st.st_mtime_ns, entry.name[:-4], st.st_size))
+        except FileNotFoundError:
+            pass
+        files.sort()
+        self._usage = OrderedDict((key, size) for _, key, size in files)
+        self._total = sum(self._usage.values())
+
+    def _source_hash(self, path):
+        """Hash an image's contents, remembering the result while the file is unchanged."""
+        st = path.stat()
+        stamp = (os.fspath(path), st.st_mtime_ns, st.st_size)
+        with self._lock:
+            digest = self._hashes.get(stamp)
+        if digest is None:
+            hasher = hashlib.blake2b(f"{THUMBNAIL_SIZE}\0".encode(), digest_size=16)
+            with Path(path).open("rb") as f:
+                while chunk := f.read(1024 * 1024):
+                    hasher.update(chunk)
+            digest = hasher.hexdigest()
+            with self._lock:
+                self._hashes[stamp] = digest
+                if len(self._hashes) > MAX_REMEMBERED_HASHES:
+                    self._hashes.popitem(last=False)
+        return digest, st.st_size
+
+    def thumbnail_for(self, brush_path):
+        """Return the cached thumbnail path for a brush folder, creating it if needed.
+
+        Returns None when the brush has no usable image.
+        """
+        brush_path = Path(brush_path)
+        for name in THUMBNAIL_SOURCES:
+            source = brush_path / name
+            if not source.is_file():
+                continue
+            try:
+                key, size = self._source_hash(source)
+            except OSError:
+                continue
+            if Image is None and size > MAX_UNSCALED_BYTES:
+                continue
+            thumbnail = self._lookup(key)
+            if thumbnail is None:
+                data = _render(source)
+                if data is None:
+                    continue
+                thumbnail = self._store(key, data)
+            return thumbnail
+        return None
+
+    def _lookup(self, key):
+        """Return the thumbnail for ``key`` if cached, marking it recently used."""
+        path = self.cache_dir / f"{key}.png"
+        with self._lock:
+            self._load_usage()
+            if key not in self._usage:
+                return None
+            self._usage.move_to_end(key)
+        try:
+            # The mtime records recency across sessions
+            os.utime(path)
+        except FileNotFoundError:
+            with self._lock:
+                self._total -= self._usage.pop(key, 0)
+            return None
+        return path
+
+    def _store(self, key, data):
+        """Write a thumbnail into the cache and evict the least recently used ones."""
+        path = self.cache_dir / f"{key}.png"
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        temp_path = path.with_name(f"{path.name}.{threading.get_ident()}.partial")
+        temp_path.write_bytes(data)
+        temp_path.replace(path)
+        evicted = []
+        with self._lock:
+            self._load_usage()
+            self._total += len(data) - self._usage.pop(key, 0)
+            self._usage[key] = len(data)
+            while self._total > self.max_bytes and len(self._usage) > 1:
+                old_key, old_size = self._usage.popitem(last=False)
+                self._total -= old_size
+                evicted.append(old_key)
+        for old_key in evicted:
+            (self.cache_dir / f"{old_key}.png").unlink(missing_ok=True)
+        if evicted:
+            logger.debug("Evicted %d thumbnails", len(evicted))
+        return path
+
+    def clear(self):
+        """Delete every cached thumbnail."""
+        with self._lock:
+            self._load_usage()
+            keys = list(self._usage)
+            self._usage.clear()
+            self._total = 0
+        for key in keys:
+            (self.cache_dir / f"{key}.png").unlink(missing_ok=True)
+
+
+def _render(source):
+    """Return PNG bytes for a thumbnail of ``source``, or None if it can't be read."""
+    if Image is None:
+        try:
+            return source.read_bytes()
+        except OSError:
+            return None
+    try:
+        with Image.open(source) as image:
+            image.thumbnail((THUMBNAIL_SIZE, THUMBNAIL_SIZE))
+            out = io.BytesIO()
+            image.save(out, "PNG")
+            return out.getvalue()
+    except Exception as e:
+        logger.debug("Can't make a thumbnail of %s: %s", source, e)
+        return None
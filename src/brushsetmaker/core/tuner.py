@@ -0,0 +1,303 @@
+"""Pick a compression method and level by trial-compressing a sample of a library.
+
+The library is scanned once, stat only, and files are grouped by extension. A sample is
+drawn from every group in proportion to the group's share of the library's bytes and read
+into memory once; a file larger than its share is read only up to that share. The sample
+is compressed with every candidate setting on a thread pool (zlib, bz2 and lzma release
+the GIL). Each group's measured ratio and CPU time per byte are then scaled up to the
+group's full size, which gives a projected archive size and compression time for the
+whole library per candidate.
+
+Procreate only reads stored and deflated members, so bzip2 and lzma can be measured for
+comparison but are never recommended.
+"""
+
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+import logging
+from pathlib import Path, PurePath
+import random
+import time
+
+from .archive import new_compressor
+from .compression import PROBE_SIZE, CompressionPolicy
+from .inspector import METHOD_NAMES
+from .scanner import iter_source_files
+from .settings import COMPRESSION_LEVELS
+
+logger = logging.getLogger(__name__)
+
+# Candidate (compression_method, compression_level) setting pairs, cheapest first
+CANDIDATES = (
+    ("stored", "normal"),
+    ("deflate", "fast"),
+    ("deflate", "normal"),
+    ("deflate", "maximum"),
+    ("bzip2", "normal"),
+    ("bzip2", "maximum"),
+    ("lzma", "normal"),
+)
+
+# Methods Procreate can import
+PROCREATE_METHODS = ("stored", "deflate")
+
+DEFAULT_SAMPLE_BYTES = 64 * 1024 * 1024
+
+# Candidates whose projected size is within this fraction of the smallest count as a tie,
+# and the fastest of them wins
+DEFAULT_TOLERANCE = 0.02
+
+# Local header and central directory record per member, on top of its name stored twice;
+# the same for every candidate
+MEMBER_OVERHEAD = 30 + 46
+
+_METHODS = {name: method for method, name in METHOD_NAMES.items()}
+
+
+@dataclass
+class CandidateResult:
+    """Projected outcome of packaging the whole library with one setting."""
+
+    method: str
+    level: str
+    sample_bytes: int = 0
+    seconds: float = 0.0
+    projected_bytes: int = 0
+    projected_seconds: float = 0.0
+
+    @property
+    def label(self):
+        """Setting pair as shown in reports, e.g. ``deflate/maximum``."""
+        if self.method in ("stored", "lzma"):
+            # Neither takes a level
+            return self.method
+        return f"{self.method}/{self.level}"
+
+    @property
+    def compatible(self):
+        """Whether Procreate can import archives written with this setting."""
+        return self.method in PROCREATE_METHODS
+
+
+@dataclass
+class TuneResult:
+    """Library totals, the sample that was measured and a result per candidate."""
+
+    root: Path
+    file_count: int = 0
+    total_bytes: int = 0
+    sample_count: int = 0
+    sample_bytes: int = 0
+    candidates: list[CandidateResult] = field(default_factory=list)
+    best: CandidateResult | None = None
+    seconds: float = 0.0
+
+    def as_dict(self):
+        """Return the tuning result as JSON-serializable data."""
+        return {
+            "root": str(self.root),
+            "files": self.file_count,
+            "bytes": self.total_bytes,
+            "sample_files": self.sample_count,
+            "sample_bytes": self.sample_bytes,
+            "best": self.best.label if self.best else None,
+            "candidates": [
+                {
+                    "method": candidate.method,
+                    "level": candidate.level,
+                    "compatible": candidate.compatible,
+                    "sample_bytes": candidate.sample_bytes,
+                    "sample_seconds": round(candidate.seconds, 4),
+                    "projected_bytes": candidate.projected_bytes,
+                    "projected_seconds": round(candidate.projected_seconds, 3),
+                }
+                for candidate in self.candidates
+            ],
+        }
+
+
+def scan_library(root, include_hidden=False, skip_hidden_folders=True):
+    """Return a SourceFile for every file in every brushset folder below ``root``."""
+    sources = []
+    for folder in sorted(Path(root).iterdir()):
+        if not folder.is_dir():
+            continue
+        if skip_hidden_folders and folder.name.startswith((".", "_")):
+            continue
+        sources.extend(iter_source_files(folder, include_hidden))
+    return sources
+
+
+def draw_sample(sources, sample_bytes=DEFAULT_SAMPLE_BYTES, seed=0):
+    """Pick files to measure, stratified by extension.
+
+    Each extension gets a share of ``sample_bytes`` matching its share of the library, and
+    at least one file. A file larger than what is left of its extension's share is only
+    measured up to that much (but at least PROBE_SIZE), so one huge texture can't blow
+    the budget. The draw is seeded, so the same library gives the same sample.
+
+    Returns:
+        List of ``(SourceFile, bytes to read)`` pairs, every file in full when the library
+        fits in ``sample_bytes``.
+    """
+    total = sum(source.size for source in sources)
+    if total <= sample_bytes:
+        return [(source, source.size) for source in sources]
+    groups = defaultdict(list)
+    for source in sources:
+        groups[PurePath(source.arcname).suffix.lower()].append(source)
+
+    rng = random.Random(seed)
+    sample = []
+    for suffix in sorted(groups):
+        group = groups[suffix]
+        budget = sample_bytes * sum(source.size for source in group) / total
+        rng.shuffle(group)
+        taken = 0
+        for source in group:
+            if taken and taken + source.size > budget:
+                continue
+            length = min(source.size, max(PROBE_SIZE, int(budget - taken)))
+            sample.append((source, length))
+            taken += length
+            if taken >= budget:
+                break
+    return sample
+
+
+def _trial(name, data, policy):
+    """Compress one file the way write_members would; return (compressed size, CPU seconds)."""
+    start = time.thread_time()
+    compress_type = policy.method_for(name, head=data[:PROBE_SIZE])
+    compressor = new_compressor(compress_type, policy.level_for(compress_type))
+    if compressor is None:
+        size = len(data)
+    else:
+        size = len(compressor.compress(data)) + len(compressor.flush())
+    return size, time.thread_time() - start
+
+
+def tune_compression(
+    root,
+    *,
+    sample_bytes=DEFAULT_SAMPLE_BYTES,
+    workers=1,
+    policy_mode="auto",
+    all_methods=False,
+    tolerance=DEFAULT_TOLERANCE,
+    include_hidden=False,
+    skip_hidden_folders=True,
+):
+    """Measure every candidate setting on a sample of the library at ``root``.
+
+    Args:
+        root: Bulk root folder whose subfolders are brushset folders.
+        sample_bytes: About how many bytes of files to read and trial-compress.
+        workers: Threads compressing the sample.
+        policy_mode: ``compression_policy`` the candidates are measured under, so files
+            the policy would store are stored in the trial too.
+        all_methods: Also measure bzip2 and lzma, which Procreate can't import.
+        tolerance: Fraction of the smallest projected size within which the fastest
+            candidate is preferred.
+        include_hidden: Include hidden files, as the include_hidden_files setting does.
+        skip_hidden_folders: Skip folders starting with ``.`` or ``_``.
+
+    Returns:
+        TuneResult; ``best`` is None when the library has no files.
+    """
+    start = time.perf_counter()
+    result = TuneResult(root=Path(root))
+    sources = scan_library(root, include_hidden, skip_hidden_folders)
+    result.file_count = len(sources)
+    result.total_bytes = sum(source.size for source in sources)
+    overhead = sum(MEMBER_OVERHEAD + 2 * len(source.arcname.encode()) for source in sources)
+
+    group_bytes = defaultdict(int)
+    for source in sources:
+        group_bytes[PurePath(source.arcname).suffix.lower()] += source.size
+
+    sample = draw_sample(sources, sample_bytes)
+    result.sample_count = len(sample)
+    result.sample_bytes = sum(length for _, length in sample)
+    files = []
+    for source, length in sample:
+        # Ratios and time are scaled per byte, so a prefix stands in for the whole file
+        with source.path.open("rb") as f:
+            files.append((source.arcname, f.read(length)))
+
+    candidates = [
+        (method, level) for method, level in CANDIDATES
+        if all_methods or method in PROCREATE_METHODS
+    ]
+    policies = [
+        CompressionPolicy(_METHODS[method], COMPRESSION_LEVELS[level], policy_mode)
+        for method, level in candidates
+    ]
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        try:
+            trials = [
+                [executor.submit(_trial, name, data, policy) for name, data in files]
+                for policy in policies
+            ]
+            measured = [[future.result() for future in futures] for futures in trials]
+        except BaseException:
+            executor.shutdown(cancel_futures=True)
+            raise
+
+    for (method, level), sizes in zip(candidates, measured, strict=True):
+        candidate = CandidateResult(method, level)
+        group_in = defaultdict(int)
+        group_out = defaultdict(int)
+        group_seconds = defaultdict(float)
+        for (name, data), (size, seconds) in zip(files, sizes, strict=True):
+            suffix = PurePath(name).suffix.lower()
+            group_in[suffix] += len(data)
+            group_out[suffix] += size
+            group_seconds[suffix] += seconds
+        candidate.sample_bytes = sum(group_out.values())
+        candidate.seconds = sum(group_seconds.values())
+
+        # Scale each extension's ratio and CPU time per byte up to its share of the library
+        projected_bytes = overhead
+        for suffix, total in group_bytes.items():
+            if group_in[suffix]:
+                projected_bytes += total * group_out[suffix] / group_in[suffix]
+                candidate.projected_seconds += total * group_seconds[suffix] / group_in[suffix]
+            else:
+                projected_bytes += total
+        candidate.projected_bytes = round(projected_bytes)
+        result.candidates.append(candidate)
+
+    compatible = [candidate for candidate in result.candidates if candidate.compatible]
+    if sources and compatible:
+        smallest = min(candidate.projected_bytes for candidate in compatible)
+        close = [
+            candidate for candidate in compatible
+            if candidate.projected_bytes <= smallest * (1 + tolerance)
+        ]
+        result.best = min(close, key=lambda candidate: candidate.projected_seconds)
+
+    result.seconds = time.perf_counter() - start
+    logger.info(
+        "Tuned compression for %s",
+        result.root,
+        extra={"data": {
+            "files": result.file_count,
+            "bytes": result.total_bytes,
+            "sample_files": result.sample_count,
+            "sample_bytes": result.sample_bytes,
+            "best": result.best.label if result.best else None,
+            "seconds": round(result.seconds, 4),
+        }},
+    )
+    return result
+
+
+def apply_to_settings(settings, candidate):
+    """Store a candidate as the compression_method and compression_level settings."""
+    settings.set("compression_method", candidate.method)
+    if candidate.method not in ("stored", "lzma"):
+        settings.set("compression_level", candidate.level)
+    settings.save()
+
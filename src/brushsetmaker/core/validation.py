@@ -0,0 +1,125 @@
+"""Structure checks for brushset folders.
+
+Validation works from the member names the packaging scan already produced, so the only
+extra I/O is reading ``brushset.plist``. In bulk runs it happens inside each worker, next to
+the packaging of the same folder.
+"""
+
+from dataclasses import dataclass
+from pathlib import Path
+import plistlib
+
+PLIST_NAME = "brushset.plist"
+
+# Files every brush folder needs, and files Procreate expects but can do without
+REQUIRED_BRUSH_FILES = ("Brush.archive",)
+RECOMMENDED_BRUSH_FILES = ("QuickLook/Thumbnail.png",)
+
+
+@dataclass
+class ValidationIssue:
+    """A problem found in a brushset folder."""
+
+    severity: str  # "error" or "warning"
+    message: str
+    brush: str | None = None
+
+    def __str__(self):
+        """Return the issue as a single line."""
+        prefix = f"{self.brush}: " if self.brush else ""
+        return f"{prefix}{self.message}"
+
+
+def is_uuid_format(name):
+    """Check if a folder name has the 8-4-4-4-12 shape of a UUID."""
+    parts = name.split("-")
+    if len(parts) != 5:
+        return False
+    return [len(part) for part in parts] == [8, 4, 4, 4, 12]
+
+
+def brush_files(arcnames):
+    """Group member names by their top-level brush folder.
+
+    Returns:
+        Mapping of brush folder name to the set of paths inside it.
+    """
+    brushes = {}
+    for arcname in arcnames:
+        brush, sep, rest = arcname.partition("/")
+        if sep:
+            brushes.setdefault(brush, set()).add(rest)
+    return brushes
+
+
+def _plist_brushes(plist_path, metadata=None):
+    """Return the ``brushes`` list from a brushset.plist, or an error message."""
+    if metadata is None:
+        try:
+            with Path(plist_path).open("rb") as f:
+                metadata = plistlib.load(f)
+        except FileNotFoundError:
+            return None, None
+        except Exception as e:
+            return None, f"{PLIST_NAME} can't be read: {e}"
+    brushes = metadata.get("brushes") if isinstance(metadata, dict) else None
+    if not isinstance(brushes, list):
+        return None, f"{PLIST_NAME} has no brushes list"
+    return [str(brush) for brush in brushes], None
+
+
+def validate_brushset(folder, arcnames, check_structure=True, check_uuids=True, metadata=None):
+    """Check a brushset folder and return a list of ValidationIssue.
+
+    Args:
+        folder: The brushset source folder.
+        arcnames: POSIX member names relative to ``folder``, as produced by the scanner.
+        check_structure: Check each brush folder's files and compare brushset.plist with
+            the brush folders on disk.
+        check_uuids: Check that brush folders are named like UUIDs.
+        metadata: Metadata written into the archive in place of the folder's own
+            brushset.plist, if it was generated.
+    """
+    issues = []
+    brushes = brush_files(arcnames)
+
+    if check_uuids:
+        issues.extend(
+            ValidationIssue("warning", "folder name is not a UUID", brush)
+            for brush in sorted(brushes)
+            if not is_uuid_format(brush)
+        )
+
+    if not check_structure:
+        return issues
+
+    for brush, files in sorted(brushes.items()):
+        issues.extend(
+            ValidationIssue("error", f"missing {name}", brush)
+            for name in REQUIRED_BRUSH_FILES
+            if name not in files
+        )
+        issues.extend(
+            ValidationIssue("warning", f"missing {name}", brush)
+            for name in RECOMMENDED_BRUSH_FILES
+            if name not in files
+        )
+
+    listed, error = _plist_brushes(folder / PLIST_NAME, metadata)
+    if error:
+        issues.append(ValidationIssue("error", error))
+    elif listed is None:
+        issues.append(ValidationIssue("warning", f"no {PLIST_NAME}"))
+    else:
+        issues.extend(
+            ValidationIssue("error", f"listed in {PLIST_NAME} but missing on disk", brush)
+            for brush in listed
+            if brush not in brushes
+        )
+        listed_set = set(listed)
+        issues.extend(
+            ValidationIssue("warning", f"not listed in {PLIST_NAME}", brush)
+            for brush in sorted(brushes)
+            if brush not in listed_set
+        )
+    return issues
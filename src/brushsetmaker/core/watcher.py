@@ -0,0 +1,301 @@
+"""Watch a bulk root and repackage subfolders as their contents change.
+
+Linux uses inotify through ctypes; everywhere else, or when inotify runs out of watches,
+the tree is polled instead. Both report the names of the top-level subfolders that
+changed, and FolderWatcher debounces those into bulk rebuilds of just those folders.
+"""
+
+import ctypes
+import ctypes.util
+import logging
+import os
+from pathlib import Path
+import select
+import struct
+import sys
+import time
+
+from .engine import PackagingError
+from .scanner import iter_entries
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DEBOUNCE = 1.0
+DEFAULT_POLL_INTERVAL = 2.0
+
+# Longest a steady stream of changes can hold off a rebuild, in multiples of the debounce
+MAX_DELAY_FACTOR = 10
+
+# inotify(7) constants
+_IN_ATTRIB = 0x00000004
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_FROM = 0x00000040
+_IN_MOVED_TO = 0x00000080
+_IN_CREATE = 0x00000100
+_IN_DELETE = 0x00000200
+_IN_DELETE_SELF = 0x00000400
+_IN_MOVE_SELF = 0x00000800
+_IN_Q_OVERFLOW = 0x00004000
+_IN_IGNORED = 0x00008000
+_IN_ONLYDIR = 0x01000000
+_IN_DONT_FOLLOW = 0x02000000
+_IN_ISDIR = 0x40000000
+_WATCH_MASK = (
+    _IN_ATTRIB | _IN_CLOSE_WRITE | _IN_MOVED_FROM | _IN_MOVED_TO | _IN_CREATE | _IN_DELETE
+    | _IN_DELETE_SELF | _IN_MOVE_SELF | _IN_ONLYDIR | _IN_DONT_FOLLOW
+)
+_EVENT = struct.Struct("iIII")
+
+# Returned instead of folder names when changes were lost and everything must be checked
+ALL_FOLDERS = None
+
+
+class InotifyWatcher:
+    """Reports changed subfolders using Linux inotify, one watch per directory."""
+
+    def __init__(self, root):
+        """Start watching every directory below ``root``.
+
+        Raises:
+            OSError: If inotify is unavailable or the watch limit is reached.
+        """
+        self.root = Path(root)
+        self._libc = ctypes.CDLL(ctypes.util.find_library("c") or None, use_errno=True)
+        self._fd = self._libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self._paths = {}
+        try:
+            self._watch_tree(self.root)
+        except OSError:
+            self.close()
+            raise
+
+    def _watch_tree(self, directory):
+        """Add a watch for ``directory`` and every directory below it."""
+        self._add_watch(directory)
+        for entry in iter_entries(directory):
+            if entry.is_dir(follow_symlinks=False):
+                self._add_watch(entry.path)
+
+    def _add_watch(self, directory):
+        """Add a watch for one directory."""
+        wd = self._libc.inotify_add_watch(self._fd, os.fsencode(directory), _WATCH_MASK)
+        if wd < 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, f"Can't watch {directory}: {os.strerror(errno)}")
+        self._paths[wd] = Path(directory)
+
+    def poll(self, timeout):
+        """Wait up to ``timeout`` seconds and return the set of changed subfolder names.
+
+        Returns ALL_FOLDERS if the kernel queue overflowed and events were lost.
+        """
+        readable, _, _ = select.select([self._fd], [], [], timeout)
+        if not readable:
+            return set()
+        try:
+            data = os.read(self._fd, 64 * 1024)
+        except BlockingIOError:
+            return set()
+
+        changed = set()
+        offset = 0
+        while offset < len(data):
+            wd, mask, _, name_len = _EVENT.unpack_from(data, offset)
+            offset += _EVENT.size
+            name = data[offset:offset + name_len].rstrip(b"\0").decode(errors="surrogateescape")
+            offset += name_len
+
+            if mask & _IN_Q_OVERFLOW:
+                return ALL_FOLDERS
+            if mask & _IN_IGNORED:
+                self._paths.pop(wd, None)
+                continue
+            directory = self._paths.get(wd)
+            if directory is None:
+                continue
+            path = directory / name if name else directory
+            if mask & _IN_ISDIR and mask & (_IN_CREATE | _IN_MOVED_TO):
+                try:
+                    self._watch_tree(path)
+                except OSError as e:
+                    # Already gone again, or out of watches; the change is still reported
+                    logger.warning("Not watching %s: %s", path, e)
+            subfolder = _subfolder_of(self.root, path, is_dir=bool(mask & _IN_ISDIR))
+            if subfolder:
+                changed.add(subfolder)
+        return changed
+
+    def close(self):
+        """Release the inotify descriptor."""
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+
+
+class PollingWatcher:
+    """Reports changed subfolders by re-scanning the tree every ``interval`` seconds."""
+
+    def __init__(self, root, interval=DEFAULT_POLL_INTERVAL):
+        """Take the first snapshot of ``root``."""
+        self.root = Path(root)
+        self.interval = interval
+        self._snapshot = self._scan()
+        self._next_scan = time.monotonic() + interval
+
+    def _scan(self):
+        """Return a signature of every subfolder's entries, keyed by subfolder name."""
+        snapshot = {}
+        try:
+            subdirs = [entry for entry in os.scandir(self.root) if entry.is_dir()]
+        except OSError:
+            return snapshot
+        for subdir in subdirs:
+            records = []
+            try:
+                for entry in iter_entries(subdir.path):
+                    st = entry.stat(follow_symlinks=False)
+                    records.append((entry.path, st.st_size, st.st_mtime_ns))
+            except OSError:
+                # The folder changed under us; the next scan will settle it
+                records.append(None)
+            snapshot[subdir.name] = hash(tuple(records))
+        return snapshot
+
+    def poll(self, timeout):
+        """Wait up to ``timeout`` seconds and return the set of changed subfolder names."""
+        remaining = self._next_scan - time.monotonic()
+        if remaining > timeout:
+            time.sleep(timeout)
+            return set()
+        time.sleep(max(0.0, remaining))
+        self._next_scan = time.monotonic() + self.interval
+
+        snapshot = self._scan()
+        changed = {
+            name
+            for name in snapshot.keys() | self._snapshot.keys()
+            if snapshot.get(name) != self._snapshot.get(name)
+        }
+        self._snapshot = snapshot
+        return changed
+
+    def close(self):
+        """Nothing to release for polling."""
+
+
+def _subfolder_of(root, path, is_dir=False):
+    """Return the top-level subfolder name ``path`` belongs to, or None for files in root."""
+    try:
+        parts = path.relative_to(root).parts
+    except ValueError:
+        return None
+    if not parts or (len(parts) == 1 and not is_dir):
+        return None
+    return parts[0]
+
+
+def create_watcher(root, force_polling=False, interval=DEFAULT_POLL_INTERVAL):
+    """Return an InotifyWatcher where possible, otherwise a PollingWatcher."""
+    if sys.platform.startswith("linux") and not force_polling:
+        try:
+            return InotifyWatcher(root)
+        except (OSError, AttributeError) as e:
+            logger.warning("inotify unavailable, polling instead: %s", e)
+    return PollingWatcher(root, interval)
+
+
+class FolderWatcher:
+    """Rebuilds the brushsets of subfolders that change, once changes have settled.
+
+    Runs until ``stop_event`` is set. Bursts of changes are collected until nothing has
+    changed for ``debounce`` seconds, then only the affected subfolders are packaged with
+    ``engine.build_bulk``. Set the same event as the engine's cancel event so stopping
+    also interrupts a rebuild in progress.
+    """
+
+    def __init__(
+        self,
+        engine,
+        root,
+        output_dir=None,
+        *,
+        debounce=DEFAULT_DEBOUNCE,
+        force_polling=False,
+        interval=DEFAULT_POLL_INTERVAL,
+    ):
+        """Prepare to watch ``root``; archives go to ``output_dir``, defaulting to ``root``."""
+        self.engine = engine
+        self.root = Path(root)
+        self.output_dir = Path(output_dir) if output_dir else self.root
+        self.debounce = debounce
+        self.force_polling = force_polling
+        self.interval = interval
+
+    def _wanted(self, changed):
+        """Narrow changed names down to subfolders the engine would package."""
+        subfolders = {d.name for d in self.engine.find_subfolders(self.root)}
+        if changed is ALL_FOLDERS:
+            return subfolders
+        return changed & subfolders
+
+    def run(self, stop_event, on_rebuild=None, initial_build=True):
+        """Watch until ``stop_event`` is set.
+
+        Args:
+            stop_event: ``threading.Event``-like object that ends the watch.
+            on_rebuild: Optional callable receiving each BulkResult.
+            initial_build: Bring every subfolder up to date before watching.
+        """
+        watcher = create_watcher(self.root, self.force_polling, self.interval)
+        logger.info(
+            "Watching %s", self.root, extra={"data": {"watcher": type(watcher).__name__}}
+        )
+        try:
+            if initial_build:
+                self._rebuild(None, stop_event, on_rebuild)
+
+            pending = set()
+            everything = False
+            first_change = quiet_at = 0.0
+            while not stop_event.is_set():
+                changed = watcher.poll(min(0.5, self.debounce))
+                now = time.monotonic()
+                if changed is ALL_FOLDERS or changed:
+                    if not pending and not everything:
+                        first_change = now
+                    if changed is ALL_FOLDERS:
+                        everything = True
+                    else:
+                        pending |= changed
+                    quiet_at = now + self.debounce
+
+                if not pending and not everything:
+                    continue
+                # Wait for the burst to settle, but don't let a constant trickle starve us
+                if now >= quiet_at or now - first_change >= self.debounce * MAX_DELAY_FACTOR:
+                    names = self._wanted(ALL_FOLDERS if everything else pending)
+                    self._rebuild(names, stop_event, on_rebuild)
+                    pending = set()
+                    everything = False
+        finally:
+            watcher.close()
+            logger.info("Stopped watching %s", self.root)
+
+    def _rebuild(self, names, stop_event, on_rebuild):
+        """Package the named subfolders, or all of them when ``names`` is None."""
+        if stop_event.is_set() or (names is not None and not names):
+            return
+        logger.info(
+            "Rebuilding %s", "all subfolders" if names is None else ", ".join(sorted(names))
+        )
+        try:
+            bulk = self.engine.build_bulk(self.root, self.output_dir, only=names)
+        except (PackagingError, OSError) as e:
+            # Failed folders already come back as results; this is the run as a whole
+            # failing, e.g. on duplicates, which shouldn't end the watch
+            logger.error("Rebuild failed, still watching: %s", e)
+            return
+        if on_rebuild:
+            on_rebuild(bulk)
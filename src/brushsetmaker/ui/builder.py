@@ -2,7 +2,7 @@
 
 import toga
 from toga.style import Pack
-from toga.style.pack import COLUMN, ROW # type: ignore
+from toga.style.pack import COLUMN, ROW  # type: ignore
 
 
 class UIBuilder:
@@ -20,14 +20,10 @@ class UIBuilder:
         # Create content area container
         app.content_container = toga.Box(style=Pack(direction=COLUMN, flex=1, padding=(30, 30, 30, 20)))
 
-        # Build all view sections
-        app.single_view = UIBuilder._build_single_section(app)
-        app.bulk_view = UIBuilder._build_bulk_section(app)
-        app.brush_view = UIBuilder._build_brush_section(app)
-
-        # Show single view by default
-        app.content_container.add(app.single_view)
-        app.current_view = "single"
+        # Views are built the first time they are shown; only the default one is needed now
+        app.views = {}
+        app.current_view = None
+        UIBuilder.switch_view(app, "single")
 
         # Add sidebar and content to main container
         main_container.add(sidebar)
@@ -61,19 +57,19 @@ class UIBuilder:
         # Navigation buttons
         single_btn = toga.Button(
             "📦 Single",
-            on_press=lambda w: UIBuilder._switch_view(app, "single"),
+            on_press=lambda w: UIBuilder.switch_view(app, "single"),
             style=Pack(padding=(0, 0, 8, 0), height=36)
         )
 
         bulk_btn = toga.Button(
             "⚡ Bulk",
-            on_press=lambda w: UIBuilder._switch_view(app, "bulk"),
+            on_press=lambda w: UIBuilder.switch_view(app, "bulk"),
             style=Pack(padding=(0, 0, 8, 0), height=36)
         )
 
         brush_btn = toga.Button(
             "🖌️ Brush",
-            on_press=lambda w: UIBuilder._switch_view(app, "brush"),
+            on_press=lambda w: UIBuilder.switch_view(app, "brush"),
             style=Pack(padding=(0, 0, 8, 0), height=36)
         )
 
@@ -84,25 +80,30 @@ class UIBuilder:
         return sidebar
 
     @staticmethod
-    def _switch_view(app, view_name):
+    def get_view(app, view_name):
+        """Return a view, building it on first use."""
+        view = app.views.get(view_name)
+        if view is None:
+            builders = {
+                "single": UIBuilder._build_single_section,
+                "bulk": UIBuilder._build_bulk_section,
+                "brush": UIBuilder._build_brush_section,
+            }
+            view = app.views[view_name] = builders[view_name](app)
+        return view
+
+    @staticmethod
+    def switch_view(app, view_name):
         """Switch between different views."""
+        if view_name == app.current_view:
+            return
+
         # Remove current view
-        if hasattr(app, 'current_view'):
-            if app.current_view == "single":
-                app.content_container.remove(app.single_view)
-            elif app.current_view == "bulk":
-                app.content_container.remove(app.bulk_view)
-            elif app.current_view == "brush":
-                app.content_container.remove(app.brush_view)
+        if app.current_view is not None:
+            app.content_container.remove(app.views[app.current_view])
 
         # Add new view
-        if view_name == "single":
-            app.content_container.add(app.single_view)
-        elif view_name == "bulk":
-            app.content_container.add(app.bulk_view)
-        elif view_name == "brush":
-            app.content_container.add(app.brush_view)
-
+        app.content_container.add(UIBuilder.get_view(app, view_name))
         app.current_view = view_name
 
     @staticmethod
@@ -207,30 +208,116 @@ class UIBuilder:
         bulk_box.add(bulk_label)
         bulk_box.add(bulk_instructions)
         bulk_box.add(button_row)
+        # Resume button, enabled when an interrupted run left a journal behind
+        app.resume_button = toga.Button(
+            "Resume Last Run",
+            on_press=app._handle_resume_folders,
+            enabled=False,
+            style=Pack(padding=(10, 0, 0, 0), width=300, height=36)
+        )
+
+        # Watch button, repackages subfolders as they change until pressed again
+        app.watch_button = toga.Button(
+            "Watch for Changes",
+            on_press=app._handle_toggle_watch,
+            enabled=False,
+            style=Pack(padding=(10, 0, 0, 0), width=300, height=36)
+        )
+
         bulk_box.add(app.folder_label)
         bulk_box.add(app.process_button)
+        bulk_box.add(app.resume_button)
+        bulk_box.add(app.watch_button)
+
+        # Unpack button, the reverse: extracts the .brushset files in the root into folders
+        app.unpack_button = toga.Button(
+            "Unpack All Brushsets",
+            on_press=app._handle_unpack_brushsets,
+            enabled=False,
+            style=Pack(padding=(10, 0, 0, 0), width=300, height=36)
+        )
+        bulk_box.add(app.unpack_button)
+
+        # Repack button, rewrites the .brushset files in the root with the current settings
+        app.repack_button = toga.Button(
+            "Repack All Brushsets",
+            on_press=app._handle_repack_brushsets,
+            enabled=False,
+            style=Pack(padding=(10, 0, 0, 0), width=300, height=36)
+        )
+        bulk_box.add(app.repack_button)
 
         return bulk_box
 
     @staticmethod
     def _build_brush_section(app):
-        """Build the brush section (placeholder)."""
+        """Build the brush library browser section."""
         brush_box = toga.Box(style=Pack(
             direction=COLUMN,
-            padding=20
+            padding=20,
+            flex=1
         ))
 
         brush_label = toga.Label(
-            "🖌️ Brush Tools",
+            "🖌️ Brush Library",
             style=Pack(padding=(0, 0, 10, 0), font_size=24, font_weight="bold")
         )
 
         brush_instructions = toga.Label(
-            "Brush creation and editing tools coming soon...",
-            style=Pack(padding=(0, 0, 15, 0), font_size=14)
+            "Select a root folder to browse the brushes in all of its brushsets",
+            style=Pack(padding=(0, 0, 15, 0), font_size=13)
+        )
+
+        library_button = toga.Button(
+            "Select Library Folder",
+            on_press=app._handle_select_library,
+            style=Pack(padding=(0, 0, 0, 0), width=300, height=36)
+        )
+
+        app.library_label = toga.Label(
+            "No library selected",
+            style=Pack(padding=(15, 0, 10, 0), font_size=11)
+        )
+
+        # Only the current page of rows is ever materialized
+        app.library_table = toga.Table(
+            headings=["Brush", "Brushset"],
+            accessors=["brush", "brushset"],
+            data=[],
+            style=Pack(flex=1)
+        )
+
+        # Paging row
+        paging_row = toga.Box(style=Pack(direction=ROW, padding=(10, 0, 0, 0)))
+
+        app.library_prev_button = toga.Button(
+            "◀ Previous",
+            on_press=app._handle_library_previous,
+            enabled=False,
+            style=Pack(padding=(0, 10, 0, 0), width=120, height=32)
+        )
+
+        app.library_page_label = toga.Label(
+            "",
+            style=Pack(padding=(8, 10, 0, 0), font_size=11, flex=1)
         )
 
+        app.library_next_button = toga.Button(
+            "Next ▶",
+            on_press=app._handle_library_next,
+            enabled=False,
+            style=Pack(padding=(0, 0, 0, 0), width=120, height=32)
+        )
+
+        paging_row.add(app.library_prev_button)
+        paging_row.add(app.library_page_label)
+        paging_row.add(app.library_next_button)
+
         brush_box.add(brush_label)
         brush_box.add(brush_instructions)
+        brush_box.add(library_button)
+        brush_box.add(app.library_label)
+        brush_box.add(app.library_table)
+        brush_box.add(paging_row)
 
         return brush_box
@@ -0,0 +1,129 @@
+"""Archive inspector window."""
+
+import toga
+from toga.style import Pack
+
+
+class InspectorWindow:
+    """Window showing the brushes and members of an inspected brushset archive."""
+
+    def __init__(self, app, info):
+        """Initialize the inspector window from an ArchiveInfo."""
+        self.app = app
+        self.info = info
+
+        # Create the window
+        self.window = toga.Window(title=f"Inspect {info.path.name}")
+        self.window.content = self._build_ui()
+
+    def _build_ui(self):
+        """Build the inspector UI."""
+        info = self.info
+        main_box = toga.Box(style=Pack(direction="column", padding=20))
+
+        # Title
+        title_label = toga.Label(
+            info.name or info.path.name,
+            style=Pack(padding=(0, 0, 5, 0), font_size=18, font_weight="bold")
+        )
+
+        methods = ", ".join(f"{count} {name}" for name, count in sorted(info.methods.items()))
+        summary_label = toga.Label(
+            f"{len(info.members)} files ({methods}) - "
+            f"{_format_size(info.file_size)} stored in {_format_size(info.compress_size)}",
+            style=Pack(padding=(0, 0, 15, 0), font_size=12)
+        )
+
+        main_box.add(title_label)
+        main_box.add(summary_label)
+
+        if info.metadata_error:
+            main_box.add(toga.Label(
+                f"Warning: {info.metadata_error}",
+                style=Pack(padding=(0, 0, 10, 0), font_size=12)
+            ))
+
+        # Brushes
+        main_box.add(self._create_section_header("Brushes"))
+        brush_rows = []
+        for brush in info.brushes:
+            if not brush.listed:
+                status = "not in brushset.plist"
+            elif not brush.files:
+                status = "missing"
+            else:
+                status = ""
+            brush_rows.append((brush.name, brush.files, _format_size(brush.file_size), status))
+        self.brushes_table = toga.Table(
+            headings=["Brush", "Files", "Size", "Status"],
+            data=brush_rows,
+            multiple_select=True,
+            on_select=self._on_brush_select,
+            style=Pack(flex=1, width=700, height=180)
+        )
+        main_box.add(self.brushes_table)
+
+        self.split_button = toga.Button(
+            "Save Selected Brushes As...",
+            on_press=self._on_split,
+            enabled=False,
+            style=Pack(padding=(5, 0, 0, 0), width=240, height=36)
+        )
+        main_box.add(self.split_button)
+
+        # Members
+        main_box.add(self._create_section_header("Files"))
+        members_table = toga.Table(
+            headings=["Name", "Method", "Size", "Compressed", "CRC-32"],
+            data=[
+                (
+                    member.name,
+                    member.method,
+                    member.file_size,
+                    member.compress_size,
+                    f"{member.crc:08x}",
+                )
+                for member in info.members
+            ],
+            style=Pack(flex=2, width=700, height=300)
+        )
+        main_box.add(members_table)
+
+        close_button = toga.Button(
+            "Close",
+            on_press=lambda widget: self.window.close(),
+            style=Pack(padding=(15, 0, 0, 0), width=120, height=36)
+        )
+        main_box.add(close_button)
+
+        return main_box
+
+    def _create_section_header(self, text):
+        """Create a section header label."""
+        return toga.Label(
+            text,
+            style=Pack(padding=(10, 0, 5, 0), font_size=14, font_weight="bold")
+        )
+
+    def _on_brush_select(self, widget, **kwargs):
+        """Enable splitting once at least one brush is selected."""
+        self.split_button.enabled = bool(widget.selection)
+
+    async def _on_split(self, widget):
+        """Write the selected brushes to a new brushset."""
+        from ..core.handlers import BrushsetHandlers
+        brushes = [row.brush for row in self.brushes_table.selection]
+        await BrushsetHandlers.split_brushes(self.app, self.info, brushes, self.window)
+
+    def show(self):
+        """Show the inspector window."""
+        self.window.show()
+
+
+def _format_size(size):
+    """Format a byte count for display."""
+    for unit in ("bytes", "KB", "MB"):
+        if size < 1024:
+            return f"{size:.0f} {unit}" if unit == "bytes" else f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} GB"
@@ -3,9 +3,18 @@
 import toga
 from toga.style import Pack
 
+from ..core.log import configure_logging
+
+# Settings edited as text but stored as integers
+INT_SETTINGS = ("compression_threads", "bulk_workers", "thumbnail_cache_mb")
+
 
 class SettingsWindow:
-    """Window for configuring application settings."""
+    """Window for configuring application settings.
+
+    The app builds it once, on first use, and hides it instead of closing it, so opening
+    Preferences again only reloads the current values into the existing widgets.
+    """
 
     def __init__(self, app):
         """Initialize the settings window."""
@@ -13,7 +22,7 @@ class SettingsWindow:
         self.settings = app.settings
 
         # Create the window
-        self.window = toga.Window(title="Settings")
+        self.window = toga.Window(title="Settings", on_close=self._handle_close)
         self.window.content = self._build_ui()
 
     def _build_ui(self):
@@ -33,20 +42,100 @@ class SettingsWindow:
 
         settings_box = toga.Box(style=Pack(direction="column", padding=10))
 
-        # Output & File Management Section
-        settings_box.add(self._create_section_header("Output & File Management"))
+        self._add_output_section(settings_box)
+        self._add_compression_section(settings_box)
+        self._add_metadata_section(settings_box)
+        self._add_validation_section(settings_box)
+        self._add_ui_section(settings_box)
+        self._add_bulk_section(settings_box)
+        self._add_advanced_section(settings_box)
+
+        scroll_container.content = settings_box
+
+        # Buttons
+        button_box = toga.Box(style=Pack(direction="row", padding=(20, 0, 0, 0)))
+
+        save_button = toga.Button(
+            "Save Settings",
+            on_press=self._handle_save,
+            style=Pack(padding=(0, 10, 0, 0), flex=1, height=40)
+        )
+
+        cancel_button = toga.Button(
+            "Cancel",
+            on_press=self._handle_cancel,
+            style=Pack(padding=(0, 0, 0, 0), flex=1, height=40)
+        )
+
+        button_box.add(save_button)
+        button_box.add(cancel_button)
+
+        main_box.add(title_label)
+        main_box.add(scroll_container)
+        main_box.add(button_box)
+
+        # Widget editing each setting, in the order they are saved
+        self.fields = {
+            # Output & File Management
+            "remember_last_location": self.remember_location,
+            "open_output_folder": self.open_folder,
+            "overwrite_behavior": self.overwrite_dropdown,
+            # Compression
+            "compression_level": self.compression_dropdown,
+            "compression_method": self.method_dropdown,
+            "compression_policy": self.policy_dropdown,
+            "compression_threads": self.threads_input,
+            "reuse_compressed_entries": self.reuse_entries,
+            # Metadata
+            "default_name_template": self.template_input,
+            "default_author": self.author_input,
+            "auto_create_plist": self.auto_create_plist,
+            "auto_populate_brushes": self.auto_populate,
+            "write_plist_to_source": self.write_plist_to_source,
+            "plist_format": self.plist_format_dropdown,
+            # Validation
+            "validate_brush_structure": self.validate_structure,
+            "warn_empty_folders": self.warn_empty,
+            "verify_uuid_format": self.verify_uuid,
+            "check_duplicate_brushes": self.check_duplicates,
+            "duplicate_action": self.duplicate_dropdown,
+            # UI Preferences
+            "show_progress_details": self.show_progress,
+            "show_success_dialogs": self.show_success,
+            # Bulk Processing
+            "skip_hidden_folders": self.skip_hidden,
+            "error_handling": self.error_dropdown,
+            "bulk_workers": self.workers_input,
+            "incremental_builds": self.incremental,
+            "manifest_hash_contents": self.hash_contents,
+            "generate_report": self.generate_report,
+            "report_format": self.report_dropdown,
+            # Advanced
+            "include_hidden_files": self.include_hidden,
+            "preserve_timestamps": self.preserve_timestamps,
+            "create_backup": self.create_backup,
+            "logging_level": self.log_dropdown,
+            "trace_packaging": self.trace_packaging,
+            "thumbnail_cache_mb": self.cache_input,
+        }
+
+        return main_box
+
+    def _add_output_section(self, box):
+        """Add the output and file management settings to ``box``."""
+        box.add(self._create_section_header("Output & File Management"))
 
         self.remember_location = self._create_switch(
             "Remember last save location",
             self.settings.get("remember_last_location", True)
         )
-        settings_box.add(self.remember_location)
+        box.add(self.remember_location)
 
         self.open_folder = self._create_switch(
             "Open output folder after creation",
             self.settings.get("open_output_folder", False)
         )
-        settings_box.add(self.open_folder)
+        box.add(self.open_folder)
 
         overwrite_box = self._create_dropdown(
             "Overwrite behavior:",
@@ -54,10 +143,11 @@ class SettingsWindow:
             self.settings.get("overwrite_behavior", "prompt")
         )
         self.overwrite_dropdown = overwrite_box.children[1]
-        settings_box.add(overwrite_box)
+        box.add(overwrite_box)
 
-        # Compression Settings Section
-        settings_box.add(self._create_section_header("Compression Settings"))
+    def _add_compression_section(self, box):
+        """Add the compression settings to ``box``."""
+        box.add(self._create_section_header("Compression Settings"))
 
         compression_box = self._create_dropdown(
             "Compression level:",
@@ -65,7 +155,7 @@ class SettingsWindow:
             self.settings.get("compression_level", "normal")
         )
         self.compression_dropdown = compression_box.children[1]
-        settings_box.add(compression_box)
+        box.add(compression_box)
 
         method_box = self._create_dropdown(
             "Compression method:",
@@ -73,10 +163,33 @@ class SettingsWindow:
             self.settings.get("compression_method", "deflate")
         )
         self.method_dropdown = method_box.children[1]
-        settings_box.add(method_box)
+        box.add(method_box)
+
+        policy_box = self._create_dropdown(
+            "Store already-compressed files:",
+            ["auto", "extensions", "off"],
+            self.settings.get("compression_policy", "auto")
+        )
+        self.policy_dropdown = policy_box.children[1]
+        box.add(policy_box)
+
+        threads_box = self._create_text_field(
+            "Compression threads:",
+            str(self.settings.get("compression_threads", 0)),
+            "0 = one per CPU core"
+        )
+        self.threads_input = threads_box.children[1]
+        box.add(threads_box)
 
-        # Metadata Defaults Section
-        settings_box.add(self._create_section_header("Metadata Defaults"))
+        self.reuse_entries = self._create_switch(
+            "Reuse unchanged files from the previous brushset",
+            self.settings.get("reuse_compressed_entries", True)
+        )
+        box.add(self.reuse_entries)
+
+    def _add_metadata_section(self, box):
+        """Add the metadata default settings to ``box``."""
+        box.add(self._create_section_header("Metadata Defaults"))
 
         template_box = self._create_text_field(
             "Brushset name template:",
@@ -84,7 +197,7 @@ class SettingsWindow:
             "Use {folder_name}, {date}, {datetime}"
         )
         self.template_input = template_box.children[1]
-        settings_box.add(template_box)
+        box.add(template_box)
 
         author_box = self._create_text_field(
             "Default author:",
@@ -92,70 +205,95 @@ class SettingsWindow:
             "Your name"
         )
         self.author_input = author_box.children[1]
-        settings_box.add(author_box)
+        box.add(author_box)
 
         self.auto_create_plist = self._create_switch(
             "Auto-create brushset.plist if missing",
             self.settings.get("auto_create_plist", True)
         )
-        settings_box.add(self.auto_create_plist)
+        box.add(self.auto_create_plist)
 
         self.auto_populate = self._create_switch(
             "Auto-populate brushes array",
             self.settings.get("auto_populate_brushes", True)
         )
-        settings_box.add(self.auto_populate)
+        box.add(self.auto_populate)
+
+        self.write_plist_to_source = self._create_switch(
+            "Save generated brushset.plist into the source folder",
+            self.settings.get("write_plist_to_source", False)
+        )
+        box.add(self.write_plist_to_source)
+
+        plist_format_box = self._create_dropdown(
+            "brushset.plist format:",
+            ["xml", "binary"],
+            self.settings.get("plist_format", "xml")
+        )
+        self.plist_format_dropdown = plist_format_box.children[1]
+        box.add(plist_format_box)
 
-        # Validation & Checks Section
-        settings_box.add(self._create_section_header("Validation & Checks"))
+    def _add_validation_section(self, box):
+        """Add the validation and check settings to ``box``."""
+        box.add(self._create_section_header("Validation & Checks"))
 
         self.validate_structure = self._create_switch(
             "Validate brush structure",
             self.settings.get("validate_brush_structure", False)
         )
-        settings_box.add(self.validate_structure)
+        box.add(self.validate_structure)
 
         self.warn_empty = self._create_switch(
             "Warn on empty folders",
             self.settings.get("warn_empty_folders", True)
         )
-        settings_box.add(self.warn_empty)
+        box.add(self.warn_empty)
 
         self.verify_uuid = self._create_switch(
             "Verify UUID format",
             self.settings.get("verify_uuid_format", True)
         )
-        settings_box.add(self.verify_uuid)
+        box.add(self.verify_uuid)
 
         self.check_duplicates = self._create_switch(
             "Check for duplicate brushes",
             self.settings.get("check_duplicate_brushes", False)
         )
-        settings_box.add(self.check_duplicates)
+        box.add(self.check_duplicates)
 
-        # UI Preferences Section
-        settings_box.add(self._create_section_header("UI Preferences"))
+        duplicate_box = self._create_dropdown(
+            "When duplicate brushes are found:",
+            ["warn", "fail"],
+            self.settings.get("duplicate_action", "warn")
+        )
+        self.duplicate_dropdown = duplicate_box.children[1]
+        box.add(duplicate_box)
+
+    def _add_ui_section(self, box):
+        """Add the UI preference settings to ``box``."""
+        box.add(self._create_section_header("UI Preferences"))
 
         self.show_progress = self._create_switch(
             "Show progress details",
             self.settings.get("show_progress_details", True)
         )
-        settings_box.add(self.show_progress)
+        box.add(self.show_progress)
 
         self.show_success = self._create_switch(
             "Show success dialogs",
             self.settings.get("show_success_dialogs", True)
         )
-        settings_box.add(self.show_success)
+        box.add(self.show_success)
 
-        # Bulk Processing Section
-        settings_box.add(self._create_section_header("Bulk Processing"))
+    def _add_bulk_section(self, box):
+        """Add the bulk processing settings to ``box``."""
+        box.add(self._create_section_header("Bulk Processing"))
 
         self.skip_hidden = self._create_switch(
             "Skip hidden folders (starting with . or _)",
             self.settings.get("skip_hidden_folders", True)
         )
-        settings_box.add(self.skip_hidden)
+        box.add(self.skip_hidden)
 
         error_box = self._create_dropdown(
             "Error handling:",
@@ -163,34 +301,63 @@ class SettingsWindow:
             self.settings.get("error_handling", "continue")
         )
         self.error_dropdown = error_box.children[1]
-        settings_box.add(error_box)
+        box.add(error_box)
+
+        workers_box = self._create_text_field(
+            "Parallel workers:",
+            str(self.settings.get("bulk_workers", 0)),
+            "0 = one per CPU core"
+        )
+        self.workers_input = workers_box.children[1]
+        box.add(workers_box)
+
+        self.incremental = self._create_switch(
+            "Skip unchanged folders",
+            self.settings.get("incremental_builds", True)
+        )
+        box.add(self.incremental)
+
+        self.hash_contents = self._create_switch(
+            "Compare file contents, not just timestamps",
+            self.settings.get("manifest_hash_contents", False)
+        )
+        box.add(self.hash_contents)
 
         self.generate_report = self._create_switch(
             "Generate processing report",
             self.settings.get("generate_report", False)
         )
-        settings_box.add(self.generate_report)
+        box.add(self.generate_report)
+
+        report_box = self._create_dropdown(
+            "Report format:",
+            ["json", "csv"],
+            self.settings.get("report_format", "json")
+        )
+        self.report_dropdown = report_box.children[1]
+        box.add(report_box)
 
-        # Advanced Section
-        settings_box.add(self._create_section_header("Advanced"))
+    def _add_advanced_section(self, box):
+        """Add the advanced settings to ``box``."""
+        box.add(self._create_section_header("Advanced"))
 
         self.include_hidden = self._create_switch(
             "Include hidden files in brushsets",
             self.settings.get("include_hidden_files", False)
         )
-        settings_box.add(self.include_hidden)
+        box.add(self.include_hidden)
 
         self.preserve_timestamps = self._create_switch(
             "Preserve file timestamps",
             self.settings.get("preserve_timestamps", False)
         )
-        settings_box.add(self.preserve_timestamps)
+        box.add(self.preserve_timestamps)
 
         self.create_backup = self._create_switch(
             "Create backup before overwriting",
             self.settings.get("create_backup", False)
         )
-        settings_box.add(self.create_backup)
+        box.add(self.create_backup)
 
         log_box = self._create_dropdown(
             "Logging level:",
@@ -198,33 +365,21 @@ class SettingsWindow:
             self.settings.get("logging_level", "info")
         )
         self.log_dropdown = log_box.children[1]
-        settings_box.add(log_box)
-
-        scroll_container.content = settings_box
+        box.add(log_box)
 
-        # Buttons
-        button_box = toga.Box(style=Pack(direction="row", padding=(20, 0, 0, 0)))
-
-        save_button = toga.Button(
-            "Save Settings",
-            on_press=self._handle_save,
-            style=Pack(padding=(0, 10, 0, 0), flex=1, height=40)
+        self.trace_packaging = self._create_switch(
+            "Save a performance trace with each run",
+            self.settings.get("trace_packaging", False)
         )
+        box.add(self.trace_packaging)
 
-        cancel_button = toga.Button(
-            "Cancel",
-            on_press=self._handle_cancel,
-            style=Pack(padding=(0, 0, 0, 0), flex=1, height=40)
+        cache_box = self._create_text_field(
+            "Thumbnail cache size (MB):",
+            str(self.settings.get("thumbnail_cache_mb", 200)),
+            "Brush library thumbnails in ~/.brushsetmaker/cache"
         )
-
-        button_box.add(save_button)
-        button_box.add(cancel_button)
-
-        main_box.add(title_label)
-        main_box.add(scroll_container)
-        main_box.add(button_box)
-
-        return main_box
+        self.cache_input = cache_box.children[1]
+        box.add(cache_box)
 
     def _create_section_header(self, text):
         """Create a section header."""
@@ -287,51 +442,24 @@ class SettingsWindow:
     async def _handle_save(self, widget):
         """Save all settings."""
         try:
-            # Output & File Management
-            self.settings.set("remember_last_location", self.remember_location.value)
-            self.settings.set("open_output_folder", self.open_folder.value)
-            self.settings.set("overwrite_behavior", self.overwrite_dropdown.value)
-
-            # Compression
-            self.settings.set("compression_level", self.compression_dropdown.value)
-            self.settings.set("compression_method", self.method_dropdown.value)
-
-            # Metadata
-            self.settings.set("default_name_template", self.template_input.value)
-            self.settings.set("default_author", self.author_input.value)
-            self.settings.set("auto_create_plist", self.auto_create_plist.value)
-            self.settings.set("auto_populate_brushes", self.auto_populate.value)
-
-            # Validation
-            self.settings.set("validate_brush_structure", self.validate_structure.value)
-            self.settings.set("warn_empty_folders", self.warn_empty.value)
-            self.settings.set("verify_uuid_format", self.verify_uuid.value)
-            self.settings.set("check_duplicate_brushes", self.check_duplicates.value)
-
-            # UI Preferences
-            self.settings.set("show_progress_details", self.show_progress.value)
-            self.settings.set("show_success_dialogs", self.show_success.value)
-
-            # Bulk Processing
-            self.settings.set("skip_hidden_folders", self.skip_hidden.value)
-            self.settings.set("error_handling", self.error_dropdown.value)
-            self.settings.set("generate_report", self.generate_report.value)
-
-            # Advanced
-            self.settings.set("include_hidden_files", self.include_hidden.value)
-            self.settings.set("preserve_timestamps", self.preserve_timestamps.value)
-            self.settings.set("create_backup", self.create_backup.value)
-            self.settings.set("logging_level", self.log_dropdown.value)
+            # Convert everything first, so a bad number doesn't leave half the settings set
+            values = {
+                key: int(widget.value or 0) if key in INT_SETTINGS else widget.value
+                for key, widget in self.fields.items()
+            }
+            for key, value in values.items():
+                self.settings.set(key, value)
 
             # Save to disk
             self.settings.save()
+            configure_logging(self.settings.get("logging_level", "info"))
 
             await self.app.main_window.info_dialog(
                 "Settings Saved",
                 "Your settings have been saved successfully."
             )
 
-            self.window.close()
+            self.window.hide()
 
         except Exception as e:
             await self.app.main_window.error_dialog(
@@ -341,8 +469,22 @@ class SettingsWindow:
 
     def _handle_cancel(self, widget):
         """Close without saving."""
-        self.window.close()
+        self.window.hide()
+
+    def _handle_close(self, window, **kwargs):
+        """Hide the window rather than destroying it, so it can be shown again."""
+        self.window.hide()
+        return False
+
+    def load_values(self):
+        """Copy the current settings into the widgets, dropping unsaved edits."""
+        for key, widget in self.fields.items():
+            value = self.settings.get(key)
+            if value is None:
+                continue
+            widget.value = str(value) if key in INT_SETTINGS else value
 
     def show(self):
-        """Show the settings window."""
+        """Show the settings window with the current settings."""
+        self.load_values()
         self.window.show()